@@ -0,0 +1,86 @@
+"""add_product_full_text_search
+
+Revision ID: 2b9c4e7d1a53
+Revises: 8d3e5f1a6c20
+Create Date: 2026-10-18 21:34:05.118204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '2b9c4e7d1a53'
+down_revision: Union[str, None] = '8d3e5f1a6c20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+POSTGRES_UPGRADE = [
+    """
+    ALTER TABLE products ADD COLUMN search_vector tsvector GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', coalesce(name, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(tags, '')), 'B') ||
+        setweight(to_tsvector('english', coalesce(description, '')), 'C')
+    ) STORED
+    """,
+    "CREATE INDEX ix_products_search_vector ON products USING gin (search_vector)",
+]
+
+SQLITE_UPGRADE = [
+    """
+    CREATE VIRTUAL TABLE products_fts USING fts5(
+        name, tags, description, content='products', content_rowid='id', tokenize='porter unicode61'
+    )
+    """,
+    """
+    CREATE TRIGGER products_fts_insert AFTER INSERT ON products BEGIN
+        INSERT INTO products_fts (rowid, name, tags, description) VALUES (new.id, new.name, new.tags, new.description);
+    END
+    """,
+    """
+    CREATE TRIGGER products_fts_delete AFTER DELETE ON products BEGIN
+        INSERT INTO products_fts (products_fts, rowid, name, tags, description)
+        VALUES ('delete', old.id, old.name, old.tags, old.description);
+    END
+    """,
+    """
+    CREATE TRIGGER products_fts_update AFTER UPDATE OF name, tags, description ON products BEGIN
+        INSERT INTO products_fts (products_fts, rowid, name, tags, description)
+        VALUES ('delete', old.id, old.name, old.tags, old.description);
+        INSERT INTO products_fts (rowid, name, tags, description) VALUES (new.id, new.name, new.tags, new.description);
+    END
+    """,
+    # Index the rows that already exist
+    "INSERT INTO products_fts (products_fts) VALUES ('rebuild')",
+]
+
+
+def _sqlite_has_fts5(bind) -> bool:
+    return bool(bind.exec_driver_sql("SELECT sqlite_compileoption_used('ENABLE_FTS5')").scalar())
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name == 'postgresql':
+        statements = POSTGRES_UPGRADE
+    elif bind.dialect.name == 'sqlite' and _sqlite_has_fts5(bind):
+        statements = SQLITE_UPGRADE
+    else:
+        # Search keeps using LIKE on databases without a full-text index
+        return
+    for statement in statements:
+        op.execute(sa.text(statement))
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name == 'postgresql':
+        op.execute('DROP INDEX IF EXISTS ix_products_search_vector')
+        op.execute('ALTER TABLE products DROP COLUMN IF EXISTS search_vector')
+    elif bind.dialect.name == 'sqlite':
+        for trigger in ('products_fts_insert', 'products_fts_delete', 'products_fts_update'):
+            op.execute(f'DROP TRIGGER IF EXISTS {trigger}')
+        op.execute('DROP TABLE IF EXISTS products_fts')
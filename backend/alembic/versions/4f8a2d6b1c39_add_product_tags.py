@@ -0,0 +1,72 @@
+"""add_product_tags
+
+Revision ID: 4f8a2d6b1c39
+Revises: 7c15e0b3d9a8
+Create Date: 2026-10-18 23:37:05.184220
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4f8a2d6b1c39'
+down_revision: Union[str, None] = '7c15e0b3d9a8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 5000
+
+
+def _normalize(tags):
+    # Same rules as app.models.tag.normalize_tags at the time of this migration
+    names = (name.strip().lower()[:50] for name in (tags or "").split(","))
+    return list(dict.fromkeys(name for name in names if name))
+
+
+def upgrade() -> None:
+    tags = op.create_table('tags',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('name', sa.String(length=50), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_tags_id'), 'tags', ['id'], unique=False)
+    op.create_index(op.f('ix_tags_name'), 'tags', ['name'], unique=True)
+    product_tags = op.create_table('product_tags',
+        sa.Column('product_id', sa.Integer(), nullable=False),
+        sa.Column('tag_id', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['product_id'], ['products.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['tag_id'], ['tags.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('product_id', 'tag_id')
+    )
+    op.create_index(op.f('ix_product_tags_tag_id'), 'product_tags', ['tag_id'], unique=False)
+
+    # Backfill from products.tags, one batch of products at a time
+    bind = op.get_bind()
+    tag_ids = {}
+    last_id = 0
+    while True:
+        rows = bind.execute(
+            sa.text("SELECT id, tags FROM products WHERE id > :last_id ORDER BY id LIMIT :limit"),
+            {"last_id": last_id, "limit": BATCH_SIZE},
+        ).all()
+        if not rows:
+            break
+        last_id = rows[-1][0]
+        links = [(product_id, name) for product_id, product_tags_string in rows for name in _normalize(product_tags_string)]
+        new_names = sorted({name for _, name in links} - tag_ids.keys())
+        if new_names:
+            bind.execute(tags.insert(), [{"name": name} for name in new_names])
+            tag_ids.update(bind.execute(sa.select(tags.c.name, tags.c.id).where(tags.c.name.in_(new_names))).all())
+        if links:
+            bind.execute(product_tags.insert(), [{"product_id": product_id, "tag_id": tag_ids[name]} for product_id, name in links])
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_product_tags_tag_id'), table_name='product_tags')
+    op.drop_table('product_tags')
+    op.drop_index(op.f('ix_tags_name'), table_name='tags')
+    op.drop_index(op.f('ix_tags_id'), table_name='tags')
+    op.drop_table('tags')
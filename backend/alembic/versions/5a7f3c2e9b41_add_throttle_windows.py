@@ -0,0 +1,33 @@
+"""add_throttle_windows
+
+Revision ID: 5a7f3c2e9b41
+Revises: c4d1e7a92f10
+Create Date: 2026-10-18 11:02:17.540912
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5a7f3c2e9b41'
+down_revision: Union[str, None] = 'c4d1e7a92f10'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('throttle_windows',
+    sa.Column('key', sa.String(), nullable=False),
+    sa.Column('window_start', sa.Integer(), nullable=False),
+    sa.Column('hits', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('key', 'window_start')
+    )
+    op.create_index(op.f('ix_throttle_windows_window_start'), 'throttle_windows', ['window_start'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_throttle_windows_window_start'), table_name='throttle_windows')
+    op.drop_table('throttle_windows')
@@ -0,0 +1,41 @@
+"""add_keyset_pagination_indexes
+
+Revision ID: 7c15e0b3d9a8
+Revises: 2b9c4e7d1a53
+Create Date: 2026-10-18 22:41:52.603417
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7c15e0b3d9a8'
+down_revision: Union[str, None] = '2b9c4e7d1a53'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _has_table(name: str) -> bool:
+    return sa.inspect(op.get_bind()).has_table(name)
+
+
+def upgrade() -> None:
+    op.create_index('ix_products_category_id', 'products', ['category', 'id'], unique=False)
+    op.create_index('ix_orders_created_at_id', 'orders', ['created_at', 'id'], unique=False)
+    op.create_index('ix_orders_status_created_at_id', 'orders', ['status', 'created_at', 'id'], unique=False)
+    op.create_index(op.f('ix_order_items_order_id'), 'order_items', ['order_id'], unique=False)
+    # contact_messages has so far only been created by create_all
+    if _has_table('contact_messages'):
+        op.create_index('ix_contact_messages_created_at_id', 'contact_messages', ['created_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    if _has_table('contact_messages'):
+        op.drop_index('ix_contact_messages_created_at_id', table_name='contact_messages')
+    op.drop_index(op.f('ix_order_items_order_id'), table_name='order_items')
+    op.drop_index('ix_orders_status_created_at_id', table_name='orders')
+    op.drop_index('ix_orders_created_at_id', table_name='orders')
+    op.drop_index('ix_products_category_id', table_name='products')
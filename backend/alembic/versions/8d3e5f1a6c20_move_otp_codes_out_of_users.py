@@ -0,0 +1,49 @@
+"""move_otp_codes_out_of_users
+
+Revision ID: 8d3e5f1a6c20
+Revises: e92b6d0c4f37
+Create Date: 2026-10-18 15:40:52.602113
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8d3e5f1a6c20'
+down_revision: Union[str, None] = 'e92b6d0c4f37'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('otp_codes',
+    sa.Column('email', sa.String(), nullable=False),
+    sa.Column('code', sa.String(), nullable=False),
+    sa.Column('expires_at', sa.DateTime(), nullable=False),
+    sa.Column('attempts', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('email')
+    )
+    op.create_index(op.f('ix_otp_codes_expires_at'), 'otp_codes', ['expires_at'], unique=False)
+
+    # Carry over codes that are still pending
+    op.execute(
+        "INSERT INTO otp_codes (email, code, expires_at, attempts) "
+        "SELECT lower(email), otp_code, otp_expires_at, 0 FROM users "
+        "WHERE otp_code IS NOT NULL AND otp_expires_at > CURRENT_TIMESTAMP"
+    )
+
+    # Batch mode so SQLite can drop the columns too
+    with op.batch_alter_table('users') as batch_op:
+        batch_op.drop_column('otp_expires_at')
+        batch_op.drop_column('otp_code')
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('users') as batch_op:
+        batch_op.add_column(sa.Column('otp_code', sa.String(), nullable=True))
+        batch_op.add_column(sa.Column('otp_expires_at', sa.DateTime(), nullable=True))
+    op.drop_index(op.f('ix_otp_codes_expires_at'), table_name='otp_codes')
+    op.drop_table('otp_codes')
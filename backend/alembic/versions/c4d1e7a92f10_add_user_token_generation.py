@@ -0,0 +1,26 @@
+"""add_user_token_generation
+
+Revision ID: c4d1e7a92f10
+Revises: 6088bbff28d1
+Create Date: 2026-10-18 09:12:41.318204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4d1e7a92f10'
+down_revision: Union[str, None] = '6088bbff28d1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('users', sa.Column('token_generation', sa.Integer(), server_default='0', nullable=False))
+
+
+def downgrade() -> None:
+    op.drop_column('users', 'token_generation')
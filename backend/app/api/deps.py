@@ -1,60 +1,224 @@
-from fastapi import Depends, HTTPException, status
+import hmac
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
 from jose import JWTError
-from app.core.database import get_db
-from app.core.security import decode_token
-from app.crud import user as crud_user
+from app.core.database import (
+    get_db,
+    get_async_db,
+    read_session,
+    async_read_session,
+    recent_writers,
+    replica_router,
+)
+from app.core.config import settings
+from app.core.security import TOKEN_CLAIMS_VERSION, decode_token
+from app.core.principals import Principal, cache_principal, get_cached_principal
+from app.core.revocation import token_revocations
+from app.crud.aio import user as crud_user
 from app.models.user import User, UserRole
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/signin")
 
 
-async def get_current_user(
-    token: str = Depends(oauth2_scheme),
-    db: Session = Depends(get_db)
-) -> User:
-    """Get current authenticated user"""
-    credentials_exception = HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="Could not validate credentials",
-        headers={"WWW-Authenticate": "Bearer"},
-    )
-    
+credentials_exception = HTTPException(
+    status_code=status.HTTP_401_UNAUTHORIZED,
+    detail="Could not validate credentials",
+    headers={"WWW-Authenticate": "Bearer"},
+)
+
+
+def _decode_access_token(token: str) -> dict:
     payload = decode_token(token)
-    if payload is None:
+    if payload is None or payload.get("type") == "refresh" or payload.get("sub") is None:
+        raise credentials_exception
+    # In-memory lookup; the revocation set syncs from the database in the background
+    if "fam" in payload and token_revocations.is_family_revoked(payload["fam"]):
         raise credentials_exception
+    return payload
+
+
+def _principal_from_claims(payload: dict) -> Optional[Principal]:
+    """Principal described by a token's own claims, or None for tokens without them"""
+    if payload.get("ver") != TOKEN_CLAIMS_VERSION:
+        return None
+    try:
+        return Principal(
+            id=int(payload["uid"]),
+            email=payload["sub"],
+            role=UserRole(payload["role"]),
+            # Tokens are only issued to active users and deactivation bumps the generation
+            is_active=True,
+            token_generation=int(payload["gen"]),
+        )
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+async def principal_for_token(payload: dict, db: AsyncSession) -> Principal:
+    """Principal of a decoded access or refresh token (cached, no DB hit when warm)"""
+    email: str = payload["sub"]
+    
+    token_generation = payload.get("gen")
     
-    email: str = payload.get("sub")
-    if email is None:
+    principal = get_cached_principal(email)
+    # Reload when the token is newer than the cached entry or belongs to another account with the same
+    # email; inactive entries (deleted users included) are rechecked so a new account can reuse the email
+    if (
+        principal is None
+        or not principal.is_active
+        or (token_generation is not None and token_generation > principal.token_generation)
+        or payload.get("uid", principal.id) != principal.id
+    ):
+        principal = await crud_user.get_principal(db, email=email)
+        if principal is None:
+            raise credentials_exception
+        cache_principal(principal)
+    
+    # Reject tokens issued before a role change or deactivation
+    if token_generation is not None and token_generation != principal.token_generation:
         raise credentials_exception
     
-    user = crud_user.get_user_by_email(db, email=email)
+    return principal
+
+
+async def get_current_principal(
+    token: str = Depends(oauth2_scheme),
+    db: AsyncSession = Depends(get_async_db)
+) -> Principal:
+    """Get id, email, role and active flag of the caller"""
+    return await principal_for_token(_decode_access_token(token), db)
+
+
+async def get_current_active_principal(
+    principal: Principal = Depends(get_current_principal)
+) -> Principal:
+    """Get current active user's principal"""
+    if not principal.is_active:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Inactive user"
+        )
+    return principal
+
+
+async def get_current_admin_principal(
+    principal: Principal = Depends(get_current_active_principal)
+) -> Principal:
+    """Get current admin user's principal"""
+    if not principal.is_admin:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not enough permissions. Admin access required."
+        )
+    return principal
+
+
+async def get_read_principal(
+    token: str = Depends(oauth2_scheme),
+    db: AsyncSession = Depends(get_async_db)
+) -> Principal:
+    """Get the caller for read-only endpoints, trusting the token's claims when it has them"""
+    payload = _decode_access_token(token)
+    claimed = _principal_from_claims(payload) if settings.TRUST_TOKEN_CLAIMS else None
+    if claimed is None:
+        return await get_current_active_principal(await get_current_principal(token, db))
+    
+    # A newer generation known to this worker means the token has been revoked
+    cached = get_cached_principal(claimed.email)
+    if cached is not None and not cached.is_active:
+        # Deactivated or deleted on this worker: let the database decide
+        return await get_current_active_principal(await get_current_principal(token, db))
+    if cached is not None and cached.id == claimed.id:
+        if cached.token_generation > claimed.token_generation:
+            raise credentials_exception
+        if cached.token_generation == claimed.token_generation:
+            return cached
+    
+    return claimed
+
+
+async def get_read_admin_principal(
+    principal: Principal = Depends(get_read_principal)
+) -> Principal:
+    """Get the caller for read-only admin endpoints"""
+    if not principal.is_admin:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not enough permissions. Admin access required."
+        )
+    return principal
+
+
+async def require_operator(
+    token: str = Depends(oauth2_scheme),
+    db: AsyncSession = Depends(get_async_db)
+) -> None:
+    """Allow operational endpoints (metrics, pool stats) to the metrics token or an admin"""
+    if settings.METRICS_TOKEN and hmac.compare_digest(token.encode(), settings.METRICS_TOKEN.encode()):
+        return
+    await get_read_admin_principal(await get_read_principal(token, db))
+
+
+async def get_current_user(
+    principal: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_async_db)
+) -> User:
+    """Get current authenticated user (full row, for endpoints that need it)"""
+    user = await db.get(User, principal.id)
     if user is None:
         raise credentials_exception
-    
     return user
 
 
 async def get_current_active_user(
+    principal: Principal = Depends(get_current_active_principal),
     current_user: User = Depends(get_current_user)
 ) -> User:
     """Get current active user"""
-    if not current_user.is_active:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Inactive user"
-        )
     return current_user
 
 
 async def get_current_admin_user(
-    current_user: User = Depends(get_current_active_user)
+    principal: Principal = Depends(get_current_admin_principal),
+    current_user: User = Depends(get_current_user)
 ) -> User:
     """Get current admin user"""
-    if current_user.role != UserRole.ADMIN:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not enough permissions. Admin access required."
-        )
     return current_user
+
+
+def _request_subject(request: Request) -> Optional[str]:
+    """Token subject of the request, if it carries a valid bearer token"""
+    scheme, _, token = request.headers.get("Authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+    payload = decode_token(token)
+    return payload.get("sub") if payload else None
+
+
+def _must_read_primary(request: Request) -> bool:
+    if not replica_router.enabled:
+        return False
+    subject = _request_subject(request)
+    return subject is not None and recent_writers.is_pinned(subject)
+
+
+def get_read_db(request: Request):
+    """Read-only session, served by a replica unless the user just wrote"""
+    with read_session(use_primary=_must_read_primary(request)) as db:
+        yield db
+
+
+async def get_async_read_db(request: Request):
+    """Async read-only session, served by a replica unless the user just wrote"""
+    async with async_read_session(use_primary=_must_read_primary(request)) as db:
+        yield db
+
+
+async def pin_reads_to_primary(
+    principal: Principal = Depends(get_current_active_principal)
+):
+    """Route dependency for writes: send this user's reads to the primary for a while"""
+    yield
+    recent_writers.mark(principal.email)
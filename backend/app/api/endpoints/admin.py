@@ -5,16 +5,18 @@ from app.api import deps
 from app.crud import admin as crud_admin
 from app.schemas.user import UserResponse, UserUpdate
 from app.schemas.order import OrderResponse, OrderStatusUpdate, OrderListResponse
-from app.models.user import User
+from app.core.principals import Principal
 from app.models.order import OrderStatus, Order, PaymentStatus
+from app.core.instrumentation import query_budget
 
 router = APIRouter()
 
 
 @router.get("/stats")
+@query_budget(7)
 async def get_dashboard_stats(
-    db: Session = Depends(deps.get_db),
-    current_user: User = Depends(deps.get_current_admin_user)
+    db: Session = Depends(deps.get_read_db),
+    current_user: Principal = Depends(deps.get_read_admin_principal)
 ):
     """Get dashboard statistics (admin only)"""
     stats = crud_admin.get_dashboard_stats(db)
@@ -22,15 +24,17 @@ async def get_dashboard_stats(
 
 
 @router.get("/users")
+@query_budget(2)
 async def get_all_users(
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=100),
     search: Optional[str] = None,
-    db: Session = Depends(deps.get_db),
-    current_user: User = Depends(deps.get_current_admin_user)
+    cursor: Optional[str] = Query(None, description="next_cursor of a previous page; skip is then ignored"),
+    db: Session = Depends(deps.get_read_db),
+    current_user: Principal = Depends(deps.get_read_admin_principal)
 ):
     """Get all users with pagination (admin only)"""
-    users = crud_admin.get_all_users(db, skip=skip, limit=limit, search=search)
+    users = crud_admin.get_all_users(db, skip=skip, limit=limit, search=search, cursor=cursor)
     total = crud_admin.get_user_count(db, search=search)
     
     # Manual serialization for users
@@ -52,15 +56,16 @@ async def get_all_users(
         "users": serialized_users,
         "total": total,
         "skip": skip,
-        "limit": limit
+        "limit": limit,
+        "next_cursor": crud_admin.user_keyset.next_cursor(users, limit)
     }
 
 
 @router.get("/users/recent")
 async def get_recent_users(
     limit: int = Query(5, ge=1, le=20),
-    db: Session = Depends(deps.get_db),
-    current_user: User = Depends(deps.get_current_admin_user)
+    db: Session = Depends(deps.get_read_db),
+    current_user: Principal = Depends(deps.get_read_admin_principal)
 ):
     """Get recently registered users (admin only)"""
     # Manual serialization
@@ -80,12 +85,12 @@ async def get_recent_users(
     return serialized_users
 
 
-@router.put("/users/{user_id}", response_model=UserResponse)
+@router.put("/users/{user_id}", response_model=UserResponse, dependencies=[Depends(deps.pin_reads_to_primary)])
 async def update_user(
     user_id: int,
     user_update: UserUpdate,
     db: Session = Depends(deps.get_db),
-    current_user: User = Depends(deps.get_current_admin_user)
+    current_user: Principal = Depends(deps.get_current_admin_principal)
 ):
     """Update user details (admin only)"""
     # Prevent admin from demoting themselves
@@ -110,11 +115,11 @@ async def update_user(
     return user
 
 
-@router.delete("/users/{user_id}")
+@router.delete("/users/{user_id}", dependencies=[Depends(deps.pin_reads_to_primary)])
 async def delete_user(
     user_id: int,
     db: Session = Depends(deps.get_db),
-    current_user: User = Depends(deps.get_current_admin_user)
+    current_user: Principal = Depends(deps.get_current_admin_principal)
 ):
     """Delete user (admin only)"""
     # Prevent admin from deleting themselves
@@ -148,15 +153,17 @@ async def delete_user(
 
 
 @router.get("/orders")
+@query_budget(4)
 async def get_all_orders(
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=100),
     status: Optional[OrderStatus] = None,
-    db: Session = Depends(deps.get_db),
-    current_user: User = Depends(deps.get_current_admin_user)
+    cursor: Optional[str] = Query(None, description="next_cursor of a previous page; skip is then ignored"),
+    db: Session = Depends(deps.get_read_db),
+    current_user: Principal = Depends(deps.get_read_admin_principal)
 ):
     """Get all orders with pagination (admin only)"""
-    orders = crud_admin.get_all_orders(db, skip=skip, limit=limit, status=status)
+    orders = crud_admin.get_all_orders(db, skip=skip, limit=limit, status=status, cursor=cursor)
     total = crud_admin.get_order_count(db, status=status)
     
     # Manual serialization to ensure no Pydantic errors
@@ -199,15 +206,17 @@ async def get_all_orders(
         "orders": serialized_orders,
         "total": total,
         "skip": skip,
-        "limit": limit
+        "limit": limit,
+        "next_cursor": crud_admin.order_keyset.next_cursor(orders, limit)
     }
 
 
 @router.get("/orders/recent", response_model=List[OrderResponse])
+@query_budget(3)
 async def get_recent_orders(
     limit: int = Query(10, ge=1, le=50),
-    db: Session = Depends(deps.get_db),
-    current_user: User = Depends(deps.get_current_admin_user)
+    db: Session = Depends(deps.get_read_db),
+    current_user: Principal = Depends(deps.get_read_admin_principal)
 ):
     """Get recent orders (admin only)"""
     orders = crud_admin.get_recent_orders(db, limit=limit)
@@ -215,10 +224,11 @@ async def get_recent_orders(
 
 
 @router.get("/orders/{order_id}", response_model=OrderResponse)
+@query_budget(3)
 async def get_order(
     order_id: int,
-    db: Session = Depends(deps.get_db),
-    current_user: User = Depends(deps.get_current_admin_user)
+    db: Session = Depends(deps.get_read_db),
+    current_user: Principal = Depends(deps.get_read_admin_principal)
 ):
     """Get order details (admin only)"""
     order = crud_admin.get_order(db, order_id)
@@ -230,12 +240,12 @@ async def get_order(
     return order
 
 
-@router.put("/orders/{order_id}/status", response_model=OrderResponse)
+@router.put("/orders/{order_id}/status", response_model=OrderResponse, dependencies=[Depends(deps.pin_reads_to_primary)])
 async def update_order_status(
     order_id: int,
     status_update: OrderStatusUpdate,
     db: Session = Depends(deps.get_db),
-    current_user: User = Depends(deps.get_current_admin_user)
+    current_user: Principal = Depends(deps.get_current_admin_principal)
 ):
     """Update order status (admin only)"""
     order = crud_admin.update_order_status(
@@ -254,11 +264,11 @@ async def update_order_status(
     return order
 
 
-@router.post("/orders/{order_id}/confirm-payment", response_model=OrderResponse)
+@router.post("/orders/{order_id}/confirm-payment", response_model=OrderResponse, dependencies=[Depends(deps.pin_reads_to_primary)])
 async def confirm_payment(
     order_id: int,
     db: Session = Depends(deps.get_db),
-    current_user: User = Depends(deps.get_current_admin_user)
+    current_user: Principal = Depends(deps.get_current_admin_principal)
 ):
     """
     Confirm payment for an order (manual bank transfer)
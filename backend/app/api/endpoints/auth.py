@@ -1,21 +1,34 @@
-from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks
+from fastapi import APIRouter, Depends, HTTPException, Request, status, BackgroundTasks
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
-from datetime import timedelta, datetime
+from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import timedelta
 import random
 import string
-from app.core.database import get_db
-from app.core.security import create_access_token, create_refresh_token, decode_token
+from app.core.database import get_db, get_async_db
+from app.core.security import create_access_token, create_refresh_token, decode_token, new_token_family, token_claims
 from app.core.config import settings
 from app.schemas.auth import UserSignup, Token, PasswordChange, ForgotPassword, OTPVerify
 from app.schemas.user import UserResponse
 from app.crud import user as crud_user
-from app.api.deps import get_current_active_user
-from app.models.user import User
+from app.crud.aio import user as crud_user_aio
+from app.api.deps import get_current_active_principal, get_read_principal, principal_for_token
+from app.core.principals import Principal
+from app.core.otp import OTPResult, otp_service
+from app.core.revocation import token_revocations
+from app.core.throttle import reset_login_throttle, throttle_login
 from app.utils.email import email_service
+from app.core.instrumentation import query_budget
 
 router = APIRouter()
 
+OTP_ERRORS = {
+    OTPResult.MISSING: "No OTP verification pending",
+    OTPResult.INVALID: "Invalid OTP code",
+    OTPResult.EXPIRED: "OTP code expired",
+    OTPResult.LOCKED: "Too many invalid codes. Please request a new OTP",
+}
+
 def generate_otp(length=6):
     return ''.join(random.choices(string.digits, k=length))
 
@@ -23,13 +36,13 @@ def generate_otp(length=6):
 async def signup(
     user_data: UserSignup,
     background_tasks: BackgroundTasks,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Register a new user and send verification OTP
     """
     # Check if user already exists
-    existing_user = crud_user.get_user_by_email(db, email=user_data.email)
+    existing_user = await crud_user_aio.get_user_by_email(db, email=user_data.email)
     if existing_user:
         if existing_user.is_email_verified:
             raise HTTPException(
@@ -38,14 +51,14 @@ async def signup(
             )
         else:
             # If the user exists but is not verified, delete the old record so they can retry
-            db.delete(existing_user)
-            db.commit()
+            await db.delete(existing_user)
+            await db.commit()
     
-    # Create new user (auto-verified per requirement)
-    user = crud_user.create_user(db, user_data)
+    # Create new user (auto-verified per requirement); the password is hashed off the event loop
+    user = await crud_user_aio.create_user(db, user_data)
     user.is_email_verified = True
     user.is_active = True
-    db.commit()
+    await db.commit()
     
     # Send Welcome email instead of OTP (optional)
     # background_tasks.add_task(email_service.send_welcome_email, user.email)
@@ -56,11 +69,14 @@ async def signup(
 @router.post("/verify-otp", status_code=status.HTTP_200_OK)
 async def verify_otp(
     otp_data: OTPVerify,
+    request: Request,
     db: Session = Depends(get_db)
 ):
     """
     Verify user account with OTP
     """
+    await throttle_login(request, otp_data.email)
+    
     user = crud_user.get_user_by_email(db, email=otp_data.email)
     if not user:
         raise HTTPException(
@@ -70,29 +86,16 @@ async def verify_otp(
         
     if user.is_email_verified:
         return {"message": "Email already verified"}
-        
-    if not user.otp_code or not user.otp_expires_at:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="No OTP verification pending"
-        )
-        
-    if user.otp_code != otp_data.otp_code:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Invalid OTP code"
-        )
-        
-    if datetime.utcnow() > user.otp_expires_at:
+    
+    result = await otp_service.verify(user.email, otp_data.otp_code)
+    if result != OTPResult.VALID:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail="OTP code expired"
+            detail=OTP_ERRORS[result]
         )
         
     # Verify user
     user.is_email_verified = True
-    user.otp_code = None
-    user.otp_expires_at = None
     db.commit()
     
     return {"message": "Email verified successfully"}
@@ -119,11 +122,9 @@ async def resend_otp(
             detail="Email already verified"
         )
         
-    # Generate and save new OTP
+    # Generate and save new OTP (replaces any pending code and its attempt count)
     otp_code = generate_otp()
-    user.otp_code = otp_code
-    user.otp_expires_at = datetime.utcnow() + timedelta(minutes=5)
-    db.commit()
+    await otp_service.issue(user.email, otp_code)
     
     # Send OTP email
     email_service.send_otp_email(user.email, otp_code)
@@ -133,14 +134,18 @@ async def resend_otp(
 
 @router.post("/signin", response_model=Token)
 async def signin(
+    request: Request,
     form_data: OAuth2PasswordRequestForm = Depends(),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Login with email and password
     """
-    # Authenticate user
-    user = crud_user.authenticate_user(db, email=form_data.username, password=form_data.password)
+    # Reject brute-force attempts before spending bcrypt time on them
+    await throttle_login(request, form_data.username)
+    
+    # Authenticate user (bcrypt runs on the password hashing pool)
+    user = await crud_user_aio.authenticate_user(db, email=form_data.username, password=form_data.password)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -153,6 +158,8 @@ async def signin(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Inactive user account"
         )
+    
+    await reset_login_throttle(user.email)
         
     # Email verification check removed per requirement
     # if not user.is_email_verified and user.role != "admin": # Allow admin skip or conditional
@@ -161,15 +168,16 @@ async def signin(
     #         detail="Email not verified. Please verify your account."
     #     )
     
-    # Create access token
+    # Create access token (every token of this session shares a family id, so logout can revoke them together)
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+    claims = {**token_claims(user), "fam": new_token_family()}
     access_token = create_access_token(
-        data={"sub": user.email},
+        data=claims,
         expires_delta=access_token_expires
     )
     
     # Create refresh token
-    refresh_token = create_refresh_token(data={"sub": user.email})
+    refresh_token = create_refresh_token(data=claims)
     
     return {
         "access_token": access_token,
@@ -181,7 +189,7 @@ async def signin(
 @router.post("/refresh-token", response_model=Token)
 async def refresh_token(
     refresh_token: str,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Refresh access token using refresh token
@@ -200,17 +208,23 @@ async def refresh_token(
     if email is None:
         raise credentials_exception
     
-    user = crud_user.get_user_by_email(db, email=email)
-    if user is None or not user.is_active:
+    # Cached like access tokens; refresh tokens issued before a role change or deactivation are rejected too
+    principal = await principal_for_token(payload, db)
+    if not principal.is_active:
+        raise credentials_exception
+    
+    # Each refresh token works once; presenting a used one revokes its whole family
+    if not await token_revocations.rotate(payload):
         raise credentials_exception
     
-    # Create new tokens
+    # Create new tokens in the same family
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+    claims = {**token_claims(principal), "fam": payload.get("fam") or new_token_family()}
     new_access_token = create_access_token(
-        data={"sub": user.email},
+        data=claims,
         expires_delta=access_token_expires
     )
-    new_refresh_token = create_refresh_token(data={"sub": user.email})
+    new_refresh_token = create_refresh_token(data=claims)
     
     return {
         "access_token": new_access_token,
@@ -219,16 +233,33 @@ async def refresh_token(
     }
 
 
+@router.post("/logout")
+async def logout(refresh_token: str):
+    """
+    Revoke the session's refresh token and every access token issued with it
+    """
+    payload = decode_token(refresh_token)
+    if payload is None or payload.get("type") != "refresh":
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    
+    await token_revocations.logout(payload)
+    return {"message": "Logged out successfully"}
+
+
 @router.post("/change-password")
 async def change_password(
     password_data: PasswordChange,
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(get_current_active_principal),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Change user password
     """
-    success = crud_user.change_password(
+    success = await crud_user_aio.change_password(
         db,
         user_id=current_user.id,
         current_password=password_data.current_password,
@@ -263,10 +294,12 @@ async def forgot_password(
 
 
 @router.get("/me", response_model=UserResponse)
+@query_budget(2)
 async def get_current_user_info(
-    current_user: User = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_read_principal),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Get current user information
     """
-    return current_user
+    return await crud_user_aio.get_user_by_id(db, current_user.id, with_addresses=True)
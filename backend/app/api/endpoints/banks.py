@@ -5,7 +5,7 @@ from app.core.database import get_db
 from app.api import deps
 from app.schemas.bank import BankAccountCreate, BankAccountUpdate, BankAccountResponse
 from app.crud import bank as crud_bank
-from app.models.user import User
+from app.core.principals import Principal
 
 router = APIRouter()
 
@@ -21,7 +21,7 @@ async def get_banks(
 @router.get("/all", response_model=List[BankAccountResponse])
 async def get_all_banks_admin(
     db: Session = Depends(get_db),
-    current_user: User = Depends(deps.get_current_admin_user)
+    current_user: Principal = Depends(deps.get_read_admin_principal)
 ):
     """
     Get all bank accounts including inactive ones (Admin only)
@@ -32,7 +32,7 @@ async def get_all_banks_admin(
 async def create_bank(
     bank_in: BankAccountCreate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(deps.get_current_admin_user)
+    current_user: Principal = Depends(deps.get_current_admin_principal)
 ):
     """
     Create a new bank account (Admin only)
@@ -44,7 +44,7 @@ async def update_bank(
     bank_id: int,
     bank_in: BankAccountUpdate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(deps.get_current_admin_user)
+    current_user: Principal = Depends(deps.get_current_admin_principal)
 ):
     """
     Update a bank account (Admin only)
@@ -61,7 +61,7 @@ async def update_bank(
 async def delete_bank(
     bank_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(deps.get_current_admin_user)
+    current_user: Principal = Depends(deps.get_current_admin_principal)
 ):
     """
     Delete a bank account (Admin only)
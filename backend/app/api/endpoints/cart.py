@@ -1,21 +1,24 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.api import deps
-from app.crud import cart as crud_cart
+from app.crud.aio import cart as crud_cart
 from app.schemas.cart import CartItemCreate, CartItemUpdate, CartResponse, CartItemResponse
-from app.models.user import User
+from app.core.principals import Principal
+from app.core.instrumentation import query_budget
 
 router = APIRouter()
 
 
 @router.get("/", response_model=CartResponse)
+# Principal on a cold cache, the cart, its items and their products; a first visit inserts the cart and reads it back
+@query_budget(5)
 async def get_cart(
-    db: Session = Depends(deps.get_db),
-    current_user: User = Depends(deps.get_current_active_user)
+    db: AsyncSession = Depends(deps.get_async_db),
+    current_user: Principal = Depends(deps.get_current_active_principal)
 ):
-    """Get current user's cart"""
-    cart = crud_cart.get_or_create_cart(db, current_user.id)
-    totals = crud_cart.get_cart_total(db, current_user.id)
+    """Get current user's cart (creates it on first use, so not a claims-only read)"""
+    cart = await crud_cart.get_or_create_cart(db, current_user.id)
+    totals = crud_cart.get_cart_total(cart)
     
     
     
@@ -26,15 +29,15 @@ async def get_cart(
     }
 
 
-@router.post("/items", response_model=CartItemResponse)
+@router.post("/items", response_model=CartItemResponse, dependencies=[Depends(deps.pin_reads_to_primary)])
 async def add_to_cart(
     item: CartItemCreate,
-    db: Session = Depends(deps.get_db),
-    current_user: User = Depends(deps.get_current_active_user)
+    db: AsyncSession = Depends(deps.get_async_db),
+    current_user: Principal = Depends(deps.get_current_active_principal)
 ):
     """Add item to cart"""
     try:
-        cart_item = crud_cart.add_item_to_cart(
+        cart_item = await crud_cart.add_item_to_cart(
             db,
             current_user.id,
             item.product_id,
@@ -51,15 +54,15 @@ async def add_to_cart(
         )
 
 
-@router.put("/items/{item_id}", response_model=CartItemResponse)
+@router.put("/items/{item_id}", response_model=CartItemResponse, dependencies=[Depends(deps.pin_reads_to_primary)])
 async def update_cart_item(
     item_id: int,
     item_update: CartItemUpdate,
-    db: Session = Depends(deps.get_db),
-    current_user: User = Depends(deps.get_current_active_user)
+    db: AsyncSession = Depends(deps.get_async_db),
+    current_user: Principal = Depends(deps.get_current_active_principal)
 ):
     """Update cart item quantity"""
-    cart_item = crud_cart.update_cart_item(
+    cart_item = await crud_cart.update_cart_item(
         db,
         current_user.id,
         item_id,
@@ -77,14 +80,14 @@ async def update_cart_item(
     return cart_item
 
 
-@router.delete("/items/{item_id}")
+@router.delete("/items/{item_id}", dependencies=[Depends(deps.pin_reads_to_primary)])
 async def remove_from_cart(
     item_id: int,
-    db: Session = Depends(deps.get_db),
-    current_user: User = Depends(deps.get_current_active_user)
+    db: AsyncSession = Depends(deps.get_async_db),
+    current_user: Principal = Depends(deps.get_current_active_principal)
 ):
     """Remove item from cart"""
-    success = crud_cart.remove_cart_item(db, current_user.id, item_id)
+    success = await crud_cart.remove_cart_item(db, current_user.id, item_id)
     
     if not success:
         raise HTTPException(
@@ -95,11 +98,11 @@ async def remove_from_cart(
     return {"message": "Item removed from cart"}
 
 
-@router.delete("/")
+@router.delete("/", dependencies=[Depends(deps.pin_reads_to_primary)])
 async def clear_cart(
-    db: Session = Depends(deps.get_db),
-    current_user: User = Depends(deps.get_current_active_user)
+    db: AsyncSession = Depends(deps.get_async_db),
+    current_user: Principal = Depends(deps.get_current_active_principal)
 ):
     """Clear all items from cart"""
-    crud_cart.clear_cart(db, current_user.id)
+    await crud_cart.clear_cart(db, current_user.id)
     return {"message": "Cart cleared"}
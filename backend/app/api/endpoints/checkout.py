@@ -1,23 +1,28 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy import delete, insert
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Any
-from app.core.database import get_db
-from app.api.deps import get_current_active_user
+from app.core.database import get_async_db
+from app.api.deps import get_current_active_user, pin_reads_to_primary
+from app.crud.aio import cart as crud_cart
 from app.models.user import User
-from app.models.cart import Cart
+from app.models.cart import CartItem
 from app.models.order import Order, OrderItem, OrderStatus, PaymentStatus
 from app.schemas.order import OrderCreateFromCart, OrderItemResponse
 from app.utils.email import email_service
 import json
+import time
 import httpx
+from app.core.catalog import catalog_cache
 from app.core.config import settings
+from app.core.metrics import PAYSTACK_REQUEST_SECONDS
 from app.models.order import PaymentMethod
 
 router = APIRouter()
 
 async def verify_paystack_payment(reference: str) -> bool:
     """Verify payment with Paystack API"""
-    url = f"https://api.paystack.co/transaction/verify/{reference}"
+    url = f"{settings.PAYSTACK_BASE_URL}/transaction/verify/{reference}"
     headers = {
         "Authorization": f"Bearer {settings.PAYSTACK_SECRET_KEY}",
         "Content-Type": "application/json",
@@ -26,20 +31,26 @@ async def verify_paystack_payment(reference: str) -> bool:
     print(f"DEBUG: Verifying Paystack Ref: {reference}")
     print(f"DEBUG: Using Secret Key: {settings.PAYSTACK_SECRET_KEY[:5]}***") # PARTIAL LOGGING FOR SAFETY
 
+    outcome = "error"
+    start = time.perf_counter()
     async with httpx.AsyncClient() as client:
         try:
             response = await client.get(url, headers=headers)
             print(f"DEBUG: Paystack Response Status: {response.status_code}")
             print(f"DEBUG: Paystack Response Body: {response.text}")
             
+            outcome = "declined"
             if response.status_code == 200:
                 data = response.json()
                 if data.get("status") is True and data.get("data", {}).get("status") == "success":
+                    outcome = "success"
                     return True
             return False
         except Exception as e:
             print(f"DEBUG: Error verifying payment: {e}")
             return False
+        finally:
+            PAYSTACK_REQUEST_SECONDS.labels("verify", outcome).observe(time.perf_counter() - start)
 
 def calculate_delivery_fee(address_data: dict, subtotal: float) -> float:
     """
@@ -64,17 +75,17 @@ def calculate_delivery_fee(address_data: dict, subtotal: float) -> float:
     return 3500.0
 
 
-@router.post("/place-order", status_code=status.HTTP_201_CREATED)
+@router.post("/place-order", status_code=status.HTTP_201_CREATED, dependencies=[Depends(pin_reads_to_primary)])
 async def place_order(
     order_in: OrderCreateFromCart,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Place an order from the current user's cart
     """
-    # 1. Get user's cart
-    cart = db.query(Cart).filter(Cart.user_id == current_user.id).first()
+    # 1. Get user's cart (items and products are eager-loaded)
+    cart = await crud_cart.get_cart(db, current_user.id)
     if not cart or not cart.items:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -126,20 +137,20 @@ async def place_order(
         notes=order_in.notes
     )
     db.add(order)
-    db.flush() # Flush to get order ID
+    await db.flush() # Flush to get order ID
     
-    # 4. Create Order Items
+    # 4. Create Order Items (inserted below in one executemany)
     order_items_data = []
+    order_item_rows = []
     for cart_item in cart.items:
-        order_item = OrderItem(
-            order_id=order.id,
-            product_id=str(cart_item.product_id),
-            product_name=cart_item.product.name,
-            product_image=cart_item.product.image_url,
-            price=cart_item.price_at_addition,
-            quantity=cart_item.quantity
-        )
-        db.add(order_item)
+        order_item_rows.append({
+            "order_id": order.id,
+            "product_id": str(cart_item.product_id),
+            "product_name": cart_item.product.name,
+            "product_image": cart_item.product.image_url,
+            "price": cart_item.price_at_addition,
+            "quantity": cart_item.quantity
+        })
         
         # Decrement product stock quantity
         product = cart_item.product
@@ -147,6 +158,7 @@ async def place_order(
             product.stock_quantity -= cart_item.quantity
         else:
             # Optional: Handle insufficient stock (though this should be validated earlier)
+            await db.rollback()
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail=f"Insufficient stock for {product.name}"
@@ -159,24 +171,13 @@ async def place_order(
             "price": cart_item.price_at_addition
         })
     
-    # 5. Clear Cart
-    db.query(Cart).filter(Cart.user_id == current_user.id).delete()
-    # Also need to delete items if delete cascade isn't perfect, but usually it is if specific
-    # Actually removing the cart itself might be aggressive if we want to keep persistent cart ID, 
-    # but the usual pattern is empting items. 
-    # Let's just remove items.
-    # db.query(CartItem).filter(CartItem.cart_id == cart.id).delete() 
-    # Re-reading logic: The cart object usually stays. 
-    # Let's verify relationships. user.addresses... 
-    # In endpoints/cart.py verify clear_cart implementation:
-    # crud_cart.clear_cart(db, current_user.id)
-    # So I should use that or manual delete.
-    # Let's use manual delete of items for now to be safe.
-    from app.models.cart import CartItem
-    db.query(CartItem).filter(CartItem.cart_id == cart.id).delete()
+    await db.execute(insert(OrderItem), order_item_rows)
+    
+    # 5. Clear Cart (the cart row itself is kept, like crud_cart.clear_cart)
+    await db.execute(delete(CartItem).where(CartItem.cart_id == cart.id))
     
-    db.commit()
-    db.refresh(order)
+    await db.commit()
+    catalog_cache.stock_changed(item.product_id for item in cart.items)
     
     # 6. Send Email
     email_data = {
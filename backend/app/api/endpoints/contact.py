@@ -1,14 +1,18 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from app.api import deps
 from app.core.database import get_db
 from app.models.contact import ContactMessage
-from app.models.user import User
+from app.core.pagination import NEXT_CURSOR_HEADER, Keyset
+from app.core.principals import Principal
 from app.schemas.contact import ContactCreate, ContactResponse
 
 router = APIRouter()
 
+# Newest messages first
+message_keyset = Keyset("contact_messages", ContactMessage.created_at, ContactMessage.id, descending=True)
+
 @router.post("/", response_model=ContactResponse, status_code=status.HTTP_201_CREATED)
 async def create_contact_message(
     contact_in: ContactCreate,
@@ -29,22 +33,29 @@ async def create_contact_message(
 
 @router.get("/", response_model=List[ContactResponse])
 async def get_contact_messages(
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description=f"Resume after a previous page (its {NEXT_CURSOR_HEADER} header); skip is then ignored"),
     db: Session = Depends(get_db),
-    current_user: User = Depends(deps.get_current_admin_user)
+    current_user: Principal = Depends(deps.get_read_admin_principal)
 ):
     """
     Get all contact messages (Admin only)
     """
-    messages = db.query(ContactMessage).order_by(ContactMessage.created_at.desc()).offset(skip).limit(limit).all()
+    if cursor is not None:
+        skip = 0
+    messages = message_keyset.after(db.query(ContactMessage), cursor).offset(skip).limit(limit).all()
+    next_cursor = message_keyset.next_cursor(messages, limit)
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
     return messages
 
 @router.put("/{message_id}/read", response_model=ContactResponse)
 async def mark_message_as_read(
     message_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(deps.get_current_admin_user)
+    current_user: Principal = Depends(deps.get_current_admin_principal)
 ):
     """
     Mark a message as read (Admin only)
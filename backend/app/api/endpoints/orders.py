@@ -1,26 +1,33 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
 from typing import List
-from app.core.database import get_db
+from app.core.database import get_async_db
 from app.api import deps
-from app.models.user import User
+from app.core.principals import Principal
 from app.models.order import Order, OrderStatus, PaymentStatus
 from app.schemas.order import OrderResponse
+from app.core.instrumentation import query_budget
 
 router = APIRouter()
 
 @router.get("/")
+@query_budget(2)
 async def get_my_orders(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(deps.get_current_active_user)
+    db: AsyncSession = Depends(deps.get_async_read_db),
+    current_user: Principal = Depends(deps.get_read_principal)
 ):
     """
     Get all orders for current user
     """
-    orders = db.query(Order).filter(
-        Order.user_id == current_user.id,
-        Order.is_user_deleted == False
-    ).order_by(Order.created_at.desc()).all()
+    result = await db.execute(
+        select(Order)
+        .where(Order.user_id == current_user.id, Order.is_user_deleted == False)
+        .options(selectinload(Order.items))
+        .order_by(Order.created_at.desc())
+    )
+    orders = result.scalars().all()
     serialized_orders = []
     for order in orders:
         items = []
@@ -51,15 +58,21 @@ async def get_my_orders(
     return serialized_orders
 
 @router.get("/{order_id}")
+@query_budget(2)
 async def get_my_order(
     order_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(deps.get_current_active_user)
+    db: AsyncSession = Depends(deps.get_async_read_db),
+    current_user: Principal = Depends(deps.get_read_principal)
 ):
     """
     Get specific order details
     """
-    order = db.query(Order).filter(Order.id == order_id, Order.user_id == current_user.id).first()
+    result = await db.execute(
+        select(Order)
+        .where(Order.id == order_id, Order.user_id == current_user.id)
+        .options(selectinload(Order.items))
+    )
+    order = result.scalars().first()
     if not order:
         raise HTTPException(status_code=404, detail="Order not found")
         
@@ -89,16 +102,19 @@ async def get_my_order(
         "items": items
     }
 
-@router.post("/{order_id}/mark-paid")
+@router.post("/{order_id}/mark-paid", dependencies=[Depends(deps.pin_reads_to_primary)])
 async def mark_order_as_paid(
     order_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(deps.get_current_active_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(deps.get_current_active_principal)
 ):
     """
     Mark an order as paid (User action for Bank Transfer)
     """
-    order = db.query(Order).filter(Order.id == order_id, Order.user_id == current_user.id).first()
+    result = await db.execute(
+        select(Order).where(Order.id == order_id, Order.user_id == current_user.id)
+    )
+    order = result.scalars().first()
     if not order:
         raise HTTPException(status_code=404, detail="Order not found")
     
@@ -106,21 +122,23 @@ async def mark_order_as_paid(
         raise HTTPException(status_code=400, detail="Order payment status cannot be updated")
         
     order.payment_status = PaymentStatus.AWAITING_VERIFICATION
-    db.commit()
-    db.refresh(order)
+    await db.commit()
     return {"message": "Order marked as paid. Awaiting verification.", "status": order.payment_status}
 
-@router.delete("/clear-history")
+@router.delete("/clear-history", dependencies=[Depends(deps.pin_reads_to_primary)])
 async def clear_order_history(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(deps.get_current_active_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(deps.get_current_active_principal)
 ):
     """
     Clear order history for current user (Soft Delete)
     """
-    db.query(Order).filter(
-        Order.user_id == current_user.id
-    ).update({Order.is_user_deleted: True}, synchronize_session=False)
+    await db.execute(
+        update(Order)
+        .where(Order.user_id == current_user.id)
+        .values(is_user_deleted=True)
+        .execution_options(synchronize_session=False)
+    )
     
-    db.commit()
+    await db.commit()
     return {"message": "Order history cleared"}
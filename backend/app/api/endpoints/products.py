@@ -1,94 +1,258 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
-from typing import List, Optional
+import io
+from fastapi import APIRouter, Depends, File, Header, HTTPException, status, Query, Response, UploadFile
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import BinaryIO, List, Optional
 from app.api import deps
-from app.crud import product as crud_product
-from app.schemas.product import ProductCreate, ProductUpdate, ProductResponse
+from app.crud.aio import product as crud_product
+from app.schemas.product import (
+    FacetsResponse, HomeResponse, PriceBucketCount, ProductBulkPatch, ProductCreate, ProductImportResponse, ProductSuggestion, ProductUpdate, ProductResponse
+)
 from app.models.product import ProductCategory
-from app.models.user import User
+from app.models.tag import normalize_tag
+from app.core.catalog import CatalogEntry, CatalogView, catalog_cache, etag_matches
+from app.core import product_io
+from app.core.config import settings
+from app.core.database import SessionLocal, read_session
+from app.core.home import home_snapshot
+from app.core.pagination import NEXT_CURSOR_HEADER
+from app.core.principals import Principal
+from app.core.suggest import suggest_index
+from app.core.instrumentation import query_budget
 
 router = APIRouter()
 
+# Edges of the price facet's buckets, ascending
+PRICE_BOUNDS = sorted(float(bound) for bound in settings.CATALOG_FACET_PRICE_BOUNDS.split(",") if bound.strip())
+
+
+def _respond(entry: CatalogEntry, if_none_match: Optional[str]) -> Response:
+    """The cached body, or 304 if the client already has it"""
+    headers = {
+        "ETag": entry.etag,
+        "Cache-Control": f"public, max-age={settings.CATALOG_HTTP_MAX_AGE_SECONDS}, must-revalidate",
+    }
+    if entry.next_cursor:
+        headers[NEXT_CURSOR_HEADER] = entry.next_cursor
+    if etag_matches(if_none_match, entry.etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    # Bodies come from the catalog cache already serialized as ProductResponse
+    return Response(content=entry.body, media_type="application/json", headers=headers)
+
 
 # Public endpoints
 @router.get("/", response_model=List[ProductResponse])
+@query_budget(1)
 async def get_products(
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=100),
     category: Optional[ProductCategory] = None,
     search: Optional[str] = Query(None),
-    db: Session = Depends(deps.get_db)
+    cursor: Optional[str] = Query(None, description=f"Resume after a previous page (its {NEXT_CURSOR_HEADER} header); skip is then ignored"),
+    tag: Optional[str] = Query(None),
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(deps.get_async_read_db)
 ):
     """Get all active products"""
-    products = crud_product.get_products(db, skip=skip, limit=limit, category=category, search=search)
-    return products
+    view = CatalogView("all", limit, skip, category, search, cursor, tag)
+    entry = await catalog_cache.listing(
+        view,
+        lambda: crud_product.get_products(
+            db, skip=skip, limit=limit, category=category, search=search, cursor=cursor, tag=tag
+        ),
+        lambda products: crud_product.next_products_cursor(products, limit, skip, search, cursor),
+    )
+    return _respond(entry, if_none_match)
 
 
 @router.get("/popular", response_model=List[ProductResponse])
+@query_budget(1)
 async def get_popular_products(
     limit: int = Query(10, ge=1, le=50),
-    db: Session = Depends(deps.get_db)
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(deps.get_async_read_db)
 ):
     """Get popular products for homepage"""
-    products = crud_product.get_popular_products(db, limit=limit)
-    return products
+    view = CatalogView("popular", limit)
+    entry = await catalog_cache.listing(view, lambda: crud_product.get_popular_products(db, limit=limit))
+    return _respond(entry, if_none_match)
 
 
 @router.get("/special", response_model=List[ProductResponse])
+@query_budget(1)
 async def get_special_products(
     limit: int = Query(10, ge=1, le=50),
-    db: Session = Depends(deps.get_db)
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(deps.get_async_read_db)
 ):
     """Get special products for homepage"""
-    products = crud_product.get_special_products(db, limit=limit)
-    return products
+    view = CatalogView("special", limit)
+    entry = await catalog_cache.listing(view, lambda: crud_product.get_special_products(db, limit=limit))
+    return _respond(entry, if_none_match)
 
 
 @router.get("/offers", response_model=List[ProductResponse])
+@query_budget(1)
 async def get_offer_products(
     limit: int = Query(10, ge=1, le=50),
-    db: Session = Depends(deps.get_db)
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(deps.get_async_read_db)
 ):
     """Get offer products for homepage"""
-    products = crud_product.get_offer_products(db, limit=limit)
-    return products
+    view = CatalogView("offers", limit)
+    entry = await catalog_cache.listing(view, lambda: crud_product.get_offer_products(db, limit=limit))
+    return _respond(entry, if_none_match)
+
+
+@router.get("/home", response_model=HomeResponse)
+@query_budget(0)
+async def get_home(if_none_match: Optional[str] = Header(None)):
+    """Popular, special and offer sections, the first menu page and per-category counts in one call"""
+    return _respond(await home_snapshot.get(), if_none_match)
+
+
+@router.get("/suggest", response_model=List[ProductSuggestion])
+@query_budget(0)
+async def suggest_products(
+    q: str = Query(..., min_length=1, max_length=100),
+    limit: int = Query(8, ge=1, le=20),
+    category: Optional[ProductCategory] = None
+):
+    """Typeahead: active products with a name word or tag starting with each word of q"""
+    suggestions = await suggest_index.suggest(q, limit, category)
+    return [{"id": product.id, "name": product.name, "category": product.category} for product in suggestions]
+
+
+@router.get("/facets", response_model=FacetsResponse)
+@query_budget(1)
+async def get_facets(
+    category: Optional[ProductCategory] = None,
+    search: Optional[str] = Query(None),
+    tag: Optional[str] = Query(None),
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(deps.get_async_read_db)
+):
+    """Active product counts per category, tag and price bucket under the listing's filters"""
+    async def load() -> bytes:
+        categories, tags, buckets = await crud_product.get_facets(db, category, tag, search, PRICE_BOUNDS)
+        edges = [0.0, *PRICE_BOUNDS, None]
+        return FacetsResponse(
+            total=sum(categories.values()),
+            categories=categories,
+            tags=dict(sorted(tags.items(), key=lambda item: (-item[1], item[0]))),
+            price_buckets=[
+                PriceBucketCount(min=edges[index], max=edges[index + 1], count=buckets.get(index, 0))
+                for index in range(len(PRICE_BOUNDS) + 1)
+            ],
+        ).model_dump_json().encode()
+
+    view = (category, normalize_tag(tag) if tag else None, search)
+    return _respond(await catalog_cache.facets(view, load), if_none_match)
+
+
+# Admin bulk import/export, declared before /{product_id} so their paths are not read as ids
+def _import_file(raw: BinaryIO, format: str) -> ProductImportResponse:
+    text = io.TextIOWrapper(raw, encoding="utf-8-sig", newline="")
+    try:
+        with SessionLocal() as db:
+            return product_io.import_products(db, text, format)
+    finally:
+        text.detach()
 
 
+@router.post("/import", response_model=ProductImportResponse, dependencies=[Depends(deps.pin_reads_to_primary)])
+async def import_products(
+    file: UploadFile = File(...),
+    format: Optional[str] = Query(None, description="csv or ndjson; taken from the file extension if omitted"),
+    current_user: Principal = Depends(deps.get_current_admin_principal)
+):
+    """Create or update products from a CSV or NDJSON file, matched on sku (admin only)"""
+    format = format or product_io.guess_format(file.filename)
+    if format not in product_io.FORMATS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Format must be csv or ndjson"
+        )
+    try:
+        # Blocking file and database work, off the event loop
+        return await run_in_threadpool(_import_file, file.file, format)
+    except UnicodeDecodeError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="File must be UTF-8 (rows before the invalid bytes were imported)"
+        )
+    finally:
+        # Batches are committed as they go, so clear even after a failure
+        catalog_cache.clear()
+
+
+@router.get("/export")
+async def export_products(
+    format: str = Query("csv", pattern="^(csv|ndjson)$"),
+    current_user: Principal = Depends(deps.get_read_admin_principal)
+):
+    """Every product as CSV or NDJSON, in the import format (admin only)"""
+    def chunks():
+        # Opened here: the response is streamed after dependencies have exited
+        with read_session() as db:
+            yield from product_io.export_products(db, format)
+
+    return StreamingResponse(
+        chunks(),
+        media_type="text/csv" if format == "csv" else "application/x-ndjson",
+        headers={"Content-Disposition": f'attachment; filename="products.{format}"'},
+    )
+
+
+# Product detail
 @router.get("/{product_id}", response_model=ProductResponse)
+@query_budget(1)
 async def get_product(
     product_id: int,
-    db: Session = Depends(deps.get_db)
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(deps.get_async_read_db)
 ):
     """Get product by ID"""
-    product = crud_product.get_product(db, product_id)
-    if not product:
+    entry = await catalog_cache.product(product_id, lambda: crud_product.get_product(db, product_id))
+    if entry is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Product not found"
         )
-    return product
+    return _respond(entry, if_none_match)
 
 
 # Admin endpoints
-@router.post("/", response_model=ProductResponse)
+@router.post("/", response_model=ProductResponse, dependencies=[Depends(deps.pin_reads_to_primary)])
 async def create_product(
     product: ProductCreate,
-    db: Session = Depends(deps.get_db),
-    current_user: User = Depends(deps.get_current_admin_user)
+    db: AsyncSession = Depends(deps.get_async_db),
+    current_user: Principal = Depends(deps.get_current_admin_principal)
 ):
     """Create a new product (admin only)"""
-    return crud_product.create_product(db, product)
+    return await crud_product.create_product(db, product)
+
+
+@router.patch("/", response_model=List[ProductResponse], dependencies=[Depends(deps.pin_reads_to_primary)])
+async def bulk_update_products(
+    patch: ProductBulkPatch,
+    db: AsyncSession = Depends(deps.get_async_db),
+    current_user: Principal = Depends(deps.get_current_admin_principal)
+):
+    """Set fields, shift stock or change prices on many products at once; returns the updated products (admin only)"""
+    return await crud_product.bulk_update_products(db, patch)
 
 
-@router.put("/{product_id}", response_model=ProductResponse)
+@router.put("/{product_id}", response_model=ProductResponse, dependencies=[Depends(deps.pin_reads_to_primary)])
 async def update_product(
     product_id: int,
     product_update: ProductUpdate,
-    db: Session = Depends(deps.get_db),
-    current_user: User = Depends(deps.get_current_admin_user)
+    db: AsyncSession = Depends(deps.get_async_db),
+    current_user: Principal = Depends(deps.get_current_admin_principal)
 ):
     """Update a product (admin only)"""
-    product = crud_product.update_product(db, product_id, product_update)
+    product = await crud_product.update_product(db, product_id, product_update)
     if not product:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -97,14 +261,14 @@ async def update_product(
     return product
 
 
-@router.delete("/{product_id}")
+@router.delete("/{product_id}", dependencies=[Depends(deps.pin_reads_to_primary)])
 async def delete_product(
     product_id: int,
-    db: Session = Depends(deps.get_db),
-    current_user: User = Depends(deps.get_current_admin_user)
+    db: AsyncSession = Depends(deps.get_async_db),
+    current_user: Principal = Depends(deps.get_current_admin_principal)
 ):
     """Delete a product (admin only)"""
-    success = crud_product.delete_product(db, product_id)
+    success = await crud_product.delete_product(db, product_id)
     if not success:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
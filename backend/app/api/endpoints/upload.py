@@ -6,10 +6,7 @@ from typing import List
 
 router = APIRouter()
 
-UPLOAD_DIR = "app/static/uploads"
-
-# Ensure upload directory exists
-os.makedirs(UPLOAD_DIR, exist_ok=True)
+UPLOAD_DIR = "app/static/uploads"  # Created by app.main.create_app()
 
 @router.post("/", response_model=dict)
 async def upload_image(file: UploadFile = File(...)):
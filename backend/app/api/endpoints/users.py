@@ -1,28 +1,31 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
-from app.core.database import get_db
+from app.core.database import get_db, get_async_db
 from app.schemas.user import UserResponse, UserUpdate, AddressCreate, AddressResponse
 from app.schemas.order import OrderResponse
 from app.crud import user as crud_user
-from app.api.deps import get_current_active_user
-from app.models.user import User
+from app.crud.aio import user as crud_user_aio
+from app.api.deps import get_current_active_principal, get_read_principal
+from app.core.principals import Principal
 
 router = APIRouter()
 
 
 @router.get("/me", response_model=UserResponse)
 async def get_profile(
-    current_user: User = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_read_principal),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get current user profile"""
-    return current_user
+    return await crud_user_aio.get_user_by_id(db, current_user.id, with_addresses=True)
 
 
 @router.put("/me", response_model=UserResponse)
 async def update_profile(
     user_update: UserUpdate,
-    current_user: User = Depends(get_current_active_user),
+    current_user: Principal = Depends(get_current_active_principal),
     db: Session = Depends(get_db)
 ):
     """Update user profile"""
@@ -37,7 +40,7 @@ async def update_profile(
 
 @router.get("/addresses", response_model=List[AddressResponse])
 async def get_addresses(
-    current_user: User = Depends(get_current_active_user),
+    current_user: Principal = Depends(get_read_principal),
     db: Session = Depends(get_db)
 ):
     """Get all user addresses"""
@@ -47,7 +50,7 @@ async def get_addresses(
 @router.post("/addresses", response_model=AddressResponse, status_code=status.HTTP_201_CREATED)
 async def create_address(
     address: AddressCreate,
-    current_user: User = Depends(get_current_active_user),
+    current_user: Principal = Depends(get_current_active_principal),
     db: Session = Depends(get_db)
 ):
     """Create a new address"""
@@ -57,7 +60,7 @@ async def create_address(
 @router.delete("/addresses/{address_id}")
 async def delete_address(
     address_id: int,
-    current_user: User = Depends(get_current_active_user),
+    current_user: Principal = Depends(get_current_active_principal),
     db: Session = Depends(get_db)
 ):
     """Delete an address"""
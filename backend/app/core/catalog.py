@@ -0,0 +1,269 @@
+import hashlib
+import threading
+import time
+from typing import Awaitable, Callable, Dict, Iterable, List, NamedTuple, Optional, Set
+from pydantic import TypeAdapter
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.metrics import Counter
+from app.models.product import ProductCategory
+from app.models.tag import normalize_tag, normalize_tags
+from app.schemas.product import ProductResponse
+
+# Fields that decide which listings a product appears in
+MEMBERSHIP_FIELDS = (
+    "category", "is_active", "is_popular", "is_special", "is_offer", "name", "description", "tags"
+)
+
+# Listing section -> the flag a product needs to be in it ("all" has none)
+SECTION_FLAGS = {"all": None, "popular": "is_popular", "special": "is_special", "offers": "is_offer"}
+
+_product_adapter = TypeAdapter(ProductResponse)
+_listing_adapter = TypeAdapter(List[ProductResponse])
+
+
+class CatalogEntry(NamedTuple):
+    """A serialized response, its strong ETag (a digest of the body) and the next page's cursor"""
+
+    body: bytes
+    etag: str
+    next_cursor: Optional[str] = None
+
+    @classmethod
+    def of(cls, body: bytes, next_cursor: Optional[str] = None) -> "CatalogEntry":
+        return cls(body, '"%s"' % hashlib.blake2b(body, digest_size=16).hexdigest(), next_cursor)
+
+
+class CatalogView(NamedTuple):
+    """One cached product listing: a section plus its filters and page"""
+
+    section: str
+    limit: int
+    skip: int = 0
+    category: Optional[ProductCategory] = None
+    search: Optional[str] = None
+    cursor: Optional[str] = None
+    tag: Optional[str] = None
+
+    def matches(self, state: dict) -> bool:
+        """Whether a product in this state satisfies the listing's filters (ignoring the page)"""
+        if not state.get("is_active"):
+            return False
+        flag = SECTION_FLAGS[self.section]
+        if flag is not None and not state.get(flag):
+            return False
+        if self.category is not None and state.get("category") != self.category:
+            return False
+        if self.tag is not None and normalize_tag(self.tag) not in normalize_tags(state.get("tags")):
+            return False
+        # Search results depend on stemming and prefix matching in the database's
+        # full-text index, so any product passing the other filters may be among them
+        return True
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match check (weak comparison, as RFC 9110 requires for it)"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return any(tag.strip().removeprefix("W/") == etag for tag in if_none_match.split(","))
+
+
+def product_state(product) -> dict:
+    """Snapshot of a product's listing-relevant fields, taken before and after a write"""
+    return {field: getattr(product, field) for field in MEMBERSHIP_FIELDS}
+
+
+class CatalogCache:
+    """Serialized product JSON for the public catalog endpoints.
+
+    Entries are response bodies with their ETag, so a hit skips the query,
+    the pydantic serialization and hashing. Writes invalidate precisely: a product's detail entry, the
+    listings that currently contain it (tracked per entry), and the listings
+    whose filters it matched before or after the write. A stock change only
+    touches the first two. Each worker has its own cache, so writes made
+    through another worker are picked up within `ttl` seconds.
+
+    With read replicas, loads right after a write may still see the old row,
+    so nothing is stored for `settle_seconds` after each write.
+    """
+
+    def __init__(self, maxsize: int, ttl: float, settle_seconds: float = 0.0):
+        self.enabled = maxsize > 0
+        self.entries = TTLCache("catalog", maxsize=max(maxsize, 1), ttl=ttl)
+        self.invalidations = Counter()
+        # Bumped on every write, so a load that raced with a write is not stored
+        self.version = 0
+        self.settle_seconds = settle_seconds
+        self._settled_at = 0.0
+        self._listeners: List[Callable[[Optional[Set[int]]], None]] = []
+        self._listings: Dict[CatalogView, Set[int]] = {}
+        self._containing: Dict[int, Set[CatalogView]] = {}
+        self._lock = threading.Lock()
+
+    async def product(self, product_id: int, load: Callable[[], Awaitable]) -> Optional[CatalogEntry]:
+        """One product's response, or None if it does not exist"""
+        if not self.enabled:
+            product = await load()
+            return None if product is None else CatalogEntry.of(self._dump_product(product))
+
+        key = ("product", product_id)
+        entry = self.entries.get(key)
+        if entry is not None:
+            return entry
+        version = self.version
+        product = await load()
+        if product is None:
+            return None
+        entry = CatalogEntry.of(self._dump_product(product))
+        if self._can_store(version):
+            self.entries.set(key, entry)
+        return entry
+
+    async def listing(
+        self,
+        view: CatalogView,
+        load: Callable[[], Awaitable[List]],
+        next_cursor: Optional[Callable[[List], Optional[str]]] = None,
+    ) -> CatalogEntry:
+        """A product listing's response; `next_cursor` derives the following page's cursor from the rows"""
+        if not self.enabled:
+            products = await load()
+            return CatalogEntry.of(self._dump_listing(products), next_cursor(products) if next_cursor else None)
+
+        entry = self.entries.get(view)
+        if entry is not None:
+            return entry
+        version = self.version
+        products = await load()
+        entry = CatalogEntry.of(self._dump_listing(products), next_cursor(products) if next_cursor else None)
+        with self._lock:
+            if self._can_store(version):
+                self._forget(view)
+                self.entries.set(view, entry)
+                self._listings[view] = ids = {product.id for product in products}
+                for product_id in ids:
+                    self._containing.setdefault(product_id, set()).add(view)
+                self._prune()
+        return entry
+
+    async def facets(self, view: tuple, load: Callable[[], Awaitable[bytes]]) -> CatalogEntry:
+        """Serialized facet counts for a filter, kept until the next catalog write.
+
+        Counts can change with any write, so rather than being invalidated
+        they are keyed by the catalog version; older versions age out of the LRU.
+        """
+        if not self.enabled:
+            return CatalogEntry.of(await load())
+
+        version = self.version
+        key = ("facets", version, view)
+        entry = self.entries.get(key)
+        if entry is not None:
+            return entry
+        entry = CatalogEntry.of(await load())
+        if self._can_store(version):
+            self.entries.set(key, entry)
+        return entry
+
+    def product_changed(self, product_id: int, before: Optional[dict], after: Optional[dict]) -> None:
+        """Invalidate after a create (before=None), update or delete (after=None)"""
+        with self._lock:
+            self._bump(set() if before == after else {product_id})
+            stale = set(self._containing.get(product_id, ()))
+            stale.update(
+                view for view in self._listings
+                if (before is not None and view.matches(before)) or (after is not None and view.matches(after))
+            )
+            self._invalidate(stale, [product_id])
+
+    def stock_changed(self, product_ids: Iterable[int]) -> None:
+        """Invalidate after stock levels change; listing membership is unaffected"""
+        product_ids = list(product_ids)
+        with self._lock:
+            self._bump(set())
+            stale = set()
+            for product_id in product_ids:
+                stale.update(self._containing.get(product_id, ()))
+            self._invalidate(stale, product_ids)
+
+    def products_updated(self, product_ids: Iterable[int], membership_changed: bool) -> None:
+        """Invalidate once after a bulk update whose previous values were not read.
+
+        Without them there is no telling which listings the products left,
+        so a change to a membership field drops every listing.
+        """
+        if not membership_changed:
+            return self.stock_changed(product_ids)
+        product_ids = list(product_ids)
+        with self._lock:
+            self._bump(set(product_ids))
+            self._invalidate(set(self._listings), product_ids)
+
+    def subscribe(self, listener: Callable[[Optional[Set[int]]], None]) -> None:
+        """Call `listener` after every catalog write; it runs under the cache lock, so it must not block.
+
+        It is passed the ids of the products whose listing fields (MEMBERSHIP_FIELDS)
+        may have changed: empty when only stock or prices did, None when unknown.
+        """
+        self._listeners.append(listener)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._bump(None)
+            self.entries.clear()
+            self._listings.clear()
+            self._containing.clear()
+
+    def stats(self) -> dict:
+        return {"listings": len(self._listings), "invalidations": self.invalidations.value}
+
+    def _bump(self, product_ids: Optional[Set[int]]) -> None:
+        self.version += 1
+        self._settled_at = time.monotonic() + self.settle_seconds
+        for listener in self._listeners:
+            listener(product_ids)
+
+    def _can_store(self, version: int) -> bool:
+        return version == self.version and time.monotonic() >= self._settled_at
+
+    def _invalidate(self, views: Set[CatalogView], product_ids: Iterable[int]) -> None:
+        for product_id in product_ids:
+            self.entries.pop(("product", product_id))
+            self.invalidations.inc()
+        for view in views:
+            self.entries.pop(view)
+            self._forget(view)
+            self.invalidations.inc()
+
+    def _forget(self, view: CatalogView) -> None:
+        for product_id in self._listings.pop(view, ()):
+            views = self._containing.get(product_id)
+            if views is not None:
+                views.discard(view)
+                if not views:
+                    del self._containing[product_id]
+
+    def _prune(self) -> None:
+        # Listings evicted by the LRU or expired stay indexed until the index outgrows the cache
+        if len(self._listings) <= 2 * self.entries.maxsize:
+            return
+        for view in [view for view in self._listings if view not in self.entries]:
+            self._forget(view)
+
+    @staticmethod
+    def _dump_product(product) -> bytes:
+        return _product_adapter.dump_json(_product_adapter.validate_python(product, from_attributes=True))
+
+    @staticmethod
+    def _dump_listing(products) -> bytes:
+        return _listing_adapter.dump_json(_listing_adapter.validate_python(products, from_attributes=True))
+
+
+catalog_cache = CatalogCache(
+    settings.CATALOG_CACHE_SIZE,
+    settings.CATALOG_CACHE_TTL_SECONDS,
+    # Replicas may lag the write that invalidated an entry
+    settle_seconds=settings.DB_READ_YOUR_WRITES_SECONDS if settings.DATABASE_REPLICA_URLS else 0.0,
+)
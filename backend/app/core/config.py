@@ -5,13 +5,82 @@ from typing import Optional
 class Settings(BaseSettings):
     # Database
     DATABASE_URL: str
+
+    # Database connection pool
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT: float = 30.0  # Seconds to wait for a free connection
+    DB_POOL_RECYCLE: int = 1800  # Seconds before a connection is replaced
+    DB_POOL_PRE_PING: bool = True
+    DB_USE_NULL_POOL: bool = False  # Use when PgBouncer does the pooling
+
+    # Read replicas (comma-separated URLs, empty = read from the primary)
+    DATABASE_REPLICA_URLS: str = ""
+    DB_REPLICA_STRATEGY: str = "round_robin"  # round_robin or least_loaded
+    DB_READ_YOUR_WRITES_SECONDS: float = 5.0  # Pin a user to the primary after a write
+
+    # Startup
+    DB_CREATE_ALL_ON_STARTUP: bool = True  # Disable when Alembic owns the schema
+    DB_SCHEMA_CHECK_ON_STARTUP: bool = True  # Log tables missing from the database
+    DB_POOL_WARM_CONNECTIONS: int = 2  # Connections opened per engine at startup
+
+    # SQL instrumentation
+    SQL_INSTRUMENTATION_ENABLED: bool = True
+    SQL_DEBUG_HEADERS: bool = False  # Add X-DB-* headers to responses (development)
+    SQL_N_PLUS_ONE_THRESHOLD: int = 5  # Same statement shape this often in one request
+
+    # Slow-query log
+    SLOW_QUERY_LOG_ENABLED: bool = True
+    SLOW_QUERY_THRESHOLD_MS: float = 200.0
+    SLOW_QUERY_SAMPLE_RATE: float = 1.0  # Share of slow statements considered for logging
+    SLOW_QUERY_MAX_PER_MINUTE: int = 10  # Log lines per minute per process, the rest are counted
+    SLOW_QUERY_EXPLAIN: bool = True  # Attach EXPLAIN output (never ANALYZE)
+
+    # Prometheus metrics
+    METRICS_ENABLED: bool = True  # Serve /metrics and record per-route request metrics
+    # Bearer token for /metrics, /metrics/sql and /health/pool scrapers; admins may always read them
+    METRICS_TOKEN: str = ""
     
     # Security
     SECRET_KEY: str
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     REFRESH_TOKEN_EXPIRE_DAYS: int = 7
+    PRINCIPAL_CACHE_SIZE: int = 10000  # Authenticated users kept in memory per worker
+    PRINCIPAL_CACHE_TTL_SECONDS: float = 60.0  # Upper bound on staleness across workers
+    TRUST_TOKEN_CLAIMS: bool = True  # Read-only endpoints authorise from token claims alone
+    TOKEN_CACHE_SIZE: int = 10000  # Verified tokens kept per worker until they expire, 0 = off
+    TOKEN_REVOCATION_SYNC_SECONDS: float = 5.0  # How late a worker may see a logout made elsewhere
+    PASSWORD_HASH_WORKERS: int = 0  # bcrypt threads per worker process, 0 = half the CPU cores
+    PASSWORD_HASH_MAX_QUEUE: int = 16  # Waiting hash/verify calls before signins get 503
+
+    # One-time passwords (email verification)
+    OTP_EXPIRE_MINUTES: int = 5
+    OTP_MAX_ATTEMPTS: int = 5  # Wrong codes before the code is discarded
+    OTP_STORE_BACKEND: str = "database"  # database (shared) or memory (single process only)
+    OTP_SWEEP_INTERVAL_SECONDS: float = 300.0  # How often expired codes are deleted
+    OTP_SWEEP_BATCH_SIZE: int = 1000
+
+    # Login throttling (sliding window per client IP and per account)
+    LOGIN_THROTTLE_ENABLED: bool = True
+    LOGIN_THROTTLE_WINDOW_SECONDS: int = 60
+    LOGIN_THROTTLE_IP_LIMIT: int = 30  # Attempts per window from one client IP
+    LOGIN_THROTTLE_ACCOUNT_LIMIT: int = 10  # Attempts per window against one account
+    LOGIN_THROTTLE_BACKEND: str = "memory"  # memory (per worker) or database (shared)
+    # Reverse proxies whose X-Forwarded-For is believed: IPs, CIDR ranges or * (uvicorn reads it too)
+    FORWARDED_ALLOW_IPS: str = "127.0.0.1"
     
+    # Product catalog cache (serialized responses, per worker)
+    CATALOG_CACHE_SIZE: int = 1000  # Cached listings and products, 0 = off
+    CATALOG_CACHE_TTL_SECONDS: float = 300.0  # Upper bound on staleness across workers
+    CATALOG_HTTP_MAX_AGE_SECONDS: int = 0  # Browser freshness; 0 = revalidate with If-None-Match each time
+    HOME_SNAPSHOT_SECTION_SIZE: int = 10  # Products in each of popular/special/offers
+    HOME_SNAPSHOT_PRODUCTS: int = 20  # First page of the menu included in /api/products/home
+    HOME_SNAPSHOT_REBUILD_DELAY_SECONDS: float = 1.0  # Coalesces bursts of product writes
+    HOME_SNAPSHOT_MAX_AGE_SECONDS: float = 60.0  # Rebuild at least this often (writes from other workers)
+    CATALOG_FACET_PRICE_BOUNDS: str = "2000,5000,10000"  # Price facet bucket edges (NGN, comma-separated)
+    SUGGEST_INDEX_MAX_AGE_SECONDS: float = 300.0  # Full typeahead index reload (writes from other workers)
+
     # CORS
     FRONTEND_URL: str
     
@@ -29,6 +98,7 @@ class Settings(BaseSettings):
 
     # Payments
     PAYSTACK_SECRET_KEY: Optional[str] = None
+    PAYSTACK_BASE_URL: str = "https://api.paystack.co"  # Point at a stub server for benchmarks
     
     class Config:
         env_file = ".env"
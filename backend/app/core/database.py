@@ -1,18 +1,241 @@
+import itertools
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from typing import Dict, List
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool, QueuePool
 from app.core.config import settings
+from app.core.metrics import Counter, Histogram
+
+# asyncio drivers used for the async engine
+ASYNC_DRIVERS = {
+    "postgresql": "asyncpg",
+    "sqlite": "aiosqlite",
+}
+
+
+class _TimedPoolMixin:
+    """Record how long callers wait to get a connection from the pool"""
+
+    # Each concrete pool class gets its own metrics (see _timed_pool)
+    wait_seconds: Histogram
+    timeouts: Counter
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            self.timeouts.inc()
+            raise
+        finally:
+            self.wait_seconds.observe(time.perf_counter() - start)
+
+
+def _timed_pool(name: str, base: type) -> type:
+    return type(name, (_TimedPoolMixin, base), {"wait_seconds": Histogram(), "timeouts": Counter()})
+
+
+TimedQueuePool = _timed_pool("TimedQueuePool", QueuePool)
+TimedNullPool = _timed_pool("TimedNullPool", NullPool)
+TimedAsyncQueuePool = _timed_pool("TimedAsyncQueuePool", AsyncAdaptedQueuePool)
+TimedAsyncNullPool = _timed_pool("TimedAsyncNullPool", NullPool)
+
+
+def to_async_url(database_url: str) -> str:
+    """Swap the DBAPI driver in a database URL for its asyncio equivalent"""
+    url = make_url(database_url)
+    backend = url.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No async driver configured for '{backend}' databases")
+    return url.set(drivername=f"{backend}+{ASYNC_DRIVERS[backend]}").render_as_string(hide_password=False)
+
+
+def build_engine_options(database_url: str, is_async: bool = False) -> dict:
+    """Build create_engine() pool arguments from settings"""
+    url = make_url(database_url)
+
+    # In-memory SQLite needs its default single-connection pool
+    if url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:"):
+        return {}
+
+    if settings.DB_USE_NULL_POOL:
+        # PgBouncer (transaction mode) owns pooling, so open/close per checkout
+        return {
+            "poolclass": TimedAsyncNullPool if is_async else TimedNullPool,
+            "pool_pre_ping": settings.DB_POOL_PRE_PING,
+        }
+
+    return {
+        "poolclass": TimedAsyncQueuePool if is_async else TimedQueuePool,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+
 
 # Create database engine
-engine = create_engine(settings.DATABASE_URL)
+engine = create_engine(settings.DATABASE_URL, **build_engine_options(settings.DATABASE_URL))
 
 # Create session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async engine and session factory for the event-loop friendly path.
+# Objects must stay usable after commit since lazy loads are not allowed.
+async_engine = create_async_engine(
+    to_async_url(settings.DATABASE_URL),
+    **build_engine_options(settings.DATABASE_URL, is_async=True)
+)
+AsyncSessionLocal = async_sessionmaker(
+    async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False
+)
+
 # Base class for models
 Base = declarative_base()
 
 
+class ReplicaRouter:
+    """Pick a read replica for read-only sessions"""
+
+    STRATEGIES = ("round_robin", "least_loaded")
+
+    def __init__(self, urls: List[str], strategy: str = "round_robin"):
+        if strategy not in self.STRATEGIES:
+            raise ValueError(f"Unknown replica strategy '{strategy}'")
+
+        self.strategy = strategy
+        self.engines = [create_engine(url, **build_engine_options(url)) for url in urls]
+        self.async_engines = [
+            create_async_engine(to_async_url(url), **build_engine_options(url, is_async=True))
+            for url in urls
+        ]
+        self.session_factories = [
+            sessionmaker(autocommit=False, autoflush=False, bind=replica) for replica in self.engines
+        ]
+        self.async_session_factories = [
+            async_sessionmaker(replica, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+            for replica in self.async_engines
+        ]
+        self._in_flight = [0] * len(urls)
+        self._rotation = itertools.count()
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.engines)
+
+    def acquire(self) -> int:
+        """Reserve a replica and return its index"""
+        with self._lock:
+            count = len(self._in_flight)
+            start = next(self._rotation) % count
+            if self.strategy == "least_loaded":
+                # Rotating the starting point spreads ties evenly
+                candidates = [(start + offset) % count for offset in range(count)]
+                index = min(candidates, key=self._in_flight.__getitem__)
+            else:
+                index = start
+            self._in_flight[index] += 1
+        return index
+
+    def release(self, index: int) -> None:
+        with self._lock:
+            self._in_flight[index] -= 1
+
+    def in_flight(self) -> List[int]:
+        return list(self._in_flight)
+
+
+class RecentWriters:
+    """Subjects that wrote recently and must read their own writes from the primary"""
+
+    # Expired entries are pruned once the map grows past this size
+    PRUNE_THRESHOLD = 10000
+
+    def __init__(self, window_seconds: float):
+        self.window_seconds = window_seconds
+        self._pinned_until: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def mark(self, subject: str) -> None:
+        if self.window_seconds <= 0:
+            return
+
+        now = time.monotonic()
+        with self._lock:
+            self._pinned_until[subject] = now + self.window_seconds
+            if len(self._pinned_until) > self.PRUNE_THRESHOLD:
+                self._pinned_until = {
+                    key: until for key, until in self._pinned_until.items() if until > now
+                }
+
+    def is_pinned(self, subject: str) -> bool:
+        until = self._pinned_until.get(subject)
+        return until is not None and until > time.monotonic()
+
+
+replica_router = ReplicaRouter(
+    [url.strip() for url in settings.DATABASE_REPLICA_URLS.split(",") if url.strip()],
+    settings.DB_REPLICA_STRATEGY
+)
+recent_writers = RecentWriters(settings.DB_READ_YOUR_WRITES_SECONDS)
+
+
+def get_pool_stats(pool=None) -> dict:
+    """Snapshot of connection pool saturation and wait times"""
+    pool = pool or engine.pool
+    stats = {
+        "pool_class": type(pool).__name__,
+        "size": None,
+        "checked_in": None,
+        "checked_out": None,
+        "overflow": None,
+        "max_overflow": settings.DB_MAX_OVERFLOW if isinstance(pool, QueuePool) else None,
+        "timeouts": None,
+        "wait_seconds": None,
+    }
+
+    if isinstance(pool, _TimedPoolMixin):
+        stats.update({
+            "timeouts": pool.timeouts.value,
+            "wait_seconds": pool.wait_seconds.snapshot(),
+        })
+
+    if isinstance(pool, QueuePool):
+        stats.update({
+            "size": pool.size(),
+            "checked_in": pool.checkedin(),
+            "checked_out": pool.checkedout(),
+            "overflow": max(pool.overflow(), 0),
+        })
+
+    return stats
+
+
+def get_all_pool_stats() -> dict:
+    """Pool statistics for every engine in this process"""
+    return {
+        "sync": get_pool_stats(engine.pool),
+        "async": get_pool_stats(async_engine.pool),
+        "replicas": [
+            {
+                "sync": get_pool_stats(replica_router.engines[index].pool),
+                "async": get_pool_stats(replica_router.async_engines[index].pool),
+                "in_flight": in_flight,
+            }
+            for index, in_flight in enumerate(replica_router.in_flight())
+        ],
+    }
+
+
 # Dependency to get database session
 def get_db():
     db = SessionLocal()
@@ -20,3 +243,44 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+# Dependency to get an async database session
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+# Read-only sessions. Callers pass use_primary=True when the user must
+# see their own recent writes (see app.api.deps).
+@contextmanager
+def read_session(use_primary: bool = False):
+    if use_primary or not replica_router.enabled:
+        factory, index = SessionLocal, None
+    else:
+        index = replica_router.acquire()
+        factory = replica_router.session_factories[index]
+
+    db = factory()
+    try:
+        yield db
+    finally:
+        db.close()
+        if index is not None:
+            replica_router.release(index)
+
+
+@asynccontextmanager
+async def async_read_session(use_primary: bool = False):
+    if use_primary or not replica_router.enabled:
+        factory, index = AsyncSessionLocal, None
+    else:
+        index = replica_router.acquire()
+        factory = replica_router.async_session_factories[index]
+
+    try:
+        async with factory() as db:
+            yield db
+    finally:
+        if index is not None:
+            replica_router.release(index)
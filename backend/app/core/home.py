@@ -0,0 +1,127 @@
+import asyncio
+import contextvars
+import hashlib
+import logging
+import time
+from typing import Optional, Set
+from pydantic import TypeAdapter
+from app.core.catalog import CatalogEntry, catalog_cache
+from app.core.config import settings
+from app.core.database import async_read_session
+from app.core.metrics import Counter
+from app.core.startup import cache_warmer
+from app.crud.aio import product as crud_product
+from app.models.product import ProductCategory
+from app.schemas.product import HomeResponse, ProductResponse
+
+logger = logging.getLogger(__name__)
+
+_home_adapter = TypeAdapter(HomeResponse)
+
+
+class HomeSnapshot:
+    """Every homepage section in one precomputed, versioned response.
+
+    Requests only ever read the current snapshot. Product writes in this
+    worker mark it stale and schedule a rebuild `rebuild_delay` seconds later,
+    so a burst of writes costs one rebuild. A snapshot older than `max_age`
+    is served once more while a rebuild runs, which is how writes made
+    through other workers are picked up. Only a request that arrives before
+    the startup build has finished waits for one.
+    """
+
+    def __init__(self, section_size: int, products: int, rebuild_delay: float, max_age: float):
+        self.section_size = section_size
+        self.products = products
+        self.rebuild_delay = rebuild_delay
+        self.max_age = max_age
+        self.entry: Optional[CatalogEntry] = None
+        self.built_at = 0.0
+        self.builds = Counter()
+        self.failures = Counter()
+        self._stale = False
+        self._task: Optional[asyncio.Task] = None
+
+    async def get(self) -> CatalogEntry:
+        if self.entry is None:
+            # Shielded so a client disconnecting does not cancel the build for everyone
+            await asyncio.shield(self._schedule(0))
+            if self.entry is None:
+                raise RuntimeError("The homepage snapshot could not be built")
+        elif self._stale or time.monotonic() - self.built_at >= self.max_age:
+            self._schedule(self.rebuild_delay if self._stale else 0)
+        return self.entry
+
+    def mark_stale(self, product_ids: Optional[Set[int]] = None) -> None:
+        """Catalog listener: rebuild soon (called under the catalog lock, so never blocks)"""
+        self._stale = True
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return  # Written outside the event loop; the next request schedules the rebuild
+        self._schedule(self.rebuild_delay)
+
+    def _schedule(self, delay: float) -> asyncio.Task:
+        if self._task is None or self._task.done():
+            # Fresh context so the build is not counted against the current request's queries
+            self._task = asyncio.get_running_loop().create_task(self._rebuild(delay), context=contextvars.Context())
+        return self._task
+
+    async def _rebuild(self, delay: float) -> None:
+        # Replicas may not have the write that triggered the rebuild yet
+        delay = max(delay, catalog_cache.settle_seconds) if delay else 0
+        while True:
+            if delay:
+                await asyncio.sleep(delay)
+            self._stale = False
+            try:
+                self.entry = await self.build()
+                self.built_at = time.monotonic()
+                self.builds.inc()
+            except Exception:
+                self.failures.inc()
+                logger.exception("Could not rebuild the homepage snapshot")
+                return
+            if not self._stale:
+                return
+            # Products changed while building
+            delay = max(self.rebuild_delay, catalog_cache.settle_seconds)
+
+    async def build(self) -> CatalogEntry:
+        async with async_read_session() as db:
+            popular = await crud_product.get_popular_products(db, limit=self.section_size)
+            special = await crud_product.get_special_products(db, limit=self.section_size)
+            offers = await crud_product.get_offer_products(db, limit=self.section_size)
+            products = await crud_product.get_products(db, limit=self.products)
+            counts = await crud_product.get_category_counts(db)
+
+        sections = {
+            "popular": [ProductResponse.model_validate(product) for product in popular],
+            "special": [ProductResponse.model_validate(product) for product in special],
+            "offers": [ProductResponse.model_validate(product) for product in offers],
+            "products": [ProductResponse.model_validate(product) for product in products],
+            "category_counts": {category: counts.get(category, 0) for category in ProductCategory},
+        }
+        # Derived from the content, so every worker gives the same snapshot the same version
+        version = hashlib.blake2b(
+            _home_adapter.dump_json(HomeResponse(version="", **sections)), digest_size=8
+        ).hexdigest()
+        return CatalogEntry.of(_home_adapter.dump_json(HomeResponse(version=version, **sections)))
+
+    def stats(self) -> dict:
+        age = time.monotonic() - self.built_at if self.entry is not None else None
+        return {"age_seconds": age, "builds": self.builds.value, "failures": self.failures.value}
+
+
+home_snapshot = HomeSnapshot(
+    section_size=settings.HOME_SNAPSHOT_SECTION_SIZE,
+    products=settings.HOME_SNAPSHOT_PRODUCTS,
+    rebuild_delay=settings.HOME_SNAPSHOT_REBUILD_DELAY_SECONDS,
+    max_age=settings.HOME_SNAPSHOT_MAX_AGE_SECONDS,
+)
+catalog_cache.subscribe(home_snapshot.mark_stale)
+
+
+@cache_warmer
+async def build_home_snapshot() -> None:
+    await home_snapshot._schedule(0)
@@ -0,0 +1,340 @@
+import logging
+import random
+import re
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import lru_cache
+from typing import Dict, List, Optional
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Label used for requests that did not match any route (404s, static files)
+UNMATCHED_ROUTE = "<unmatched>"
+
+_NUMBER = re.compile(r"\b\d+\b")
+_IN_LIST = re.compile(r"\bIN\s*\([^)]*\)", re.IGNORECASE)
+_WHITESPACE = re.compile(r"\s+")
+
+
+@lru_cache(maxsize=2048)
+def statement_shape(statement: str) -> str:
+    """Normalise a statement so repeats that differ only in literals compare equal"""
+    shape = _IN_LIST.sub("IN (...)", statement)
+    shape = _NUMBER.sub("?", shape)
+    return _WHITESPACE.sub(" ", shape).strip()
+
+
+class QueryStats:
+    """Statements executed while handling one request"""
+
+    __slots__ = ("count", "seconds", "shapes", "parent")
+
+    def __init__(self, parent: Optional["QueryStats"] = None):
+        self.count = 0
+        self.seconds = 0.0
+        self.shapes: Counter = Counter()
+        # Enclosing capture_queries() block, which sees every statement counted here too
+        self.parent = parent
+
+    def record(self, statement: str, duration: float) -> None:
+        self.count += 1
+        self.seconds += duration
+        self.shapes[statement] += 1
+        if self.parent is not None:
+            self.parent.record(statement, duration)
+
+    def suspected_n_plus_one(self, threshold: Optional[int] = None) -> List[str]:
+        """Statement shapes repeated at least `threshold` times"""
+        threshold = threshold or settings.SQL_N_PLUS_ONE_THRESHOLD
+        repeated = Counter()
+        for statement, count in self.shapes.items():
+            repeated[statement_shape(statement)] += count
+        return [shape for shape, count in repeated.items() if count >= threshold]
+
+
+_current_stats: ContextVar[Optional[QueryStats]] = ContextVar("sql_query_stats", default=None)
+# ASGI scope of the request being handled; the router fills in scope["route"]
+_current_scope: ContextVar[Optional[dict]] = ContextVar("sql_request_scope", default=None)
+
+# Statements EXPLAIN accepts without side effects (ANALYZE is never used)
+_EXPLAINABLE = re.compile(r"^\s*(SELECT|WITH|INSERT|UPDATE|DELETE)\b", re.IGNORECASE)
+
+
+def parameter_shape(parameters, executemany: bool = False):
+    """Describe bound parameters by type only, so values (and PII) never reach the log"""
+    if executemany:
+        rows = list(parameters or [])
+        return {"rows": len(rows), "row": parameter_shape(rows[0]) if rows else None}
+    if isinstance(parameters, dict):
+        return {key: type(value).__name__ for key, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return [type(value).__name__ for value in parameters]
+    return type(parameters).__name__
+
+
+def explain(conn, statement: str, parameters) -> Optional[List[str]]:
+    """Plan for a statement on the connection that just ran it"""
+    dialect = conn.dialect.name
+    if dialect == "postgresql":
+        prefix = "EXPLAIN (ANALYZE off) "
+    elif dialect == "sqlite":
+        prefix = "EXPLAIN QUERY PLAN "
+    else:
+        return None
+
+    # A raw DBAPI cursor keeps the EXPLAIN out of the engine events (and the stats)
+    cursor = conn.connection.dbapi_connection.cursor()
+    # A failed statement aborts a Postgres transaction, so the EXPLAIN runs in
+    # a savepoint that is rolled back on error and the request carries on
+    savepoint = dialect == "postgresql"
+    try:
+        if savepoint:
+            cursor.execute("SAVEPOINT slow_query_explain")
+        try:
+            cursor.execute(prefix + statement, parameters)
+            rows = cursor.fetchall()
+        except Exception:
+            if savepoint:
+                cursor.execute("ROLLBACK TO SAVEPOINT slow_query_explain")
+            raise
+        finally:
+            if savepoint:
+                cursor.execute("RELEASE SAVEPOINT slow_query_explain")
+    finally:
+        cursor.close()
+    # SQLite rows are (id, parent, notused, detail); Postgres rows are single lines
+    return [row[-1] for row in rows]
+
+
+class SlowQueryLog:
+    """Sampled, rate-limited log of statements slower than a threshold"""
+
+    def __init__(self):
+        self.threshold = settings.SLOW_QUERY_THRESHOLD_MS / 1000
+        self.sample_rate = settings.SLOW_QUERY_SAMPLE_RATE
+        self.max_per_minute = settings.SLOW_QUERY_MAX_PER_MINUTE
+        self.explain = settings.SLOW_QUERY_EXPLAIN
+        self.total = 0
+        self.suppressed = 0
+        self._window_start = 0.0
+        self._window_count = 0
+        self._lock = threading.Lock()
+
+    def _acquire(self) -> int:
+        """Reserve a log slot; returns -1 when rate limited, else the suppressed count to report"""
+        now = time.monotonic()
+        with self._lock:
+            self.total += 1
+            if now - self._window_start >= 60:
+                self._window_start = now
+                self._window_count = 0
+            if self._window_count >= self.max_per_minute or random.random() >= self.sample_rate:
+                self.suppressed += 1
+                return -1
+            self._window_count += 1
+            suppressed, self.suppressed = self.suppressed, 0
+            return suppressed
+
+    def record(self, conn, statement: str, parameters, executemany: bool, duration: float) -> None:
+        suppressed = self._acquire()
+        if suppressed < 0:
+            return
+
+        scope = _current_scope.get()
+        route = route_label(scope) if scope is not None else "<no request>"
+        plan = None
+        # executemany parameters are a list of rows, which EXPLAIN cannot bind
+        if self.explain and not executemany and _EXPLAINABLE.match(statement):
+            try:
+                plan = explain(conn, statement, parameters)
+            except Exception as exc:
+                plan = [f"EXPLAIN failed: {exc}"]
+
+        logger.warning(
+            "Slow query (%.1f ms) on %s: %s | params=%s%s%s",
+            duration * 1000,
+            route,
+            statement_shape(statement)[:2000],
+            parameter_shape(parameters, executemany),
+            "".join(f"\n    {line}" for line in plan) if plan else "",
+            f"\n    ({suppressed} slow queries not logged since the last entry)" if suppressed else "",
+        )
+
+
+_slow_query_log: Optional[SlowQueryLog] = None
+
+
+def slow_query_counts() -> Optional[dict]:
+    """Slow statements seen and not logged, or None when the log is disabled"""
+    if _slow_query_log is None:
+        return None
+    return {"total": _slow_query_log.total, "suppressed": _slow_query_log.suppressed}
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _slow_query_log is not None or _current_stats.get() is not None:
+        conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current_stats.get()
+    if stats is None and _slow_query_log is None:
+        return
+    starts = conn.info.get("query_start_time")
+    if not starts:
+        return
+    duration = time.perf_counter() - starts.pop()
+    if stats is not None:
+        stats.record(statement, duration)
+    if _slow_query_log is not None and duration >= _slow_query_log.threshold:
+        _slow_query_log.record(conn, statement, parameters, executemany, duration)
+
+
+def install_sql_hooks() -> None:
+    """Listen on every Engine (including the sync side of async engines)"""
+    if not event.contains(Engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def enable_slow_query_log() -> SlowQueryLog:
+    """Start timing every statement and logging the slow ones"""
+    global _slow_query_log
+    if _slow_query_log is None:
+        _slow_query_log = SlowQueryLog()
+    install_sql_hooks()
+    return _slow_query_log
+
+
+@contextmanager
+def capture_queries():
+    """Count statements run inside the block, including requests served in it, e.g. to assert a query budget in tests"""
+    stats = QueryStats()
+    token = _current_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _current_stats.reset(token)
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+def assert_query_budget(stats: QueryStats, budget: int) -> None:
+    """Raise if more statements ran than the budget allows"""
+    if stats.count > budget:
+        raise QueryBudgetExceeded(
+            f"{stats.count} statements executed, budget is {budget}; "
+            f"repeated shapes: {stats.suspected_n_plus_one()}"
+        )
+
+
+def query_budget(max_statements: int):
+    """Declare the number of statements a route is expected to stay within"""
+    def decorator(endpoint):
+        endpoint.__query_budget__ = max_statements
+        return endpoint
+    return decorator
+
+
+class RouteQueryStats:
+    """Per-route aggregates of statement counts and DB time"""
+
+    def __init__(self):
+        self._routes: Dict[str, dict] = {}
+        self._reported_shapes = set()
+        self._lock = threading.Lock()
+
+    def record(self, route: str, stats: QueryStats, budget: Optional[int], suspects: List[str]) -> None:
+        over_budget = budget is not None and stats.count > budget
+        with self._lock:
+            entry = self._routes.get(route)
+            if entry is None:
+                entry = self._routes[route] = {
+                    "requests": 0,
+                    "statements": 0,
+                    "db_seconds": 0.0,
+                    "max_statements": 0,
+                    "n_plus_one_requests": 0,
+                    "budget": budget,
+                    "over_budget_requests": 0,
+                }
+            entry["requests"] += 1
+            entry["statements"] += stats.count
+            entry["db_seconds"] += stats.seconds
+            entry["max_statements"] = max(entry["max_statements"], stats.count)
+            entry["n_plus_one_requests"] += bool(suspects)
+            entry["over_budget_requests"] += over_budget
+            new_shapes = [shape for shape in suspects if (route, shape) not in self._reported_shapes]
+            self._reported_shapes.update((route, shape) for shape in new_shapes)
+
+        # Log each suspicious shape once per route rather than on every request
+        for shape in new_shapes:
+            logger.warning("Suspected N+1 on %s: %s", route, shape[:300])
+        if over_budget:
+            logger.warning("%s ran %d statements (budget %d)", route, stats.count, budget)
+
+    def snapshot(self) -> Dict[str, dict]:
+        with self._lock:
+            return {route: dict(entry) for route, entry in self._routes.items()}
+
+
+route_query_stats = RouteQueryStats()
+
+
+def route_label(scope: dict) -> str:
+    """`METHOD /path/{template}` for the matched route"""
+    route = scope.get("route")
+    path = getattr(route, "path", None) or UNMATCHED_ROUTE
+    return f"{scope.get('method', '')} {path}"
+
+
+def route_budget(scope: dict) -> Optional[int]:
+    endpoint = getattr(scope.get("route"), "endpoint", None)
+    return getattr(endpoint, "__query_budget__", None)
+
+
+class SQLInstrumentationMiddleware:
+    """Count statements and DB time per request (pure ASGI, no body buffering)"""
+
+    def __init__(self, app, expose_headers: bool = False):
+        self.app = app
+        self.expose_headers = expose_headers
+        install_sql_hooks()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats(parent=_current_stats.get())
+        token = _current_stats.set(stats)
+        scope_token = _current_scope.set(scope)
+
+        async def send_with_headers(message):
+            if message["type"] == "http.response.start":
+                budget = route_budget(scope)
+                headers = list(message.get("headers", []))
+                headers.append((b"x-db-queries", str(stats.count).encode()))
+                headers.append((b"x-db-time-ms", f"{stats.seconds * 1000:.2f}".encode()))
+                headers.append((b"x-db-n-plus-one", str(len(stats.suspected_n_plus_one())).encode()))
+                if budget is not None:
+                    headers.append((b"x-db-query-budget", str(budget).encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_headers if self.expose_headers else send)
+        finally:
+            _current_stats.reset(token)
+            _current_scope.reset(scope_token)
+            route_query_stats.record(
+                route_label(scope), stats, route_budget(scope), stats.suspected_n_plus_one()
+            )
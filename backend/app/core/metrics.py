@@ -0,0 +1,193 @@
+import bisect
+import threading
+from typing import Callable, Dict, Iterable, List, Sequence, Tuple
+
+# Upper bounds (seconds) used for latency histograms
+DEFAULT_LATENCY_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0
+)
+
+
+class Histogram:
+    """Thread-safe fixed-bucket histogram"""
+
+    def __init__(self, buckets: Iterable[float] = DEFAULT_LATENCY_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self._counts = [0] * (len(self.buckets) + 1)  # Last slot is +Inf
+        self._sum = 0.0
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        """Record a single observation"""
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self._counts[index] += 1
+            self._sum += value
+            self._count += 1
+
+    def snapshot(self) -> dict:
+        """Return cumulative bucket counts, sum and count"""
+        with self._lock:
+            counts = list(self._counts)
+            total = self._sum
+            count = self._count
+
+        cumulative = {}
+        running = 0
+        for bound, bucket_count in zip(self.buckets, counts):
+            running += bucket_count
+            cumulative[str(bound)] = running
+        cumulative["+Inf"] = count
+
+        return {"buckets": cumulative, "sum": total, "count": count}
+
+
+class Counter:
+    """Thread-safe monotonically increasing counter"""
+
+    def __init__(self):
+        self._value = 0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: int = 1) -> None:
+        with self._lock:
+            self._value += amount
+
+    @property
+    def value(self) -> int:
+        return self._value
+
+
+class Gauge:
+    """Thread-safe value that can go up and down"""
+
+    def __init__(self):
+        self._value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1) -> None:
+        with self._lock:
+            self._value += amount
+
+    def dec(self, amount: float = 1) -> None:
+        with self._lock:
+            self._value -= amount
+
+    def set(self, value: float) -> None:
+        self._value = value
+
+    @property
+    def value(self) -> float:
+        return self._value
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def format_labels(labels: Dict[str, object]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + "}"
+
+
+def render_histogram(name: str, labels: Dict[str, object], snapshot: dict) -> List[str]:
+    """Prometheus sample lines for a Histogram.snapshot()"""
+    lines = [
+        f"{name}_bucket{format_labels({**labels, 'le': bound})} {count}"
+        for bound, count in snapshot["buckets"].items()
+    ]
+    lines.append(f"{name}_sum{format_labels(labels)} {snapshot['sum']}")
+    lines.append(f"{name}_count{format_labels(labels)} {snapshot['count']}")
+    return lines
+
+
+class MetricFamily:
+    """A named metric with one child per combination of label values"""
+
+    def __init__(self, name: str, documentation: str, kind: str, labelnames: Sequence[str], factory: Callable):
+        self.name = name
+        self.documentation = documentation
+        self.kind = kind
+        self.labelnames = tuple(labelnames)
+        self._factory = factory
+        self._children: Dict[Tuple, object] = {}
+        self._lock = threading.Lock()
+
+    def labels(self, *values):
+        """Child metric for these label values (created on first use)"""
+        child = self._children.get(values)
+        if child is None:
+            if len(values) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}")
+            with self._lock:
+                child = self._children.setdefault(values, self._factory())
+        return child
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        for values, child in list(self._children.items()):
+            labels = dict(zip(self.labelnames, values))
+            if self.kind == "histogram":
+                lines.extend(render_histogram(self.name, labels, child.snapshot()))
+            else:
+                lines.append(f"{self.name}{format_labels(labels)} {child.value}")
+        return lines
+
+
+class Registry:
+    """Process-wide metrics rendered in the Prometheus text format"""
+
+    def __init__(self):
+        self._families: Dict[str, MetricFamily] = {}
+        self._collectors: List[Callable[[], Iterable[str]]] = []
+
+    def _register(self, family: MetricFamily) -> MetricFamily:
+        if family.name in self._families:
+            raise ValueError(f"Metric {family.name} already registered")
+        self._families[family.name] = family
+        return family
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> MetricFamily:
+        return self._register(MetricFamily(name, documentation, "counter", labelnames, Counter))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> MetricFamily:
+        return self._register(MetricFamily(name, documentation, "gauge", labelnames, Gauge))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Iterable[float] = DEFAULT_LATENCY_BUCKETS
+    ) -> MetricFamily:
+        buckets = tuple(buckets)
+        return self._register(
+            MetricFamily(name, documentation, "histogram", labelnames, lambda: Histogram(buckets))
+        )
+
+    def collector(self, func: Callable[[], Iterable[str]]):
+        """Register a function producing sample lines at scrape time"""
+        self._collectors.append(func)
+        return func
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for family in list(self._families.values()):
+            lines.extend(family.render())
+        for collect in self._collectors:
+            lines.extend(collect())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+# Outbound call latencies live here rather than in app.core.monitoring so the
+# clients recording them do not import the whole application
+EMAIL_SEND_SECONDS = REGISTRY.histogram(
+    "email_send_duration_seconds", "Time spent sending (or simulating) an email", ("outcome",)
+)
+PAYSTACK_REQUEST_SECONDS = REGISTRY.histogram(
+    "paystack_request_duration_seconds", "Paystack API call latency", ("operation", "outcome")
+)
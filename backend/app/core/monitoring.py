@@ -0,0 +1,286 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import List, Tuple
+from starlette.routing import Match
+from app.core.cache import all_cache_stats
+from app.core.catalog import catalog_cache
+from app.core.database import get_all_pool_stats
+from app.core.home import home_snapshot
+from app.core.instrumentation import UNMATCHED_ROUTE, route_query_stats, slow_query_counts
+from app.core.metrics import REGISTRY, format_labels, render_histogram
+from app.core.revocation import token_revocations
+from app.core.security import password_hasher
+from app.core.suggest import suggest_index
+from app.core.throttle import login_throttle
+
+# Prometheus text exposition format
+CONTENT_TYPE_LATEST = "text/plain; version=0.0.4"  # Starlette appends the charset
+
+# Distinct request paths remembered when resolving route templates
+ROUTE_CACHE_SIZE = 4096
+
+HTTP_REQUESTS = REGISTRY.counter(
+    "http_requests_total", "HTTP requests by route template and status", ("method", "route", "status")
+)
+HTTP_REQUEST_SECONDS = REGISTRY.histogram(
+    "http_request_duration_seconds", "Time to produce a complete response", ("method", "route")
+)
+HTTP_IN_FLIGHT = REGISTRY.gauge(
+    "http_requests_in_flight", "Requests currently being handled", ("method", "route")
+)
+
+
+class RouteResolver:
+    """Map a request path to its route template before the router runs"""
+
+    def __init__(self, routes: List, maxsize: int = ROUTE_CACHE_SIZE):
+        self.routes = routes
+        self.maxsize = maxsize
+        self._cache: "OrderedDict[Tuple[str, str], str]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _match(self, scope: dict) -> str:
+        partial = None
+        for route in self.routes:
+            match, _ = route.matches(scope)
+            if match == Match.FULL:
+                return route.path
+            if match == Match.PARTIAL and partial is None:
+                partial = route.path
+        return partial or UNMATCHED_ROUTE
+
+    def resolve(self, scope: dict) -> str:
+        key = (scope["method"], scope["path"])
+        # Lock-free hit path; eviction is oldest-first, which is enough to bound memory
+        template = self._cache.get(key)
+        if template is not None:
+            return template
+
+        template = self._match(scope)
+        with self._lock:
+            self._cache[key] = template
+            if len(self._cache) > self.maxsize:
+                self._cache.popitem(last=False)
+        return template
+
+
+class PrometheusMiddleware:
+    """Request count, latency and in-flight requests per route template (pure ASGI)"""
+
+    def __init__(self, app, routes: List):
+        self.app = app
+        self.resolver = RouteResolver(routes)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        route = self.resolver.resolve(scope)
+        in_flight = HTTP_IN_FLIGHT.labels(method, route)
+        status_code = 500
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        in_flight.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            HTTP_REQUEST_SECONDS.labels(method, route).observe(time.perf_counter() - start)
+            HTTP_REQUESTS.labels(method, route, str(status_code)).inc()
+            in_flight.dec()
+
+
+# (metric, stats key, type, help) for the per-engine pool series
+POOL_SERIES = (
+    ("db_pool_size", "size", "gauge", "Configured pool size"),
+    ("db_pool_checked_in", "checked_in", "gauge", "Idle connections in the pool"),
+    ("db_pool_checked_out", "checked_out", "gauge", "Connections currently checked out of the pool"),
+    ("db_pool_overflow", "overflow", "gauge", "Connections open beyond the pool size"),
+    ("db_pool_timeouts_total", "timeouts", "counter", "Checkouts that gave up waiting for a connection"),
+)
+
+
+@REGISTRY.collector
+def collect_pool_stats() -> List[str]:
+    pools = get_all_pool_stats()
+    engines = [("sync", pools["sync"]), ("async", pools["async"])]
+    for index, replica in enumerate(pools["replicas"]):
+        engines.append((f"replica{index}_sync", replica["sync"]))
+        engines.append((f"replica{index}_async", replica["async"]))
+
+    lines = []
+    for name, key, kind, documentation in POOL_SERIES:
+        lines.append(f"# HELP {name} {documentation}")
+        lines.append(f"# TYPE {name} {kind}")
+        for label, stats in engines:
+            if stats[key] is not None:
+                labels = {"engine": label, "pool": stats["pool_class"]}
+                lines.append(f"{name}{format_labels(labels)} {stats[key]}")
+
+    lines.append("# HELP db_replica_in_flight Requests currently routed to each replica")
+    lines.append("# TYPE db_replica_in_flight gauge")
+    for index, replica in enumerate(pools["replicas"]):
+        lines.append(f"db_replica_in_flight{format_labels({'replica': index})} {replica['in_flight']}")
+
+    # Wait histograms live on the pool class, so emit each class once
+    lines.append("# HELP db_pool_wait_seconds Time spent waiting for a pooled connection")
+    lines.append("# TYPE db_pool_wait_seconds histogram")
+    seen = set()
+    for _, stats in engines:
+        if stats["wait_seconds"] is not None and stats["pool_class"] not in seen:
+            seen.add(stats["pool_class"])
+            lines.extend(render_histogram("db_pool_wait_seconds", {"pool": stats["pool_class"]}, stats["wait_seconds"]))
+    return lines
+
+
+@REGISTRY.collector
+def collect_query_stats() -> List[str]:
+    lines = [
+        "# HELP db_statements_total SQL statements executed per route",
+        "# TYPE db_statements_total counter",
+    ]
+    routes = route_query_stats.snapshot()
+    for route, entry in routes.items():
+        lines.append(f"db_statements_total{format_labels({'route': route})} {entry['statements']}")
+    lines.append("# HELP db_seconds_total Time spent executing SQL per route")
+    lines.append("# TYPE db_seconds_total counter")
+    for route, entry in routes.items():
+        lines.append(f"db_seconds_total{format_labels({'route': route})} {entry['db_seconds']}")
+
+    slow = slow_query_counts()
+    if slow is not None:
+        lines.append("# HELP db_slow_queries_total Statements slower than SLOW_QUERY_THRESHOLD_MS")
+        lines.append("# TYPE db_slow_queries_total counter")
+        lines.append(f"db_slow_queries_total {slow['total']}")
+    return lines
+
+
+@REGISTRY.collector
+def collect_cache_stats() -> List[str]:
+    caches = all_cache_stats()
+    lines = []
+    for name, kind, key, documentation in (
+        ("cache_hits_total", "counter", "hits", "In-process cache hits"),
+        ("cache_misses_total", "counter", "misses", "In-process cache misses (including expired entries)"),
+        ("cache_entries", "gauge", "entries", "Entries currently held"),
+    ):
+        lines.append(f"# HELP {name} {documentation}")
+        lines.append(f"# TYPE {name} {kind}")
+        for cache, stats in caches.items():
+            lines.append(f"{name}{format_labels({'cache': cache})} {stats[key]}")
+    return lines
+
+
+@REGISTRY.collector
+def collect_catalog_cache_stats() -> List[str]:
+    stats = catalog_cache.stats()
+    return [
+        "# HELP catalog_cache_listings Product listings currently indexed for invalidation",
+        "# TYPE catalog_cache_listings gauge",
+        f"catalog_cache_listings {stats['listings']}",
+        "# HELP catalog_cache_invalidations_total Catalog entries dropped because a product changed",
+        "# TYPE catalog_cache_invalidations_total counter",
+        f"catalog_cache_invalidations_total {stats['invalidations']}",
+    ]
+
+
+@REGISTRY.collector
+def collect_home_snapshot_stats() -> List[str]:
+    stats = home_snapshot.stats()
+    lines = [
+        "# HELP home_snapshot_builds_total Homepage snapshots built",
+        "# TYPE home_snapshot_builds_total counter",
+        f"home_snapshot_builds_total {stats['builds']}",
+        "# HELP home_snapshot_build_failures_total Homepage snapshot builds that failed",
+        "# TYPE home_snapshot_build_failures_total counter",
+        f"home_snapshot_build_failures_total {stats['failures']}",
+    ]
+    if stats["age_seconds"] is not None:
+        lines.append("# HELP home_snapshot_age_seconds Time since the served homepage snapshot was built")
+        lines.append("# TYPE home_snapshot_age_seconds gauge")
+        lines.append(f"home_snapshot_age_seconds {stats['age_seconds']:.3f}")
+    return lines
+
+
+@REGISTRY.collector
+def collect_suggest_index_stats() -> List[str]:
+    stats = suggest_index.stats()
+    lines = [
+        "# HELP suggest_index_products Active products in the typeahead index",
+        "# TYPE suggest_index_products gauge",
+        f"suggest_index_products {stats['products']}",
+        "# HELP suggest_index_refreshes_total Typeahead index rebuilds and incremental reloads",
+        "# TYPE suggest_index_refreshes_total counter",
+        f"suggest_index_refreshes_total {stats['refreshes']}",
+        "# HELP suggest_index_refresh_failures_total Typeahead index refreshes that failed",
+        "# TYPE suggest_index_refresh_failures_total counter",
+        f"suggest_index_refresh_failures_total {stats['failures']}",
+    ]
+    if stats["age_seconds"] is not None:
+        lines.append("# HELP suggest_index_age_seconds Time since the typeahead index was last fully rebuilt")
+        lines.append("# TYPE suggest_index_age_seconds gauge")
+        lines.append(f"suggest_index_age_seconds {stats['age_seconds']:.3f}")
+    return lines
+
+
+@REGISTRY.collector
+def collect_password_hasher_stats() -> List[str]:
+    stats = password_hasher.stats()
+    lines = []
+    for name, kind, key, documentation in (
+        ("password_hash_workers", "gauge", "workers", "Threads available for bcrypt"),
+        ("password_hash_running", "gauge", "running", "bcrypt calls currently executing"),
+        ("password_hash_queue_depth", "gauge", "queued", "bcrypt calls waiting for a thread"),
+        ("password_hash_rejected_total", "counter", "rejected", "bcrypt calls rejected because the queue was full"),
+    ):
+        lines.append(f"# HELP {name} {documentation}")
+        lines.append(f"# TYPE {name} {kind}")
+        lines.append(f"{name} {stats[key]}")
+    lines.append("# HELP password_hash_wait_seconds Time bcrypt calls spent queued")
+    lines.append("# TYPE password_hash_wait_seconds histogram")
+    lines.extend(render_histogram("password_hash_wait_seconds", {}, stats["wait_seconds"]))
+    lines.append("# HELP password_hash_seconds Time spent hashing or verifying")
+    lines.append("# TYPE password_hash_seconds histogram")
+    lines.extend(render_histogram("password_hash_seconds", {}, stats["hash_seconds"]))
+    return lines
+
+
+@REGISTRY.collector
+def collect_login_throttle_stats() -> List[str]:
+    stats = login_throttle.stats()
+    lines = []
+    for name, kind, key, documentation in (
+        ("login_throttle_rejected_total", "counter", "rejected", "Sign-in and OTP attempts rejected with 429"),
+        ("login_throttle_tracked_keys", "gauge", "tracked", "Client IPs or accounts with recent attempts (in-process store)"),
+        ("login_throttle_blocked_keys", "gauge", "blocked", "Client IPs or accounts currently over their limit (in-process store)"),
+    ):
+        lines.append(f"# HELP {name} {documentation}")
+        lines.append(f"# TYPE {name} {kind}")
+        for scope, values in stats.items():
+            if values[key] is not None:
+                lines.append(f"{name}{format_labels({'scope': scope})} {values[key]}")
+    return lines
+
+
+@REGISTRY.collector
+def collect_token_revocation_stats() -> List[str]:
+    stats = token_revocations.stats()
+    lines = []
+    for name, kind, key, documentation in (
+        ("revoked_token_families", "gauge", "revoked_families", "Revoked token families held in memory"),
+        ("refresh_token_rotations_total", "counter", "rotations", "Refresh tokens exchanged for a new pair"),
+        ("refresh_token_reuse_total", "counter", "reuse_detected", "Used refresh tokens presented again (family revoked)"),
+        ("logouts_total", "counter", "logouts", "Sessions ended through /api/auth/logout"),
+    ):
+        lines.append(f"# HELP {name} {documentation}")
+        lines.append(f"# TYPE {name} {kind}")
+        lines.append(f"{name} {stats[key]}")
+    return lines
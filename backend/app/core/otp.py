@@ -0,0 +1,170 @@
+import asyncio
+import contextvars
+import enum
+import hmac
+import logging
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Dict, Optional, Tuple
+from sqlalchemy import delete, select
+from sqlalchemy.dialects import postgresql, sqlite
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal, async_engine
+from app.models.otp import OTPCode
+
+logger = logging.getLogger(__name__)
+
+
+class OTPResult(str, enum.Enum):
+    VALID = "valid"
+    MISSING = "missing"
+    EXPIRED = "expired"
+    INVALID = "invalid"
+    LOCKED = "locked"  # Too many wrong codes; the code has been discarded
+
+
+def _check(stored_code: str, expires_at: datetime, attempts: int, code: str) -> Tuple[OTPResult, int]:
+    """Outcome of presenting `code`, and the attempt count to keep (-1 = discard the code)"""
+    if datetime.utcnow() > expires_at:
+        return OTPResult.EXPIRED, -1
+    if hmac.compare_digest(stored_code, code):
+        return OTPResult.VALID, -1
+    attempts += 1
+    if attempts >= settings.OTP_MAX_ATTEMPTS:
+        return OTPResult.LOCKED, -1
+    return OTPResult.INVALID, attempts
+
+
+class MemoryOTPStore:
+    """Codes held in this worker; only for single-process deployments and development"""
+
+    def __init__(self):
+        self._codes: Dict[str, Tuple[str, datetime, int]] = {}
+        self._lock = threading.Lock()
+
+    async def issue(self, email: str, code: str, ttl: timedelta) -> None:
+        with self._lock:
+            self._codes[email] = (code, datetime.utcnow() + ttl, 0)
+
+    async def verify(self, email: str, code: str) -> OTPResult:
+        with self._lock:
+            entry = self._codes.get(email)
+            if entry is None:
+                return OTPResult.MISSING
+            result, attempts = _check(entry[0], entry[1], entry[2], code)
+            if attempts < 0:
+                del self._codes[email]
+            else:
+                self._codes[email] = (entry[0], entry[1], attempts)
+            return result
+
+    async def peek(self, email: str) -> Optional[str]:
+        entry = self._codes.get(email)
+        return entry[0] if entry else None
+
+    async def sweep(self) -> int:
+        now = datetime.utcnow()
+        with self._lock:
+            expired = [email for email, entry in self._codes.items() if entry[1] < now]
+            for email in expired:
+                del self._codes[email]
+        return len(expired)
+
+
+class DatabaseOTPStore:
+    """Codes in the otp_codes table, shared by every worker and instance"""
+
+    def __init__(self, batch_size: int):
+        self.batch_size = batch_size
+        dialect = async_engine.dialect.name
+        self._insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+
+    async def issue(self, email: str, code: str, ttl: timedelta) -> None:
+        # One upsert, so concurrent requests for the same address cannot both try to INSERT
+        fields = {"code": code, "expires_at": datetime.utcnow() + ttl, "attempts": 0}
+        statement = self._insert(OTPCode).values(email=email, **fields)
+        statement = statement.on_conflict_do_update(index_elements=[OTPCode.email], set_=fields)
+        async with AsyncSessionLocal() as db:
+            await db.execute(statement)
+            await db.commit()
+
+    async def verify(self, email: str, code: str) -> OTPResult:
+        async with AsyncSessionLocal() as db:
+            # Row lock on Postgres so concurrent guesses cannot share one attempt
+            entry = await db.get(OTPCode, email, with_for_update=True)
+            if entry is None:
+                return OTPResult.MISSING
+            result, attempts = _check(entry.code, entry.expires_at, entry.attempts, code)
+            if attempts < 0:
+                await db.delete(entry)
+            else:
+                entry.attempts = attempts
+            await db.commit()
+            return result
+
+    async def peek(self, email: str) -> Optional[str]:
+        async with AsyncSessionLocal() as db:
+            entry = await db.get(OTPCode, email)
+            return entry.code if entry else None
+
+    async def sweep(self) -> int:
+        """Delete expired codes in batches so no single statement holds locks for long"""
+        removed = 0
+        now = datetime.utcnow()
+        async with AsyncSessionLocal() as db:
+            while True:
+                batch = select(OTPCode.email).where(OTPCode.expires_at < now).limit(self.batch_size)
+                result = await db.execute(delete(OTPCode).where(OTPCode.email.in_(batch.scalar_subquery())))
+                await db.commit()
+                removed += result.rowcount
+                if result.rowcount < self.batch_size:
+                    return removed
+
+
+class OTPService:
+    """Issues and checks verification codes; expired codes are swept in the background"""
+
+    def __init__(self, store, sweep_interval: float):
+        self.store = store
+        self.sweep_interval = sweep_interval
+        self._swept_at = time.monotonic()
+        self._sweep_task = None
+
+    async def issue(self, email: str, code: str) -> None:
+        await self.store.issue(email.lower(), code, timedelta(minutes=settings.OTP_EXPIRE_MINUTES))
+        self._maybe_sweep()
+
+    async def verify(self, email: str, code: str) -> OTPResult:
+        return await self.store.verify(email.lower(), code)
+
+    async def peek(self, email: str) -> Optional[str]:
+        """The pending code for an address (development tooling only)"""
+        return await self.store.peek(email.lower())
+
+    def _maybe_sweep(self) -> None:
+        now = time.monotonic()
+        if now - self._swept_at < self.sweep_interval:
+            return
+        self._swept_at = now
+        # Fresh context so the sweep is not counted against the current request's queries
+        self._sweep_task = asyncio.get_running_loop().create_task(self._sweep(), context=contextvars.Context())
+
+    async def _sweep(self) -> None:
+        try:
+            removed = await self.store.sweep()
+            if removed:
+                logger.info("Removed %d expired OTP codes", removed)
+        except Exception:
+            logger.exception("OTP sweep failed")
+
+
+def _build_store():
+    if settings.OTP_STORE_BACKEND == "memory":
+        return MemoryOTPStore()
+    if settings.OTP_STORE_BACKEND != "database":
+        raise ValueError(f"Unknown OTP_STORE_BACKEND: {settings.OTP_STORE_BACKEND}")
+    return DatabaseOTPStore(batch_size=settings.OTP_SWEEP_BATCH_SIZE)
+
+
+otp_service = OTPService(_build_store(), sweep_interval=settings.OTP_SWEEP_INTERVAL_SECONDS)
@@ -0,0 +1,86 @@
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Any, List, Optional, Sequence
+from fastapi import HTTPException, status
+from sqlalchemy import DateTime, tuple_
+
+# Sent on list endpoints whose body is a bare JSON array
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(payload: dict) -> str:
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def decode_cursor(cursor: str, listing: str) -> dict:
+    """Payload of a cursor issued by `listing`, or 400 if it is malformed or from elsewhere"""
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        payload = None
+    if not isinstance(payload, dict) or payload.get("l") != listing:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+    return payload
+
+
+class Keyset:
+    """A unique sort order that a page can resume from without OFFSET.
+
+    The cursor holds the sort key of the last row served, and the next page
+    is "rows after that key", so its cost does not grow with depth and rows
+    inserted meanwhile are neither skipped nor repeated. Each keyset needs an
+    index on its columns (with any equality filters in front).
+    """
+
+    def __init__(self, listing: str, *columns, descending: bool = False):
+        self.listing = listing
+        self.columns = columns
+        self.descending = descending
+
+    def order(self, query):
+        return query.order_by(*(column.desc() if self.descending else column for column in self.columns))
+
+    def after(self, query, cursor: Optional[str]):
+        """Order the query and, given a cursor, start it after the cursor's row"""
+        query = self.order(query)
+        if cursor is None:
+            return query
+        key = self._decode(decode_cursor(cursor, self.listing).get("k"))
+        position = tuple_(*self.columns)
+        return query.where(position < tuple_(*key) if self.descending else position > tuple_(*key))
+
+    def next_cursor(self, rows: Sequence, limit: int) -> Optional[str]:
+        """Cursor for the page after `rows`, or None if this was the last page"""
+        if len(rows) < limit:
+            return None
+        last = rows[-1]
+        key = [getattr(last, column.key) for column in self.columns]
+        return encode_cursor({"l": self.listing, "k": [
+            value.isoformat() if isinstance(value, datetime) else value for value in key
+        ]})
+
+    def _decode(self, key: Any) -> List:
+        if not isinstance(key, list) or len(key) != len(self.columns):
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+        try:
+            return [
+                datetime.fromisoformat(value) if isinstance(column.type, DateTime) else column.type.python_type(value)
+                for column, value in zip(self.columns, key)
+            ]
+        except (TypeError, ValueError):
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
+
+def offset_cursor(listing: str, offset: int) -> str:
+    """Cursor for listings without a stable key (e.g. ranked search results)"""
+    return encode_cursor({"l": listing, "o": offset})
+
+
+def cursor_offset(cursor: str, listing: str) -> int:
+    offset = decode_cursor(cursor, listing).get("o")
+    if not isinstance(offset, int) or offset < 0:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+    return offset
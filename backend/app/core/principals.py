@@ -0,0 +1,78 @@
+from dataclasses import dataclass
+from typing import Optional
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.models.user import UserRole
+
+
+@dataclass(frozen=True)
+class Principal:
+    """The parts of a user that authentication and authorisation need"""
+
+    id: int
+    email: str
+    role: UserRole
+    is_active: bool
+    token_generation: int = 0
+
+    @classmethod
+    def from_user(cls, user) -> "Principal":
+        return cls(
+            id=user.id,
+            email=user.email,
+            role=user.role,
+            is_active=user.is_active,
+            token_generation=user.token_generation,
+        )
+
+    @property
+    def is_admin(self) -> bool:
+        return self.role == UserRole.ADMIN
+
+
+# Keyed by token subject (the user's email). Each worker has its own cache, so
+# changes made through another worker are picked up within the TTL.
+principal_cache = TTLCache(
+    "principals",
+    maxsize=settings.PRINCIPAL_CACHE_SIZE,
+    ttl=settings.PRINCIPAL_CACHE_TTL_SECONDS,
+)
+
+
+def get_cached_principal(subject: str) -> Optional[Principal]:
+    return principal_cache.get(subject)
+
+
+def cache_principal(principal: Principal) -> None:
+    principal_cache.set(principal.email, principal)
+
+
+def refresh_principal(user) -> None:
+    """Replace a user's cached principal with their freshly loaded row.
+
+    Unlike invalidation this keeps the new token generation in memory, so
+    tokens revoked by the change are rejected even on the claims-only path.
+    """
+    cache_principal(Principal.from_user(user))
+
+
+def forget_deleted_principal(user) -> None:
+    """Cache a deleted user as inactive with a bumped generation.
+
+    Dropping the entry would let the claims-only path accept the user's
+    tokens again on this worker. Requests that meet the tombstone are
+    checked against the database, which no longer has the user.
+    """
+    cache_principal(Principal(
+        id=user.id,
+        email=user.email,
+        role=user.role,
+        is_active=False,
+        token_generation=(user.token_generation or 0) + 1,
+    ))
+
+
+def invalidate_principal(email: Optional[str]) -> None:
+    """Drop a user's cached principal after their row changes"""
+    if email:
+        principal_cache.pop(email)
@@ -0,0 +1,187 @@
+import csv
+import io
+import json
+from typing import Dict, FrozenSet, Iterator, List, Optional, TextIO, Tuple, Union
+from pydantic import ValidationError
+from sqlalchemy import func, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.orm import Session
+from app.models.product import Product
+from app.models.tag import replace_product_tags
+from app.schemas.product import ProductCreate, ProductImportError, ProductImportResponse
+
+FORMATS = ("csv", "ndjson")
+# Columns of an import or export file, in order; rows are matched on sku
+FIELDS = list(ProductCreate.model_fields)
+# Rows per upsert statement (16 bound parameters each)
+IMPORT_BATCH_SIZE = 500
+# Rows fetched per round trip from the export cursor
+EXPORT_BATCH_SIZE = 1000
+# Errors listed in a report; the rest are only counted
+MAX_REPORTED_ERRORS = 100
+
+_UPDATED_FIELDS = [field for field in FIELDS if field != "sku"]
+
+
+def guess_format(filename: Optional[str]) -> Optional[str]:
+    """File format from its extension (.csv, .ndjson or .jsonl)"""
+    extension = (filename or "").rsplit(".", 1)[-1].lower()
+    return {"csv": "csv", "ndjson": "ndjson", "jsonl": "ndjson"}.get(extension)
+
+
+def read_rows(file: TextIO, format: str) -> Iterator[Tuple[int, Union[dict, str]]]:
+    """(line number, raw row) for each record, or (line number, error message) if it cannot be parsed"""
+    if format == "csv":
+        reader = csv.DictReader(file)
+        if reader.fieldnames is None:
+            return
+        line = reader.line_num + 1
+        for row in reader:
+            if None in row:
+                yield line, "More values than columns"
+            else:
+                # Empty cells count as absent: the default for new products, unchanged for existing ones
+                yield line, {key: value for key, value in row.items() if value != ""}
+            line = reader.line_num + 1
+        return
+
+    for line, text in enumerate(file, 1):
+        if not text.strip():
+            continue
+        try:
+            row = json.loads(text)
+        except ValueError as e:
+            yield line, f"Invalid JSON: {e}"
+            continue
+        yield line, row if isinstance(row, dict) else "Expected a JSON object"
+
+
+def _describe(error: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in item['loc']) or 'row'}: {item['msg']}" for item in error.errors()
+    )
+
+
+class _Import:
+    """State of one import: the pending batch and the running report"""
+
+    def __init__(self, db: Session, batch_size: int):
+        self.db = db
+        self.batch_size = batch_size
+        self.batch: Dict[str, Tuple[int, dict]] = {}
+        # Fields given in every row of the batch; only these are written over existing products
+        self.columns: FrozenSet[str] = frozenset()
+        self.report = ProductImportResponse()
+        dialect = db.get_bind().dialect.name
+        self._insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+
+    def add(self, line: int, row: Union[dict, str]) -> None:
+        if isinstance(row, str):
+            return self.fail(line, None, row)
+        try:
+            product = ProductCreate.model_validate(row)
+        except ValidationError as e:
+            return self.fail(line, row.get("sku") if isinstance(row.get("sku"), str) else None, _describe(e))
+        columns = frozenset(product.model_fields_set)
+        # A batch may touch each SKU once and updates one set of columns, so
+        # a repeated SKU or a row with other fields starts the next batch
+        if product.sku in self.batch or len(self.batch) >= self.batch_size or columns != self.columns:
+            self.flush()
+        self.columns = columns
+        self.batch[product.sku] = (line, product.model_dump())
+
+    def fail(self, line: int, sku: Optional[str], error: str) -> None:
+        self.report.failed += 1
+        if len(self.report.errors) < MAX_REPORTED_ERRORS:
+            self.report.errors.append(ProductImportError(line=line, sku=sku, error=error))
+
+    def flush(self) -> None:
+        if not self.batch:
+            return
+        rows = list(self.batch.values())
+        self.batch = {}
+        try:
+            counts = self._upsert([row for _, row in rows])
+            self.db.commit()
+            self._count(*counts)
+        except DBAPIError:
+            self.db.rollback()
+            # Find the offending rows one at a time; the others still go in
+            for line, row in rows:
+                try:
+                    counts = self._upsert([row])
+                    self.db.commit()
+                    self._count(*counts)
+                except DBAPIError as e:
+                    self.db.rollback()
+                    self.fail(line, row["sku"], str(e.orig).splitlines()[0])
+
+    def _count(self, created: int, updated: int) -> None:
+        self.report.created += created
+        self.report.updated += updated
+
+    def _upsert(self, rows: List[dict]) -> Tuple[int, int]:
+        """Write one batch; (created, updated) once committed"""
+        skus = [row["sku"] for row in rows]
+        existing = len(self.db.execute(select(Product.id).where(Product.sku.in_(skus))).all())
+        # New products get every field (defaults included); existing ones only the fields the file gave
+        statement = self._insert(Product).values(rows)
+        updated = [field for field in _UPDATED_FIELDS if field in self.columns]
+        statement = statement.on_conflict_do_update(
+            index_elements=[Product.sku],
+            set_={**{field: statement.excluded[field] for field in updated}, "updated_at": func.now()},
+        )
+        upserted = self.db.execute(statement.returning(Product.id, Product.tags)).all()
+        # Core statements bypass the mapper events that keep product_tags in step
+        replace_product_tags(self.db.connection(), upserted)
+        return len(upserted) - existing, existing
+
+
+def import_products(
+    db: Session, file: TextIO, format: str, batch_size: int = IMPORT_BATCH_SIZE
+) -> ProductImportResponse:
+    """Create or update products from a CSV or NDJSON file, matched on sku.
+
+    Each batch is one INSERT ... ON CONFLICT (sku) DO UPDATE and is committed
+    on its own, so the import is not atomic. Existing products keep any field
+    a row leaves out or blank. Rows that fail validation or the database are
+    reported and skipped. Callers clear the catalog cache.
+    """
+    state = _Import(db, batch_size)
+    for line, row in read_rows(file, format):
+        state.add(line, row)
+    state.flush()
+    return state.report
+
+
+def _export_value(value):
+    return value.value if hasattr(value, "value") else value
+
+
+def export_products(db: Session, format: str, batch_size: int = EXPORT_BATCH_SIZE) -> Iterator[str]:
+    """Every product as CSV or NDJSON text chunks, read through a server-side cursor"""
+    result = db.execute(
+        select(*(getattr(Product, field) for field in FIELDS)).order_by(Product.id),
+        execution_options={"stream_results": True, "yield_per": batch_size},
+    )
+    if format == "csv":
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, lineterminator="\n")
+        writer.writerow(FIELDS)
+        for rows in result.partitions():
+            writer.writerows(
+                [str(value).lower() if isinstance(value, bool) else _export_value(value) for value in row]
+                for row in rows
+            )
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+        if buffer.tell():
+            yield buffer.getvalue()
+        return
+
+    for rows in result.partitions():
+        yield "".join(
+            json.dumps(dict(zip(FIELDS, map(_export_value, row))), ensure_ascii=False) + "\n" for row in rows
+        )
@@ -0,0 +1,221 @@
+import asyncio
+import contextvars
+import heapq
+import logging
+import time
+from typing import Dict, List, Optional, Set, Tuple
+from sqlalchemy import delete, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal, async_engine
+from app.core.metrics import Counter
+from app.core.startup import cache_warmer, on_shutdown
+from app.models.token import RevokedToken
+
+logger = logging.getLogger(__name__)
+
+# Revocations written by other workers can land slightly out of revoked_at order
+SYNC_OVERLAP_SECONDS = 2.0
+# Expired rows are deleted from the table at most this often per worker
+SWEEP_INTERVAL_SECONDS = 3600.0
+
+
+class RevocationSet:
+    """Revoked ids in memory, grouped into buckets by expiry.
+
+    Membership is a set lookup. Buckets are kept in a heap ordered by their
+    start so expired ids are dropped a whole bucket at a time; an id may
+    outlive its expiry by up to one bucket, which is harmless because the
+    tokens it covers have expired too.
+    """
+
+    def __init__(self, bucket_seconds: int = 3600):
+        self.bucket_seconds = bucket_seconds
+        self._ids: Set[str] = set()
+        self._buckets: Dict[int, List[str]] = {}
+        self._starts: List[int] = []
+
+    def add(self, token_id: str, expires_at: float) -> None:
+        if token_id in self._ids:
+            return
+        start = int(expires_at // self.bucket_seconds) * self.bucket_seconds
+        bucket = self._buckets.get(start)
+        if bucket is None:
+            bucket = self._buckets[start] = []
+            heapq.heappush(self._starts, start)
+        bucket.append(token_id)
+        self._ids.add(token_id)
+
+    def purge(self, now: float) -> None:
+        while self._starts and self._starts[0] + self.bucket_seconds <= now:
+            for token_id in self._buckets.pop(heapq.heappop(self._starts)):
+                self._ids.discard(token_id)
+
+    def __contains__(self, token_id: str) -> bool:
+        return token_id in self._ids
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+
+class TokenRevocations:
+    """Refresh-token rotation and logout, backed by the revoked_tokens table.
+
+    Revoked families and the refresh tokens this worker has exchanged are
+    held in memory, so neither checking an access token nor rotating a refresh
+    token waits on the database: syncs run as background tasks and each worker
+    sees families revoked elsewhere about `sync_interval` seconds late at most.
+    Used jtis are written to the table in batches after the response; a jti
+    that is already there was exchanged on another worker, so the conflict
+    revokes the family.
+    """
+
+    def __init__(self, sync_interval: float):
+        self.sync_interval = sync_interval
+        self.families = RevocationSet()
+        self.rotations = Counter()
+        self.reuse_detected = Counter()
+        self.logouts = Counter()
+        self.used = RevocationSet()
+        self._pending: List[Tuple[str, str, int, Optional[str]]] = []
+        self._persist_task = None
+        dialect = async_engine.dialect.name
+        self._insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+        self._watermark = 0.0
+        self._checked_at = float("-inf")
+        self._swept_at = 0.0
+        self._syncing = False
+        self._sync_task = None
+
+    def _is_stale(self) -> bool:
+        return not self._syncing and time.monotonic() - self._checked_at >= self.sync_interval
+
+    async def sync(self) -> None:
+        """Load families revoked since the last sync"""
+        self._syncing = True
+        try:
+            wall = time.time()
+            async with AsyncSessionLocal() as db:
+                result = await db.execute(
+                    select(RevokedToken.token_id, RevokedToken.expires_at, RevokedToken.revoked_at).where(
+                        RevokedToken.kind == "family",
+                        RevokedToken.revoked_at >= self._watermark - SYNC_OVERLAP_SECONDS,
+                        RevokedToken.expires_at > wall,
+                    )
+                )
+                for token_id, expires_at, revoked_at in result.all():
+                    self.families.add(token_id, expires_at)
+                    self._watermark = max(self._watermark, revoked_at)
+
+                if wall - self._swept_at >= SWEEP_INTERVAL_SECONDS:
+                    self._swept_at = wall
+                    await db.execute(delete(RevokedToken).where(RevokedToken.expires_at <= wall))
+                    await db.commit()
+            self.families.purge(wall)
+            self.used.purge(wall)
+            self._checked_at = time.monotonic()
+        except Exception:
+            # Keep serving from the current set; the next request retries
+            logger.exception("Could not sync revoked token families")
+            self._checked_at = time.monotonic()
+        finally:
+            self._syncing = False
+
+    def is_family_revoked(self, family: str) -> bool:
+        if self._is_stale():
+            self._syncing = True
+            # Fresh context so the sync is not counted against the current request's queries
+            self._sync_task = asyncio.get_running_loop().create_task(self.sync(), context=contextvars.Context())
+        return family in self.families
+
+    async def revoke_family(self, family: str) -> None:
+        """Revoke every access and refresh token issued in a family"""
+        now = time.time()
+        # Tokens issued in the family expire by then at the latest
+        expires_at = int(now + settings.REFRESH_TOKEN_EXPIRE_DAYS * 86400)
+        async with AsyncSessionLocal() as db:
+            db.add(RevokedToken(token_id=family, kind="family", expires_at=expires_at, revoked_at=now))
+            try:
+                await db.commit()
+            except IntegrityError:
+                pass  # Already revoked
+        self.families.add(family, expires_at)
+
+    async def rotate(self, payload: dict) -> bool:
+        """Mark a refresh token as used; False if it was revoked or had already been used"""
+        jti, family = payload.get("jti"), payload.get("fam")
+        if jti is None or family is None:
+            # Issued before rotation existed; the caller starts a new family
+            return True
+        if self.is_family_revoked(family):
+            return False
+        if jti in self.used:
+            await self._revoke_reused(family, payload.get("sub"))
+            return False
+
+        self.used.add(jti, payload["exp"])
+        self._pending.append((jti, family, int(payload["exp"]), payload.get("sub")))
+        if self._persist_task is None:
+            # Fresh context so the write is not counted against the current request's queries
+            self._persist_task = asyncio.get_running_loop().create_task(self.persist(), context=contextvars.Context())
+        self.rotations.inc()
+        return True
+
+    async def persist(self) -> None:
+        """Write used jtis to the table; one that is already there was exchanged on another worker"""
+        try:
+            while self._pending:
+                batch, self._pending = self._pending, []
+                now = time.time()
+                statement = self._insert(RevokedToken).values([
+                    {"token_id": jti, "kind": "token", "expires_at": expires_at, "revoked_at": now}
+                    for jti, _, expires_at, _ in batch
+                ]).on_conflict_do_nothing().returning(RevokedToken.token_id)
+                try:
+                    async with AsyncSessionLocal() as db:
+                        inserted = set((await db.execute(statement)).scalars())
+                        await db.commit()
+                except Exception:
+                    # Keep the batch; the next rotation retries it
+                    logger.exception("Could not persist %d used refresh tokens", len(batch))
+                    self._pending[:0] = batch
+                    return
+                for jti, family, _, subject in batch:
+                    if jti not in inserted:
+                        await self._revoke_reused(family, subject)
+        finally:
+            self._persist_task = None
+
+    async def _revoke_reused(self, family: str, subject: Optional[str]) -> None:
+        # A refresh token is only ever presented twice if someone else has a copy of it
+        logger.warning("Refresh token reuse detected for %s; revoking its family", subject)
+        self.reuse_detected.inc()
+        await self.revoke_family(family)
+
+    async def logout(self, payload: dict) -> None:
+        family = payload.get("fam")
+        if family is not None:
+            await self.revoke_family(family)
+        self.logouts.inc()
+
+    def stats(self) -> dict:
+        return {
+            "revoked_families": len(self.families),
+            "rotations": self.rotations.value,
+            "reuse_detected": self.reuse_detected.value,
+            "logouts": self.logouts.value,
+        }
+
+
+token_revocations = TokenRevocations(settings.TOKEN_REVOCATION_SYNC_SECONDS)
+
+
+@cache_warmer
+async def load_revoked_families() -> None:
+    await token_revocations.sync()
+
+
+@on_shutdown
+async def persist_used_tokens() -> None:
+    await token_revocations.persist()
@@ -0,0 +1,108 @@
+import logging
+import re
+from typing import List
+from sqlalchemy import column, func, inspect, literal_column, or_, select, table
+from app.core.database import async_engine
+from app.core.startup import cache_warmer
+from app.models.product import Product
+
+logger = logging.getLogger(__name__)
+
+# Words beyond this are ignored; every word narrows the match further
+MAX_TERMS = 8
+
+_WORD = re.compile(r"\w+")
+_products_fts = table("products_fts", column("rowid"))
+# Column weights for bm25(): a hit in the name beats tags, which beat the description
+_FTS5_WEIGHTS = (10.0, 5.0, 1.0)
+
+
+def search_terms(search: str) -> List[str]:
+    """Words in a search string, lowercased; punctuation never reaches the query syntax"""
+    return _WORD.findall(search.lower())[:MAX_TERMS]
+
+
+class ProductSearch:
+    """Ranked product search on whichever full-text index the database has.
+
+    `postgresql` uses the products.search_vector column and its GIN index,
+    `sqlite` the products_fts FTS5 table. Every word is matched as a prefix
+    and all words must match. `like` is the old substring scan, used when
+    the index has not been created yet (`alembic upgrade head`).
+    """
+
+    def __init__(self):
+        self.backend = "like"
+
+    def detect(self, sync_conn) -> str:
+        dialect = sync_conn.dialect.name
+        inspector = inspect(sync_conn)
+        if dialect == "postgresql":
+            columns = {column["name"] for column in inspector.get_columns("products")}
+            if "search_vector" in columns:
+                return "postgresql"
+        elif dialect == "sqlite" and "products_fts" in inspector.get_table_names():
+            return "sqlite"
+        logger.warning("No full-text index on products; search falls back to LIKE (run `alembic upgrade head`)")
+        return "like"
+
+    def apply(self, query, search: str):
+        """Filter a product query (Select or ORM Query) by search text, best matches first"""
+        terms = search_terms(search)
+        if not terms or self.backend == "like":
+            return self._like(query, search)
+
+        if self.backend == "postgresql":
+            vector, tsquery = self._tsquery(terms)
+            return query.where(vector.op("@@")(tsquery)).order_by(func.ts_rank(vector, tsquery).desc(), Product.id)
+
+        fts = literal_column("products_fts")
+        return (
+            query.join(_products_fts, _products_fts.c.rowid == Product.id)
+            .where(fts.op("MATCH")(self._fts5_match(terms)))
+            .order_by(func.bm25(fts, *_FTS5_WEIGHTS), Product.id)
+        )
+
+    def filter(self, query, search: str):
+        """Like apply() but unranked, for counting matches.
+
+        On SQLite the matches are looked up once as a set of rowids; a join lets
+        the planner start from products and run the MATCH once per product.
+        """
+        terms = search_terms(search)
+        if not terms or self.backend == "like":
+            return self._like(query, search)
+
+        if self.backend == "postgresql":
+            vector, tsquery = self._tsquery(terms)
+            return query.where(vector.op("@@")(tsquery))
+
+        matches = select(_products_fts.c.rowid).where(literal_column("products_fts").op("MATCH")(self._fts5_match(terms)))
+        return query.where(Product.id.in_(matches))
+
+    @staticmethod
+    def _tsquery(terms: List[str]):
+        vector = literal_column("products.search_vector")
+        return vector, func.to_tsquery(literal_column("'english'::regconfig"), " & ".join(f"{term}:*" for term in terms))
+
+    @staticmethod
+    def _fts5_match(terms: List[str]) -> str:
+        return " ".join(f'"{term}"*' for term in terms)
+
+    @staticmethod
+    def _like(query, search: str):
+        search_filter = f"%{search}%"
+        return query.where(or_(
+            Product.name.ilike(search_filter),
+            Product.description.ilike(search_filter),
+            Product.tags.ilike(search_filter),
+        ))
+
+
+product_search = ProductSearch()
+
+
+@cache_warmer
+async def detect_search_backend() -> None:
+    async with async_engine.connect() as conn:
+        product_search.backend = await conn.run_sync(product_search.detect)
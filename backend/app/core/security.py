@@ -1,8 +1,20 @@
+import asyncio
+import hashlib
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Callable, Optional
 from jose import JWTError, jwt
 from passlib.context import CryptContext
+from app.core.cache import TTLCache
 from app.core.config import settings
+from app.core.metrics import Counter, Histogram
+
+# Bump when the claim layout changes; tokens with another version get the full database check
+TOKEN_CLAIMS_VERSION = 1
 
 # Password hashing context
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
@@ -18,6 +30,97 @@ def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
 
+class PasswordHasherBusy(Exception):
+    """Raised when too many hash/verify calls are already waiting for a worker"""
+
+
+class PasswordHasher:
+    """Runs bcrypt on a bounded thread pool so it never blocks the event loop.
+
+    bcrypt releases the GIL, so `workers` threads hash in parallel. Calls
+    beyond `workers + max_queue` are rejected straight away: a login burst
+    then fails fast instead of queueing behind seconds of hashing.
+    """
+
+    def __init__(self, workers: int, max_queue: int):
+        self.workers = workers
+        self.max_queue = max_queue
+        self.running = 0
+        self.queued = 0
+        self.rejected = Counter()
+        self.wait_seconds = Histogram()
+        self.hash_seconds = Histogram()
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bcrypt")
+        self._lock = threading.Lock()
+
+    def _run(self, func: Callable, args: tuple, queued_at: float):
+        started = time.perf_counter()
+        with self._lock:
+            self.queued -= 1
+            self.running += 1
+        self.wait_seconds.observe(started - queued_at)
+        try:
+            return func(*args)
+        finally:
+            self.hash_seconds.observe(time.perf_counter() - started)
+            with self._lock:
+                self.running -= 1
+
+    async def run(self, func: Callable, *args):
+        with self._lock:
+            if self.queued + self.running >= self.workers + self.max_queue:
+                self.rejected.inc()
+                raise PasswordHasherBusy()
+            self.queued += 1
+        future = self._executor.submit(self._run, func, args, time.perf_counter())
+        future.add_done_callback(self._release_if_cancelled)
+        return await asyncio.wrap_future(future)
+
+    def _release_if_cancelled(self, future) -> None:
+        # A caller cancelled (e.g. disconnected) before a worker took the job never reaches _run
+        if future.cancelled():
+            with self._lock:
+                self.queued -= 1
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "running": self.running,
+            "queued": self.queued,
+            "rejected": self.rejected.value,
+            "wait_seconds": self.wait_seconds.snapshot(),
+            "hash_seconds": self.hash_seconds.snapshot(),
+        }
+
+
+# Leave cores for the event loop: on a small box bcrypt would otherwise starve it
+password_hasher = PasswordHasher(
+    settings.PASSWORD_HASH_WORKERS or max(1, (os.cpu_count() or 1) // 2),
+    settings.PASSWORD_HASH_MAX_QUEUE,
+)
+
+
+async def async_verify_password(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password on the bcrypt pool"""
+    return await password_hasher.run(verify_password, plain_password, hashed_password)
+
+
+async def async_get_password_hash(password: str) -> str:
+    """Hash a password on the bcrypt pool"""
+    return await password_hasher.run(get_password_hash, password)
+
+
+def token_claims(user) -> dict:
+    """Identity claims for a user's access and refresh tokens"""
+    return {
+        "sub": user.email,
+        "uid": user.id,
+        "role": user.role.value,
+        "gen": user.token_generation,
+        "ver": TOKEN_CLAIMS_VERSION,
+    }
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """Create a JWT access token"""
     to_encode = data.copy()
@@ -31,17 +134,41 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     return encoded_jwt
 
 
+def new_token_family() -> str:
+    """Id shared by the tokens of one sign-in session, across refreshes"""
+    return uuid.uuid4().hex
+
+
 def create_refresh_token(data: dict) -> str:
-    """Create a JWT refresh token"""
+    """Create a single-use JWT refresh token"""
     to_encode = data.copy()
     expire = datetime.utcnow() + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
-    to_encode.update({"exp": expire, "type": "refresh"})
+    to_encode.update({"exp": expire, "type": "refresh", "jti": uuid.uuid4().hex})
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
     return encoded_jwt
 
 
+# Verified claims keyed by token digest, so raw tokens are not kept in memory.
+# Each entry lives until the token's own exp; invalid tokens are never cached.
+token_cache = TTLCache("tokens", maxsize=settings.TOKEN_CACHE_SIZE, ttl=0)
+
+
 def decode_token(token: str) -> Optional[dict]:
-    """Decode and verify a JWT token"""
+    """Decode and verify a JWT token (the returned claims are shared, do not modify)"""
+    if settings.TOKEN_CACHE_SIZE <= 0:
+        return _verify_token(token)
+    
+    key = hashlib.sha256(token.encode()).digest()
+    payload = token_cache.get(key)
+    if payload is None:
+        payload = _verify_token(token)
+        remaining = payload.get("exp", 0) - time.time() if payload is not None else 0
+        if remaining > 0:
+            token_cache.set(key, payload, ttl=remaining)
+    return payload
+
+
+def _verify_token(token: str) -> Optional[dict]:
     try:
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
         return payload
@@ -0,0 +1,112 @@
+import asyncio
+import logging
+import time
+from typing import Awaitable, Callable, List
+from sqlalchemy import inspect, text
+from sqlalchemy.exc import OperationalError
+from app.core.config import settings
+from app.core.database import Base, engine, async_engine, replica_router
+
+logger = logging.getLogger(__name__)
+
+# Arbitrary key shared by every worker for the schema advisory lock
+SCHEMA_LOCK_KEY = 724_310_001
+
+# Coroutines that fill in-process caches before the first request
+_cache_warmers: List[Callable[[], Awaitable[None]]] = []
+# Coroutines that flush in-process state before the engines are disposed
+_shutdown_hooks: List[Callable[[], Awaitable[None]]] = []
+
+
+def cache_warmer(func: Callable[[], Awaitable[None]]):
+    """Register a coroutine function to run once at startup"""
+    _cache_warmers.append(func)
+    return func
+
+
+def on_shutdown(func: Callable[[], Awaitable[None]]):
+    """Register a coroutine function to run once at shutdown"""
+    _shutdown_hooks.append(func)
+    return func
+
+
+async def _prepare_schema() -> None:
+    async with async_engine.begin() as conn:
+        if conn.dialect.name == "postgresql":
+            # Serialise workers (and a concurrent `alembic upgrade`) on the DDL
+            await conn.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": SCHEMA_LOCK_KEY})
+
+        if settings.DB_CREATE_ALL_ON_STARTUP:
+            await conn.run_sync(Base.metadata.create_all)
+
+        if settings.DB_SCHEMA_CHECK_ON_STARTUP:
+            existing = await conn.run_sync(lambda sync_conn: set(inspect(sync_conn).get_table_names()))
+            missing = sorted(set(Base.metadata.tables) - existing)
+            if missing:
+                logger.warning("Database is missing tables: %s (run `alembic upgrade head`)", ", ".join(missing))
+
+
+async def prepare_schema() -> None:
+    """Create missing tables and report schema drift, once per worker"""
+    import app.models  # noqa: F401 - registers every table on Base.metadata
+
+    try:
+        await _prepare_schema()
+    except OperationalError:
+        # Another worker created a table between our existence check and CREATE
+        await _prepare_schema()
+
+
+def _warm_sync_engine(target, count: int) -> None:
+    connections = [target.connect() for _ in range(count)]
+    for connection in connections:
+        connection.close()
+
+
+async def _warm_async_engine(target, count: int) -> None:
+    connections = await asyncio.gather(*(target.connect() for _ in range(count)))
+    for connection in connections:
+        await connection.close()
+
+
+async def warm_pools() -> None:
+    """Open connections up front so the first requests skip the connect handshake"""
+    count = settings.DB_POOL_WARM_CONNECTIONS
+    if count <= 0:
+        return
+
+    for target in [engine, *replica_router.engines]:
+        await asyncio.to_thread(_warm_sync_engine, target, count)
+    for target in [async_engine, *replica_router.async_engines]:
+        await _warm_async_engine(target, count)
+
+
+async def preload_caches() -> None:
+    for warmer in _cache_warmers:
+        try:
+            await warmer()
+        except Exception:
+            # A cold cache is slower, not broken, so never block startup on it
+            logger.exception("Cache warmer %s failed", warmer.__name__)
+
+
+async def startup() -> None:
+    start = time.perf_counter()
+    await prepare_schema()
+    await warm_pools()
+    await preload_caches()
+    logger.info("Startup completed in %.1f ms", (time.perf_counter() - start) * 1000)
+
+
+async def shutdown() -> None:
+    for hook in _shutdown_hooks:
+        try:
+            await hook()
+        except Exception:
+            logger.exception("Shutdown hook %s failed", hook.__name__)
+    await async_engine.dispose()
+    engine.dispose()
+    for target in replica_router.async_engines:
+        await target.dispose()
+    for target in replica_router.engines:
+        target.dispose()
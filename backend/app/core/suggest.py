@@ -0,0 +1,248 @@
+import asyncio
+import bisect
+import contextvars
+import heapq
+import logging
+import re
+import time
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Set, Tuple
+from sqlalchemy import select
+from app.core.catalog import catalog_cache
+from app.core.config import settings
+from app.core.database import async_read_session
+from app.core.metrics import Counter
+from app.core.search import search_terms
+from app.core.startup import cache_warmer
+from app.models.product import Product, ProductCategory
+from app.models.tag import normalize_tags
+
+logger = logging.getLogger(__name__)
+
+_WORD = re.compile(r"\w+")
+# Above this many changed products a refresh reloads everything instead
+MAX_INCREMENTAL_REFRESH = 5000
+# Ids per "WHERE id IN (...)" when reloading changed products
+RELOAD_CHUNK_SIZE = 500
+# Wait before retrying a failed refresh, doubled after each failure up to the cap
+REFRESH_RETRY_SECONDS = 1.0
+MAX_REFRESH_RETRY_SECONDS = 60.0
+
+
+class Suggestion(NamedTuple):
+    id: int
+    name: str
+    category: ProductCategory
+    is_popular: bool
+    keys: Tuple[Tuple[str, int], ...]  # (indexed word, tier): name words, then tags and their words
+
+    @classmethod
+    def of(cls, id: int, name: str, category: ProductCategory, is_popular: bool, tags: Optional[str]) -> "Suggestion":
+        # Tier 0: the name's first word, 1: its other words, 2: tags and tag words
+        tiers: Dict[str, int] = {}
+        for position, word in enumerate(_WORD.findall(name.lower())):
+            tiers.setdefault(word, min(position, 1))
+        for tag in normalize_tags(tags):
+            for word in (tag, *_WORD.findall(tag)):
+                tiers.setdefault(word, 2)
+        return cls(id, name, category, bool(is_popular), tuple(tiers.items()))
+
+    def postings(self) -> Iterator[Tuple[str, tuple]]:
+        """(word, posting) pairs; postings sort best match first"""
+        for word, tier in self.keys:
+            yield word, (tier, not self.is_popular, len(self.name), self.name, self.id)
+
+    def matches(self, terms: List[str]) -> bool:
+        return all(any(word.startswith(term) for word, _ in self.keys) for term in terms)
+
+
+class SuggestIndex:
+    """Typeahead over active product names and tags, held in memory.
+
+    `words` is every indexed word, sorted, so the words starting with a
+    prefix are one bisect away. Each word's postings are kept in rank
+    order, so a lookup merges the postings of those words and stops after
+    `limit` products, however many match. Catalog writes in this worker
+    name the products they changed and only those are reloaded; a full
+    reload every `max_age` seconds picks up writes made through other workers.
+    """
+
+    def __init__(self, max_age: float):
+        self.max_age = max_age
+        self.words: List[str] = []
+        self.postings: Dict[str, List[tuple]] = {}
+        self.products: Dict[int, Suggestion] = {}
+        self.built_at: Optional[float] = None
+        self.refreshes = Counter()
+        self.failures = Counter()
+        self._dirty: Optional[Set[int]] = set()  # None: reload everything
+        self._task: Optional[asyncio.Task] = None
+        self._failed_in_a_row = 0
+
+    async def suggest(self, query: str, limit: int, category: Optional[ProductCategory] = None) -> List[Suggestion]:
+        if self.built_at is None:
+            # Shielded so a client disconnecting does not cancel the build for everyone
+            await asyncio.shield(self._schedule(0))
+            if self.built_at is None:
+                raise RuntimeError("The suggestion index could not be built")
+        elif time.monotonic() - self.built_at >= self.max_age:
+            self._dirty = None
+            self._schedule(0)
+        return self.lookup(query, limit, category)
+
+    def lookup(self, query: str, limit: int, category: Optional[ProductCategory] = None) -> List[Suggestion]:
+        """Products with a word or tag starting with every word of `query`.
+
+        Ranked by where the first word matched (the name's first word, any
+        name word, a tag), then popular products, then shorter names.
+        """
+        terms = search_terms(query)
+        if not terms:
+            return []
+        # Walk the word with the fewest postings; check the other words on each hit's own keys
+        candidates = [self._words_with_prefix(term) for term in terms]
+        walk = min(candidates, key=lambda words: sum(len(self.postings[word]) for word in words))
+        suggestions, seen = [], set()
+        for posting in heapq.merge(*(self.postings[word] for word in walk)):
+            product_id = posting[-1]
+            if product_id in seen:
+                continue
+            seen.add(product_id)
+            product = self.products[product_id]
+            if (category is None or product.category == category) and product.matches(terms):
+                suggestions.append(product)
+                if len(suggestions) == limit:
+                    break
+        return suggestions
+
+    def changed(self, product_ids: Optional[Set[int]]) -> None:
+        """Catalog listener: reload these products soon (called under the catalog lock, so never blocks)"""
+        if product_ids is not None and not product_ids:
+            return  # Only stock or prices changed
+        if product_ids is None or self._dirty is None:
+            self._dirty = None
+        else:
+            self._dirty.update(product_ids)
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return  # Written outside the event loop; the next refresh after max_age catches up
+        self._schedule(catalog_cache.settle_seconds)
+
+    def _words_with_prefix(self, term: str) -> List[str]:
+        start = bisect.bisect_left(self.words, term)
+        # Every word with the prefix sorts before the prefix followed by the highest code point
+        return self.words[start:bisect.bisect_left(self.words, term + "\U0010ffff", start)]
+
+    def _schedule(self, delay: float) -> asyncio.Task:
+        if self._task is None or self._task.done():
+            # Fresh context so the refresh is not counted against the current request's queries
+            self._task = asyncio.get_running_loop().create_task(self._refresh(delay), context=contextvars.Context())
+        return self._task
+
+    async def _refresh(self, delay: float) -> None:
+        while True:
+            if delay:
+                await asyncio.sleep(delay)
+            dirty, self._dirty = self._dirty, set()
+            if self.built_at is None or dirty is None or len(dirty) > MAX_INCREMENTAL_REFRESH:
+                dirty = None
+            elif not dirty:
+                return  # A retry found nothing left to do
+            try:
+                await (self.rebuild() if dirty is None else self.reload(dirty))
+                self.refreshes.inc()
+                self._failed_in_a_row = 0
+            except Exception:
+                # Keep what was not refreshed marked dirty and try again later
+                self._dirty = None if dirty is None or self._dirty is None else self._dirty | dirty
+                self.failures.inc()
+                retry = min(REFRESH_RETRY_SECONDS * 2 ** self._failed_in_a_row, MAX_REFRESH_RETRY_SECONDS)
+                self._failed_in_a_row += 1
+                logger.exception("Could not refresh the suggestion index, retrying in %.0f s", retry)
+                # A new task, so requests waiting for the first build are not held up by the retries
+                asyncio.get_running_loop().call_later(retry, self._schedule, 0)
+                return
+            if self._dirty is not None and not self._dirty:
+                return
+            # Products changed while refreshing
+            delay = catalog_cache.settle_seconds
+
+    async def rebuild(self) -> None:
+        """Load every active product and swap in a new index"""
+        products = await self._load()
+        # Sorting the postings takes a while on a large catalog, so not on the event loop
+        words, postings, by_id = await asyncio.to_thread(self._build, products)
+        self.words, self.postings, self.products = words, postings, by_id
+        self.built_at = time.monotonic()
+
+    async def reload(self, product_ids: Set[int]) -> None:
+        """Re-read some products and patch their entries in place"""
+        ids = sorted(product_ids)
+        loaded = {}
+        for start in range(0, len(ids), RELOAD_CHUNK_SIZE):
+            chunk = ids[start:start + RELOAD_CHUNK_SIZE]
+            loaded.update((product.id, product) for product in await self._load(chunk))
+        for product_id in ids:
+            self._remove(product_id)
+            if product_id in loaded:
+                self._add(loaded[product_id])
+
+    async def _load(self, product_ids: Optional[Iterable[int]] = None) -> List[Suggestion]:
+        query = select(Product.id, Product.name, Product.category, Product.is_popular, Product.tags).where(
+            Product.is_active == True
+        )
+        if product_ids is not None:
+            query = query.where(Product.id.in_(product_ids))
+        async with async_read_session() as db:
+            return [Suggestion.of(*row) for row in (await db.execute(query)).all()]
+
+    @staticmethod
+    def _build(products: List[Suggestion]) -> Tuple[List[str], Dict[str, List[tuple]], Dict[int, Suggestion]]:
+        postings: Dict[str, List[tuple]] = {}
+        for product in products:
+            for word, posting in product.postings():
+                postings.setdefault(word, []).append(posting)
+        for word_postings in postings.values():
+            word_postings.sort()
+        return sorted(postings), postings, {product.id: product for product in products}
+
+    def _add(self, product: Suggestion) -> None:
+        self.products[product.id] = product
+        for word, posting in product.postings():
+            word_postings = self.postings.get(word)
+            if word_postings is None:
+                self.postings[word] = word_postings = []
+                bisect.insort(self.words, word)
+            bisect.insort(word_postings, posting)
+
+    def _remove(self, product_id: int) -> None:
+        product = self.products.pop(product_id, None)
+        if product is None:
+            return
+        for word, posting in product.postings():
+            word_postings = self.postings[word]
+            index = bisect.bisect_left(word_postings, posting)
+            if index < len(word_postings) and word_postings[index] == posting:
+                del word_postings[index]
+            if not word_postings:
+                del self.postings[word]
+                del self.words[bisect.bisect_left(self.words, word)]
+
+    def stats(self) -> dict:
+        age = time.monotonic() - self.built_at if self.built_at is not None else None
+        return {
+            "products": len(self.products),
+            "words": len(self.words),
+            "age_seconds": age,
+            "refreshes": self.refreshes.value,
+            "failures": self.failures.value,
+        }
+
+
+suggest_index = SuggestIndex(max_age=settings.SUGGEST_INDEX_MAX_AGE_SECONDS)
+catalog_cache.subscribe(suggest_index.changed)
+
+
+@cache_warmer
+async def build_suggest_index() -> None:
+    await suggest_index._schedule(0)
@@ -0,0 +1,223 @@
+import ipaddress
+import math
+import threading
+import time
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+from fastapi import HTTPException, Request, status
+from sqlalchemy import delete, select
+from sqlalchemy.dialects import postgresql, sqlite
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal, async_engine
+from app.core.metrics import Counter
+from app.models.throttle import ThrottleWindow
+
+SCOPES = ("ip", "account")
+
+Network = Union[ipaddress.IPv4Network, ipaddress.IPv6Network]
+
+
+def parse_proxies(value: str) -> Optional[List[Network]]:
+    """Comma-separated IPs or CIDR ranges; None for "*" (trust every peer)"""
+    entries = [entry.strip() for entry in value.split(",") if entry.strip()]
+    if "*" in entries:
+        return None
+    return [ipaddress.ip_network(entry, strict=False) for entry in entries]
+
+
+def client_ip(request: Request, proxies: Optional[Sequence[Network]]) -> str:
+    """The client's address, read through X-Forwarded-For only when the peer is a trusted proxy.
+
+    The header is walked from the right, skipping proxies, because only the
+    entries our own proxies appended can be believed; anything to the left
+    of the first untrusted address may be made up by the client.
+    """
+    # uvicorn --proxy-headers may already have swapped in a forwarded address (or None)
+    peer = request.client.host if request.client and request.client.host else "unknown"
+
+    def trusted(address: str) -> bool:
+        if proxies is None:
+            return True
+        try:
+            ip = ipaddress.ip_address(address)
+        except ValueError:
+            return False
+        return any(ip in network for network in proxies)
+
+    if not trusted(peer):
+        return peer
+    hops = [hop.strip() for hop in request.headers.get("x-forwarded-for", "").split(",") if hop.strip()]
+    for hop in reversed(hops):
+        if not trusted(hop):
+            return hop
+    # Every hop is a proxy (or there is no header): the leftmost address is the best we have
+    return hops[0] if hops else peer
+
+
+class MemoryThrottleStore:
+    """Attempt counters held in this worker: {key: {window_start: hits}}"""
+
+    def __init__(self):
+        self._windows: Dict[str, Dict[int, int]] = {}
+        self._lock = threading.Lock()
+
+    async def hit(self, key: str, window_start: int, window: int) -> Tuple[int, int]:
+        """Count an attempt; return the previous and current window's hits"""
+        with self._lock:
+            windows = self._windows.setdefault(key, {})
+            windows[window_start] = windows.get(window_start, 0) + 1
+            return windows.get(window_start - window, 0), windows[window_start]
+
+    async def reset(self, key: str) -> None:
+        with self._lock:
+            self._windows.pop(key, None)
+
+    async def sweep(self, oldest: int) -> None:
+        """Forget windows that started before `oldest`"""
+        with self._lock:
+            for key in list(self._windows):
+                windows = self._windows[key]
+                for window_start in [start for start in windows if start < oldest]:
+                    del windows[window_start]
+                if not windows:
+                    del self._windows[key]
+
+    def snapshot(self) -> Dict[str, Dict[int, int]]:
+        with self._lock:
+            return {key: dict(windows) for key, windows in self._windows.items()}
+
+
+class DatabaseThrottleStore:
+    """Attempt counters in the throttle_windows table, shared by every worker and instance"""
+
+    def __init__(self):
+        dialect = async_engine.dialect.name
+        self._insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+
+    async def hit(self, key: str, window_start: int, window: int) -> Tuple[int, int]:
+        statement = self._insert(ThrottleWindow).values(key=key, window_start=window_start, hits=1)
+        statement = statement.on_conflict_do_update(
+            index_elements=[ThrottleWindow.key, ThrottleWindow.window_start],
+            set_={"hits": ThrottleWindow.hits + 1},
+        )
+        async with AsyncSessionLocal() as db:
+            await db.execute(statement)
+            result = await db.execute(
+                select(ThrottleWindow.window_start, ThrottleWindow.hits).where(
+                    ThrottleWindow.key == key,
+                    ThrottleWindow.window_start.in_([window_start - window, window_start]),
+                )
+            )
+            counts = dict(result.all())
+            await db.commit()
+        return counts.get(window_start - window, 0), counts.get(window_start, 0)
+
+    async def reset(self, key: str) -> None:
+        async with AsyncSessionLocal() as db:
+            await db.execute(delete(ThrottleWindow).where(ThrottleWindow.key == key))
+            await db.commit()
+
+    async def sweep(self, oldest: int) -> None:
+        async with AsyncSessionLocal() as db:
+            await db.execute(delete(ThrottleWindow).where(ThrottleWindow.window_start < oldest))
+            await db.commit()
+
+    def snapshot(self) -> Optional[Dict[str, Dict[int, int]]]:
+        # Counting rows would mean a query per scrape; only local counters are reported
+        return None
+
+
+class LoginThrottle:
+    """Sliding-window attempt limits per client IP and per account.
+
+    Uses the sliding window counter approximation: hits in the previous fixed
+    window are weighted by how much of it still overlaps the sliding window.
+    Every attempt counts, including rejected ones, so a client that keeps
+    hammering stays blocked; a successful sign-in clears its account key.
+    """
+
+    def __init__(self, store, window: int, ip_limit: int, account_limit: int, proxies: Optional[Sequence[Network]] = ()):
+        self.store = store
+        self.window = window
+        self.limits = {"ip": ip_limit, "account": account_limit}
+        self.proxies = proxies
+        self.rejected = {scope: Counter() for scope in SCOPES}
+        self._last_sweep = 0
+
+    def _estimate(self, previous: int, current: int, elapsed: float) -> float:
+        return previous * (1 - elapsed / self.window) + current
+
+    async def check(self, request: Request, account: str) -> None:
+        """Count an attempt, raising 429 if the client IP or the account is over its limit"""
+        now = time.time()
+        window_start = int(now // self.window) * self.window
+        elapsed = now - window_start
+        client = client_ip(request, self.proxies)
+
+        for scope, key in (("ip", f"ip:{client}"), ("account", f"account:{account.lower()}")):
+            previous, current = await self.store.hit(key, window_start, self.window)
+            if self._estimate(previous, current, elapsed) > self.limits[scope]:
+                self.rejected[scope].inc()
+                raise HTTPException(
+                    status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                    detail="Too many attempts. Please try again later.",
+                    # By the end of this window the estimate is at most this window's hits
+                    headers={"Retry-After": str(max(1, math.ceil(window_start + self.window - now)))},
+                )
+
+        # Windows older than the previous one no longer affect any estimate
+        if window_start > self._last_sweep:
+            self._last_sweep = window_start
+            await self.store.sweep(window_start - self.window)
+
+    async def reset_account(self, account: str) -> None:
+        await self.store.reset(f"account:{account.lower()}")
+
+    def stats(self) -> dict:
+        """Rejections so far and, for the in-process store, the keys tracked and blocked now"""
+        stats = {scope: {"rejected": self.rejected[scope].value, "tracked": None, "blocked": None} for scope in SCOPES}
+        windows = self.store.snapshot()
+        if windows is None:
+            return stats
+
+        now = time.time()
+        window_start = int(now // self.window) * self.window
+        for scope in SCOPES:
+            stats[scope]["tracked"] = stats[scope]["blocked"] = 0
+        for key, counts in windows.items():
+            scope = key.split(":", 1)[0]
+            estimate = self._estimate(
+                counts.get(window_start - self.window, 0), counts.get(window_start, 0), now - window_start
+            )
+            stats[scope]["tracked"] += 1
+            if estimate >= self.limits[scope]:
+                stats[scope]["blocked"] += 1
+        return stats
+
+
+def _build_store():
+    if settings.LOGIN_THROTTLE_BACKEND == "database":
+        return DatabaseThrottleStore()
+    if settings.LOGIN_THROTTLE_BACKEND != "memory":
+        raise ValueError(f"Unknown LOGIN_THROTTLE_BACKEND: {settings.LOGIN_THROTTLE_BACKEND}")
+    return MemoryThrottleStore()
+
+
+login_throttle = LoginThrottle(
+    _build_store(),
+    window=settings.LOGIN_THROTTLE_WINDOW_SECONDS,
+    ip_limit=settings.LOGIN_THROTTLE_IP_LIMIT,
+    account_limit=settings.LOGIN_THROTTLE_ACCOUNT_LIMIT,
+    proxies=parse_proxies(settings.FORWARDED_ALLOW_IPS),
+)
+
+
+async def throttle_login(request: Request, account: str) -> None:
+    """Reject the attempt with 429 if it exceeds the login limits (no-op when disabled)"""
+    if settings.LOGIN_THROTTLE_ENABLED:
+        await login_throttle.check(request, account)
+
+
+async def reset_login_throttle(account: str) -> None:
+    """Clear an account's attempts after a successful sign-in"""
+    if settings.LOGIN_THROTTLE_ENABLED:
+        await login_throttle.reset_account(account)
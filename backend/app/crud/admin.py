@@ -1,16 +1,26 @@
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, selectinload
 from sqlalchemy import func, desc
 from typing import List, Optional
 from datetime import datetime, timedelta
 from app.models.user import User
 from app.models.order import Order, OrderStatus, PaymentStatus
+from app.core.pagination import Keyset
+from app.core.principals import Principal, forget_deleted_principal, refresh_principal
+
+# Order grids always render items and the customer, so load them up front
+_order_options = (selectinload(Order.items), selectinload(Order.user))
+
+# Admin grid orders for cursor pagination (newest orders first)
+user_keyset = Keyset("admin_users", User.id)
+order_keyset = Keyset("admin_orders", Order.created_at, Order.id, descending=True)
 
 
 def get_all_users(
     db: Session,
     skip: int = 0,
     limit: int = 100,
-    search: Optional[str] = None
+    search: Optional[str] = None,
+    cursor: Optional[str] = None
 ) -> List[User]:
     """Get all verified users with optional search"""
     query = db.query(User).filter(User.is_email_verified == True)
@@ -22,7 +32,9 @@ def get_all_users(
             (User.last_name.ilike(f"%{search}%"))
         )
     
-    return query.offset(skip).limit(limit).all()
+    if cursor is not None:
+        skip = 0
+    return user_keyset.after(query, cursor).offset(skip).limit(limit).all()
 
 
 def get_user_count(db: Session, search: Optional[str] = None) -> int:
@@ -55,6 +67,7 @@ def update_user_by_admin(
     
     db.commit()
     db.refresh(user)
+    refresh_principal(user)
     return user
 
 
@@ -89,8 +102,10 @@ def delete_user_by_admin(db: Session, user_id: int) -> bool:
                 db.delete(address)
         
         # Then delete the user
+        deleted = Principal.from_user(user)
         db.delete(user)
         db.commit()
+        forget_deleted_principal(deleted)
         return True
         
     except Exception as e:
@@ -102,15 +117,18 @@ def get_all_orders(
     db: Session,
     skip: int = 0,
     limit: int = 100,
-    status: Optional[OrderStatus] = None
+    status: Optional[OrderStatus] = None,
+    cursor: Optional[str] = None
 ) -> List[Order]:
     """Get all orders with optional status filter"""
-    query = db.query(Order).order_by(desc(Order.created_at))
+    query = db.query(Order).options(*_order_options)
     
     if status:
         query = query.filter(Order.status == status)
     
-    return query.offset(skip).limit(limit).all()
+    if cursor is not None:
+        skip = 0
+    return order_keyset.after(query, cursor).offset(skip).limit(limit).all()
 
 
 def get_order_count(db: Session, status: Optional[OrderStatus] = None) -> int:
@@ -124,7 +142,7 @@ def get_order_count(db: Session, status: Optional[OrderStatus] = None) -> int:
 
 def get_order(db: Session, order_id: int) -> Optional[Order]:
     """Get single order by ID"""
-    return db.query(Order).filter(Order.id == order_id).first()
+    return db.query(Order).options(*_order_options).filter(Order.id == order_id).first()
 
 def update_order_status(
     db: Session,
@@ -198,4 +216,4 @@ def get_recent_users(db: Session, limit: int = 5) -> List[User]:
 
 def get_recent_orders(db: Session, limit: int = 10) -> List[Order]:
     """Get recent orders"""
-    return db.query(Order).order_by(desc(Order.created_at)).limit(limit).all()
+    return db.query(Order).options(*_order_options).order_by(desc(Order.created_at)).limit(limit).all()
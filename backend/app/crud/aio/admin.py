@@ -0,0 +1,232 @@
+from sqlalchemy import select, func, desc, delete
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+from typing import List, Optional
+from datetime import datetime, timedelta
+from app.models.user import User
+from app.models.order import Order, OrderStatus, PaymentStatus
+from app.models.cart import Cart, CartItem
+from app.crud.aio.user import get_user_by_id
+from app.core.pagination import Keyset
+from app.core.principals import Principal, forget_deleted_principal, refresh_principal
+
+# Order grids always render items and the customer, so load them up front
+_order_options = (selectinload(Order.items), selectinload(Order.user))
+
+# Admin grid orders for cursor pagination (newest orders first)
+user_keyset = Keyset("admin_users", User.id)
+order_keyset = Keyset("admin_orders", Order.created_at, Order.id, descending=True)
+
+
+def _user_search_filter(query, search: Optional[str]):
+    if search:
+        query = query.where(
+            (User.email.ilike(f"%{search}%")) |
+            (User.first_name.ilike(f"%{search}%")) |
+            (User.last_name.ilike(f"%{search}%"))
+        )
+    return query
+
+
+async def get_all_users(
+    db: AsyncSession,
+    skip: int = 0,
+    limit: int = 100,
+    search: Optional[str] = None,
+    cursor: Optional[str] = None
+) -> List[User]:
+    """Get all verified users with optional search"""
+    query = _user_search_filter(select(User).where(User.is_email_verified == True), search)
+    if cursor is not None:
+        skip = 0
+    result = await db.execute(user_keyset.after(query, cursor).offset(skip).limit(limit))
+    return result.scalars().all()
+
+
+async def get_user_count(db: AsyncSession, search: Optional[str] = None) -> int:
+    """Get total verified user count"""
+    query = _user_search_filter(
+        select(func.count(User.id)).where(User.is_email_verified == True), search
+    )
+    result = await db.execute(query)
+    return result.scalar()
+
+
+async def update_user_by_admin(
+    db: AsyncSession,
+    user_id: int,
+    **kwargs
+) -> Optional[User]:
+    """Update user details by admin"""
+    user = await db.get(User, user_id)
+    if not user:
+        return None
+
+    for key, value in kwargs.items():
+        if hasattr(user, key) and value is not None:
+            setattr(user, key, value)
+
+    await db.commit()
+    user = await get_user_by_id(db, user_id, with_addresses=True)
+    refresh_principal(user)
+    return user
+
+
+async def delete_user_by_admin(db: AsyncSession, user_id: int) -> bool:
+    """Delete user by admin"""
+    result = await db.execute(
+        select(User).where(User.id == user_id).options(selectinload(User.addresses))
+    )
+    user = result.scalars().first()
+    if not user:
+        return False
+
+    try:
+        # Check for existing orders
+        result = await db.execute(select(func.count(Order.id)).where(Order.user_id == user_id))
+        orders_count = result.scalar()
+
+        if orders_count > 0:
+            raise ValueError(f"Cannot delete user with {orders_count} existing orders")
+
+        # Delete cart items first
+        result = await db.execute(select(Cart).where(Cart.user_id == user_id))
+        cart = result.scalars().first()
+        if cart:
+            await db.execute(delete(CartItem).where(CartItem.cart_id == cart.id))
+            await db.delete(cart)
+
+        # Then delete the user (addresses cascade)
+        deleted = Principal.from_user(user)
+        await db.delete(user)
+        await db.commit()
+        forget_deleted_principal(deleted)
+        return True
+
+    except Exception as e:
+        await db.rollback()
+        raise e
+
+
+async def get_all_orders(
+    db: AsyncSession,
+    skip: int = 0,
+    limit: int = 100,
+    status: Optional[OrderStatus] = None,
+    cursor: Optional[str] = None
+) -> List[Order]:
+    """Get all orders with optional status filter"""
+    query = select(Order).options(*_order_options)
+
+    if status:
+        query = query.where(Order.status == status)
+
+    if cursor is not None:
+        skip = 0
+    result = await db.execute(order_keyset.after(query, cursor).offset(skip).limit(limit))
+    return result.scalars().all()
+
+
+async def get_order_count(db: AsyncSession, status: Optional[OrderStatus] = None) -> int:
+    """Get total order count"""
+    query = select(func.count(Order.id))
+
+    if status:
+        query = query.where(Order.status == status)
+
+    result = await db.execute(query)
+    return result.scalar()
+
+
+async def get_order(db: AsyncSession, order_id: int) -> Optional[Order]:
+    """Get single order by ID"""
+    result = await db.execute(
+        select(Order)
+        .where(Order.id == order_id)
+        .options(*_order_options)
+        .execution_options(populate_existing=True)
+    )
+    return result.scalars().first()
+
+
+async def update_order_status(
+    db: AsyncSession,
+    order_id: int,
+    status: OrderStatus,
+    cancellation_reason: Optional[str] = None
+) -> Optional[Order]:
+    """Update order status"""
+    order = await get_order(db, order_id)
+    if not order:
+        return None
+
+    order.status = status
+    if cancellation_reason:
+        order.cancellation_reason = cancellation_reason
+
+    await db.commit()
+    return await get_order(db, order_id)
+
+
+async def get_dashboard_stats(db: AsyncSession) -> dict:
+    """Get dashboard statistics"""
+    week_ago = datetime.utcnow() - timedelta(days=7)
+
+    async def scalar(query):
+        result = await db.execute(query)
+        return result.scalar()
+
+    # Total users (verified only)
+    total_users = await scalar(select(func.count(User.id)).where(User.is_email_verified == True))
+
+    # Total orders
+    total_orders = await scalar(select(func.count(Order.id)))
+
+    # Orders by status
+    pending_orders = await scalar(
+        select(func.count(Order.id)).where(Order.status == OrderStatus.PENDING)
+    )
+    completed_orders = await scalar(
+        select(func.count(Order.id)).where(Order.status == OrderStatus.DELIVERED)
+    )
+
+    # Total revenue (sum of all PAID orders that are not CANCELLED)
+    total_revenue = await scalar(
+        select(func.sum(Order.total_amount)).where(
+            Order.payment_status == PaymentStatus.PAID,
+            Order.status != OrderStatus.CANCELLED
+        )
+    ) or 0
+
+    # New users / orders this week
+    new_users_week = await scalar(select(func.count(User.id)).where(User.created_at >= week_ago))
+    new_orders_week = await scalar(select(func.count(Order.id)).where(Order.created_at >= week_ago))
+
+    return {
+        "total_users": total_users,
+        "total_orders": total_orders,
+        "pending_orders": pending_orders,
+        "completed_orders": completed_orders,
+        "total_revenue": float(total_revenue),
+        "new_users_week": new_users_week,
+        "new_orders_week": new_orders_week
+    }
+
+
+async def get_recent_users(db: AsyncSession, limit: int = 5) -> List[User]:
+    """Get recently registered verified users"""
+    result = await db.execute(
+        select(User)
+        .where(User.is_email_verified == True)
+        .order_by(desc(User.created_at))
+        .limit(limit)
+    )
+    return result.scalars().all()
+
+
+async def get_recent_orders(db: AsyncSession, limit: int = 10) -> List[Order]:
+    """Get recent orders"""
+    result = await db.execute(
+        select(Order).options(*_order_options).order_by(desc(Order.created_at)).limit(limit)
+    )
+    return result.scalars().all()
@@ -0,0 +1,44 @@
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.bank import BankAccount
+from app.schemas.bank import BankAccountCreate, BankAccountUpdate
+
+async def get_bank_account(db: AsyncSession, bank_id: int):
+    return await db.get(BankAccount, bank_id)
+
+async def get_active_bank_accounts(db: AsyncSession):
+    result = await db.execute(select(BankAccount).where(BankAccount.is_active == True))
+    return result.scalars().all()
+
+async def get_all_bank_accounts(db: AsyncSession):
+    result = await db.execute(select(BankAccount))
+    return result.scalars().all()
+
+async def create_bank_account(db: AsyncSession, bank_in: BankAccountCreate):
+    db_bank = BankAccount(**bank_in.dict())
+    db.add(db_bank)
+    await db.commit()
+    await db.refresh(db_bank)
+    return db_bank
+
+async def update_bank_account(db: AsyncSession, bank_id: int, bank_in: BankAccountUpdate):
+    db_bank = await get_bank_account(db, bank_id)
+    if not db_bank:
+        return None
+    
+    update_data = bank_in.dict(exclude_unset=True)
+    for field, value in update_data.items():
+        setattr(db_bank, field, value)
+    
+    db.add(db_bank)
+    await db.commit()
+    await db.refresh(db_bank)
+    return db_bank
+
+async def delete_bank_account(db: AsyncSession, bank_id: int):
+    db_bank = await get_bank_account(db, bank_id)
+    if not db_bank:
+        return False
+    await db.delete(db_bank)
+    await db.commit()
+    return True
@@ -0,0 +1,162 @@
+from sqlalchemy import select, delete
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+from typing import Optional
+from app.models.cart import Cart, CartItem
+from app.models.product import Product
+
+
+# Relationships are eager-loaded because lazy loads are not possible on AsyncSession
+_cart_options = (selectinload(Cart.items).selectinload(CartItem.product),)
+
+
+async def get_or_create_cart(db: AsyncSession, user_id: int) -> Cart:
+    """Get user's cart or create if doesn't exist"""
+    cart = await get_cart(db, user_id)
+    if not cart:
+        cart = Cart(user_id=user_id)
+        db.add(cart)
+        await db.commit()
+        cart = await get_cart(db, user_id)
+    return cart
+
+
+async def get_cart(db: AsyncSession, user_id: int) -> Optional[Cart]:
+    """Get user's cart with its items and products loaded"""
+    result = await db.execute(
+        select(Cart)
+        .where(Cart.user_id == user_id)
+        .options(*_cart_options)
+        .execution_options(populate_existing=True)
+    )
+    return result.scalars().first()
+
+
+async def _get_cart_item(db: AsyncSession, cart_id: int, cart_item_id: int) -> Optional[CartItem]:
+    result = await db.execute(
+        select(CartItem)
+        .where(CartItem.id == cart_item_id, CartItem.cart_id == cart_id)
+        .options(selectinload(CartItem.product))
+        .execution_options(populate_existing=True)
+    )
+    return result.scalars().first()
+
+
+async def add_item_to_cart(
+    db: AsyncSession,
+    user_id: int,
+    product_id: int,
+    quantity: int
+) -> CartItem:
+    """Add item to cart or update quantity if already exists"""
+    # Get or create cart
+    cart = await get_or_create_cart(db, user_id)
+
+    # Get product
+    product = await db.get(Product, product_id)
+    if not product:
+        raise ValueError("Product not found")
+
+    # Check stock availability
+    if product.stock_quantity <= 0:
+        raise ValueError("Product is out of stock")
+
+    # Check if item already in cart
+    cart_item = next((item for item in cart.items if item.product_id == product_id), None)
+
+    if cart_item:
+        # Check if new quantity exceeds stock
+        new_quantity = cart_item.quantity + quantity
+        if new_quantity > product.stock_quantity:
+            raise ValueError(f"Only {product.stock_quantity} items available in stock")
+        # Update quantity
+        cart_item.quantity = new_quantity
+    else:
+        # Check if requested quantity exceeds stock
+        if quantity > product.stock_quantity:
+            raise ValueError(f"Only {product.stock_quantity} items available in stock")
+        # Create new cart item
+        cart_item = CartItem(
+            cart_id=cart.id,
+            product_id=product_id,
+            quantity=quantity,
+            price_at_addition=product.price
+        )
+        db.add(cart_item)
+
+    await db.commit()
+    return await _get_cart_item(db, cart.id, cart_item.id)
+
+
+async def update_cart_item(
+    db: AsyncSession,
+    user_id: int,
+    cart_item_id: int,
+    quantity: int
+) -> Optional[CartItem]:
+    """Update cart item quantity"""
+    cart = await get_cart(db, user_id)
+    if not cart:
+        return None
+
+    cart_item = await _get_cart_item(db, cart.id, cart_item_id)
+    if not cart_item or not cart_item.product:
+        return None
+
+    # Check if new quantity exceeds stock
+    product = cart_item.product
+    if quantity > product.stock_quantity:
+        raise ValueError(f"Only {product.stock_quantity} items available in stock")
+
+    cart_item.quantity = quantity
+    await db.commit()
+    return await _get_cart_item(db, cart.id, cart_item.id)
+
+
+async def remove_cart_item(
+    db: AsyncSession,
+    user_id: int,
+    cart_item_id: int
+) -> bool:
+    """Remove item from cart"""
+    cart = await get_cart(db, user_id)
+    if not cart:
+        return False
+
+    cart_item = await _get_cart_item(db, cart.id, cart_item_id)
+    if not cart_item:
+        return False
+
+    await db.delete(cart_item)
+    await db.commit()
+    return True
+
+
+async def clear_cart(db: AsyncSession, user_id: int) -> bool:
+    """Clear all items from cart"""
+    result = await db.execute(select(Cart.id).where(Cart.user_id == user_id))
+    cart_id = result.scalar()
+    if cart_id is None:
+        return False
+
+    await db.execute(delete(CartItem).where(CartItem.cart_id == cart_id))
+    await db.commit()
+    return True
+
+
+def get_cart_total(cart: Optional[Cart]) -> dict:
+    """Calculate totals for an already loaded cart"""
+    if not cart:
+        return {"total_items": 0, "subtotal": 0.0}
+
+    total_items = 0
+    subtotal = 0.0
+
+    for item in cart.items:
+        total_items += item.quantity
+        subtotal += item.price_at_addition * item.quantity
+
+    return {
+        "total_items": total_items,
+        "subtotal": subtotal
+    }
@@ -0,0 +1,239 @@
+from sqlalchemy import Integer, Numeric, String, case, cast, literal, null, select, func, union_all, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Dict, List, Optional, Sequence, Tuple
+from app.core.catalog import MEMBERSHIP_FIELDS, catalog_cache, product_state
+from app.core.pagination import Keyset, cursor_offset, offset_cursor
+from app.core.search import product_search
+from app.models.product import Product, ProductCategory
+from app.models.tag import Tag, product_tags, tagged_product_ids
+from app.schemas.product import ProductBulkPatch, ProductCreate, ProductUpdate
+
+# Catalog listing order; ranked search results are paged by offset instead
+product_keyset = Keyset("products", Product.id)
+
+
+async def create_product(db: AsyncSession, product: ProductCreate) -> Product:
+    """Create a new product"""
+    db_product = Product(**product.dict())
+    db.add(db_product)
+    await db.commit()
+    await db.refresh(db_product)
+    catalog_cache.product_changed(db_product.id, None, product_state(db_product))
+    return db_product
+
+
+async def get_product(db: AsyncSession, product_id: int) -> Optional[Product]:
+    """Get product by ID"""
+    result = await db.execute(select(Product).where(Product.id == product_id))
+    return result.scalars().first()
+
+
+async def get_products(
+    db: AsyncSession,
+    skip: int = 0,
+    limit: int = 100,
+    category: Optional[ProductCategory] = None,
+    search: Optional[str] = None,
+    is_active: bool = True,
+    cursor: Optional[str] = None,
+    tag: Optional[str] = None
+) -> List[Product]:
+    """Get all products with optional filtering (ranked by relevance when searching)"""
+    query = select(Product)
+    
+    if is_active is not None:
+        query = query.where(Product.is_active == is_active)
+    
+    if category:
+        query = query.where(Product.category == category)
+    
+    if tag:
+        query = query.where(Product.id.in_(tagged_product_ids(tag)))
+    
+    if search:
+        query = product_search.apply(query, search)
+        if cursor is not None:
+            skip = cursor_offset(cursor, product_keyset.listing)
+    else:
+        query = product_keyset.after(query, cursor)
+        if cursor is not None:
+            skip = 0
+    
+    result = await db.execute(query.offset(skip).limit(limit))
+    return result.scalars().all()
+
+
+def next_products_cursor(
+    products: List[Product],
+    limit: int,
+    skip: int = 0,
+    search: Optional[str] = None,
+    cursor: Optional[str] = None
+) -> Optional[str]:
+    """Cursor for the page after one returned by get_products"""
+    if not search:
+        return product_keyset.next_cursor(products, limit)
+    if len(products) < limit:
+        return None
+    start = skip if cursor is None else cursor_offset(cursor, product_keyset.listing)
+    return offset_cursor(product_keyset.listing, start + limit)
+
+
+async def _get_flagged_products(db: AsyncSession, flag, limit: int) -> List[Product]:
+    result = await db.execute(
+        select(Product).where(flag == True, Product.is_active == True).limit(limit)
+    )
+    return result.scalars().all()
+
+
+async def get_popular_products(db: AsyncSession, limit: int = 10) -> List[Product]:
+    """Get products marked as popular"""
+    return await _get_flagged_products(db, Product.is_popular, limit)
+
+
+async def get_special_products(db: AsyncSession, limit: int = 10) -> List[Product]:
+    """Get products marked as special"""
+    return await _get_flagged_products(db, Product.is_special, limit)
+
+
+async def get_offer_products(db: AsyncSession, limit: int = 10) -> List[Product]:
+    """Get products marked as offers"""
+    return await _get_flagged_products(db, Product.is_offer, limit)
+
+
+async def update_product(
+    db: AsyncSession,
+    product_id: int,
+    product_update: ProductUpdate
+) -> Optional[Product]:
+    """Update a product"""
+    db_product = await get_product(db, product_id)
+    if not db_product:
+        return None
+    
+    before = product_state(db_product)
+    update_data = product_update.dict(exclude_unset=True)
+    for field, value in update_data.items():
+        setattr(db_product, field, value)
+    
+    await db.commit()
+    await db.refresh(db_product)
+    catalog_cache.product_changed(product_id, before, product_state(db_product))
+    return db_product
+
+
+def _bulk_values(patch: ProductBulkPatch) -> dict:
+    values = patch.set.dict(exclude_none=True)
+    if patch.stock_delta is not None:
+        stock = func.coalesce(Product.stock_quantity, 0) + patch.stock_delta
+        values["stock_quantity"] = case((stock < 0, 0), else_=stock)
+    if patch.price_change_percent is not None:
+        # round(double precision, int) does not exist on Postgres
+        values["price"] = func.round(cast(Product.price * (1 + patch.price_change_percent / 100), Numeric), 2)
+    return values
+
+
+async def bulk_update_products(db: AsyncSession, patch: ProductBulkPatch) -> List[Product]:
+    """Apply one patch to many products in a single UPDATE ... RETURNING"""
+    values = _bulk_values(patch)
+    statement = update(Product).values(**values)
+    if patch.ids is not None:
+        statement = statement.where(Product.id.in_(patch.ids))
+    if patch.category is not None:
+        statement = statement.where(Product.category == patch.category)
+    result = await db.execute(
+        statement.returning(Product).execution_options(synchronize_session=False)
+    )
+    products = result.scalars().all()
+    await db.commit()
+    catalog_cache.products_updated(
+        [product.id for product in products], membership_changed=bool(values.keys() & set(MEMBERSHIP_FIELDS))
+    )
+    return products
+
+
+async def delete_product(db: AsyncSession, product_id: int) -> bool:
+    """Delete a product"""
+    db_product = await get_product(db, product_id)
+    if not db_product:
+        return False
+    
+    before = product_state(db_product)
+    await db.delete(db_product)
+    await db.commit()
+    catalog_cache.product_changed(product_id, before, None)
+    return True
+
+
+async def get_category_counts(db: AsyncSession) -> Dict[ProductCategory, int]:
+    """Active product count per category, in one grouped query"""
+    result = await db.execute(
+        select(Product.category, func.count(Product.id)).where(Product.is_active == True).group_by(Product.category)
+    )
+    return dict(result.all())
+
+
+async def get_facets(
+    db: AsyncSession,
+    category: Optional[ProductCategory] = None,
+    tag: Optional[str] = None,
+    search: Optional[str] = None,
+    price_bounds: Sequence[float] = ()
+) -> Tuple[Dict[ProductCategory, int], Dict[str, int], Dict[int, int]]:
+    """Active product counts per category, tag and price bucket under a filter, in one query.
+
+    Bucket i holds prices below price_bounds[i] (and at or above the bound
+    before it); bucket len(price_bounds) holds the rest.
+    """
+    # Bucketed inside the CTE so the outer GROUP BY names a column, not a repeated expression
+    bucket = case(
+        *((Product.price < bound, index) for index, bound in enumerate(price_bounds)),
+        else_=len(price_bounds),
+    ) if price_bounds else literal(0)
+    query = select(Product.id, Product.category, bucket.label("price_bucket")).where(Product.is_active == True)
+    if category:
+        query = query.where(Product.category == category)
+    if tag:
+        query = query.where(Product.id.in_(tagged_product_ids(tag)))
+    if search:
+        query = product_search.filter(query, search)
+    filtered = query.cte("filtered")
+
+    # One row shape for all three facets: (facet, category, tag, price bucket, count)
+    no_category = cast(null(), filtered.c.category.type)
+    no_tag = cast(null(), String)
+    no_bucket = cast(null(), Integer)
+    count = func.count()
+    facets = union_all(
+        select(literal("category"), filtered.c.category, no_tag, no_bucket, count).group_by(filtered.c.category),
+        select(literal("tag"), no_category, Tag.name, no_bucket, count)
+        .select_from(filtered)
+        .join(product_tags, product_tags.c.product_id == filtered.c.id)
+        .join(Tag, Tag.id == product_tags.c.tag_id)
+        .group_by(Tag.name),
+        select(literal("price"), no_category, no_tag, filtered.c.price_bucket, count).group_by(filtered.c.price_bucket),
+    )
+
+    categories, tags, buckets = {}, {}, {}
+    for kind, category_value, tag_name, bucket_index, total in (await db.execute(facets)).all():
+        if kind == "category":
+            categories[category_value] = total
+        elif kind == "tag":
+            tags[tag_name] = total
+        else:
+            buckets[bucket_index] = total
+    return categories, tags, buckets
+
+
+async def get_product_count(
+    db: AsyncSession,
+    category: Optional[ProductCategory] = None
+) -> int:
+    """Get total product count"""
+    query = select(func.count(Product.id)).where(Product.is_active == True)
+    
+    if category:
+        query = query.where(Product.category == category)
+    
+    result = await db.execute(query)
+    return result.scalar()
@@ -0,0 +1,130 @@
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+from typing import List, Optional
+from app.models.user import User, Address
+from app.schemas.user import UserCreate, UserUpdate, AddressCreate
+from app.core.security import async_get_password_hash, async_verify_password
+from app.core.principals import Principal, invalidate_principal, refresh_principal
+
+
+async def get_user_by_email(db: AsyncSession, email: str, with_addresses: bool = False) -> Optional[User]:
+    """Get user by email"""
+    query = select(User).where(User.email == email)
+    if with_addresses:
+        query = query.options(selectinload(User.addresses)).execution_options(populate_existing=True)
+    result = await db.execute(query)
+    return result.scalars().first()
+
+
+async def get_user_by_id(db: AsyncSession, user_id: int, with_addresses: bool = False) -> Optional[User]:
+    """Get user by ID"""
+    query = select(User).where(User.id == user_id)
+    if with_addresses:
+        query = query.options(selectinload(User.addresses)).execution_options(populate_existing=True)
+    result = await db.execute(query)
+    return result.scalars().first()
+
+
+async def get_principal(db: AsyncSession, email: str) -> Optional[Principal]:
+    """Get just the fields authentication needs, without loading the full row"""
+    result = await db.execute(
+        select(User.id, User.email, User.role, User.is_active, User.token_generation).where(User.email == email)
+    )
+    row = result.first()
+    return Principal(**row._mapping) if row else None
+
+
+async def create_user(db: AsyncSession, user: UserCreate) -> User:
+    """Create a new user"""
+    hashed_password = await async_get_password_hash(user.password)
+    db_user = User(
+        email=user.email,
+        hashed_password=hashed_password,
+        first_name=user.first_name,
+        last_name=user.last_name,
+        phone=user.phone
+    )
+    db.add(db_user)
+    await db.commit()
+    return await get_user_by_id(db, db_user.id, with_addresses=True)
+
+
+async def update_user(db: AsyncSession, user_id: int, user_update: UserUpdate) -> Optional[User]:
+    """Update user information"""
+    db_user = await get_user_by_id(db, user_id)
+    if not db_user:
+        return None
+    
+    update_data = user_update.dict(exclude_unset=True)
+    for field, value in update_data.items():
+        setattr(db_user, field, value)
+    
+    await db.commit()
+    db_user = await get_user_by_id(db, user_id, with_addresses=True)
+    refresh_principal(db_user)
+    return db_user
+
+
+async def authenticate_user(db: AsyncSession, email: str, password: str) -> Optional[User]:
+    """Authenticate a user"""
+    user = await get_user_by_email(db, email)
+    if not user:
+        return None
+    if not await async_verify_password(password, user.hashed_password):
+        return None
+    return user
+
+
+async def change_password(db: AsyncSession, user_id: int, current_password: str, new_password: str) -> bool:
+    """Change user password"""
+    user = await get_user_by_id(db, user_id)
+    if not user:
+        return False
+    
+    if not await async_verify_password(current_password, user.hashed_password):
+        return False
+    
+    user.hashed_password = await async_get_password_hash(new_password)
+    await db.commit()
+    invalidate_principal(user.email)
+    return True
+
+
+async def create_address(db: AsyncSession, user_id: int, address: AddressCreate) -> Address:
+    """Create a new address for user"""
+    # If this is set as default, unset other default addresses
+    if address.is_default:
+        await db.execute(
+            update(Address).where(Address.user_id == user_id).values(is_default=False)
+        )
+    
+    db_address = Address(
+        user_id=user_id,
+        **address.dict()
+    )
+    db.add(db_address)
+    await db.commit()
+    await db.refresh(db_address)
+    return db_address
+
+
+async def get_user_addresses(db: AsyncSession, user_id: int) -> List[Address]:
+    """Get all addresses for a user"""
+    result = await db.execute(select(Address).where(Address.user_id == user_id))
+    return result.scalars().all()
+
+
+async def delete_address(db: AsyncSession, address_id: int, user_id: int) -> bool:
+    """Delete an address"""
+    result = await db.execute(
+        select(Address).where(Address.id == address_id, Address.user_id == user_id)
+    )
+    address = result.scalars().first()
+    
+    if not address:
+        return False
+    
+    await db.delete(address)
+    await db.commit()
+    return True
@@ -1,8 +1,15 @@
 from sqlalchemy.orm import Session
 from typing import List, Optional
+from app.core.catalog import catalog_cache, product_state
+from app.core.pagination import Keyset, cursor_offset
+from app.core.search import product_search
 from app.models.product import Product, ProductCategory
+from app.models.tag import tagged_product_ids
 from app.schemas.product import ProductCreate, ProductUpdate
 
+# Catalog listing order; ranked search results are paged by offset instead
+product_keyset = Keyset("products", Product.id)
+
 
 def create_product(db: Session, product: ProductCreate) -> Product:
     """Create a new product"""
@@ -10,6 +17,7 @@ def create_product(db: Session, product: ProductCreate) -> Product:
     db.add(db_product)
     db.commit()
     db.refresh(db_product)
+    catalog_cache.product_changed(db_product.id, None, product_state(db_product))
     return db_product
 
 
@@ -24,9 +32,11 @@ def get_products(
     limit: int = 100,
     category: Optional[ProductCategory] = None,
     search: Optional[str] = None,
-    is_active: bool = True
+    is_active: bool = True,
+    cursor: Optional[str] = None,
+    tag: Optional[str] = None
 ) -> List[Product]:
-    """Get all products with optional filtering"""
+    """Get all products with optional filtering (ranked by relevance when searching)"""
     query = db.query(Product)
     
     if is_active is not None:
@@ -35,13 +45,17 @@ def get_products(
     if category:
         query = query.filter(Product.category == category)
     
+    if tag:
+        query = query.filter(Product.id.in_(tagged_product_ids(tag)))
+    
     if search:
-        search_filter = f"%{search}%"
-        query = query.filter(
-            (Product.name.ilike(search_filter)) |
-            (Product.description.ilike(search_filter)) |
-            (Product.tags.ilike(search_filter))
-        )
+        query = product_search.apply(query, search)
+        if cursor is not None:
+            skip = cursor_offset(cursor, product_keyset.listing)
+    else:
+        query = product_keyset.after(query, cursor)
+        if cursor is not None:
+            skip = 0
     
     return query.offset(skip).limit(limit).all()
 
@@ -80,12 +94,14 @@ def update_product(
     if not db_product:
         return None
     
+    before = product_state(db_product)
     update_data = product_update.dict(exclude_unset=True)
     for field, value in update_data.items():
         setattr(db_product, field, value)
     
     db.commit()
     db.refresh(db_product)
+    catalog_cache.product_changed(product_id, before, product_state(db_product))
     return db_product
 
 
@@ -95,8 +111,10 @@ def delete_product(db: Session, product_id: int) -> bool:
     if not db_product:
         return False
     
+    before = product_state(db_product)
     db.delete(db_product)
     db.commit()
+    catalog_cache.product_changed(product_id, before, None)
     return True
 
 
@@ -3,6 +3,7 @@ from typing import Optional
 from app.models.user import User, Address
 from app.schemas.user import UserCreate, UserUpdate, AddressCreate
 from app.core.security import get_password_hash, verify_password
+from app.core.principals import invalidate_principal, refresh_principal
 
 
 def get_user_by_email(db: Session, email: str) -> Optional[User]:
@@ -43,6 +44,7 @@ def update_user(db: Session, user_id: int, user_update: UserUpdate) -> Optional[
     
     db.commit()
     db.refresh(db_user)
+    refresh_principal(db_user)
     return db_user
 
 
@@ -67,6 +69,7 @@ def change_password(db: Session, user_id: int, current_password: str, new_passwo
     
     user.hashed_password = get_password_hash(new_password)
     db.commit()
+    invalidate_principal(user.email)
     return True
 
 
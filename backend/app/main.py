@@ -1,61 +1,125 @@
-from fastapi import FastAPI
+import os
+from contextlib import asynccontextmanager
+from fastapi import Depends, FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from app.core.config import settings
-from app.core.database import Base, engine
-from app.api.endpoints import auth, users, admin, products, cart, checkout, banks, orders, contact, upload
-from app.models.contact import ContactMessage  # Ensure model is registered for creation
-
-# Create database tables
-Base.metadata.create_all(bind=engine)
-
-# Initialize FastAPI app
-app = FastAPI(
-    title="Urban Grille API",
-    description="Backend API for Urban Grille Restaurant e-commerce platform",
-    version="1.0.0",
-    docs_url="/docs",
-    redoc_url="/redoc"
-)
-
-# Configure CORS
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=[settings.FRONTEND_URL, "http://localhost:3000", "http://localhost:3001"],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
-
-# Include routers
-app.include_router(auth.router, prefix="/api/auth", tags=["Authentication"])
-app.include_router(users.router, prefix="/api/user", tags=["Users"])
-app.include_router(admin.router, prefix="/api/admin", tags=["Admin"])
-app.include_router(products.router, prefix="/api/products", tags=["Products"])
-app.include_router(cart.router, prefix="/api/cart", tags=["Cart"])
-app.include_router(checkout.router, prefix="/api/checkout", tags=["Checkout"])
-app.include_router(orders.router, prefix="/api/orders", tags=["Orders"])
-app.include_router(banks.router, prefix="/api/banks", tags=["Banks"])
-app.include_router(contact.router, prefix="/api/contact", tags=["Contact"])
-app.include_router(upload.router, prefix="/api/upload", tags=["Upload"])
-
-# Mount static files
+from fastapi.responses import JSONResponse, PlainTextResponse
 from fastapi.staticfiles import StaticFiles
-import os
-os.makedirs("app/static", exist_ok=True)
-app.mount("/static", StaticFiles(directory="app/static"), name="static")
+from app.core.config import settings
+from app.core.database import get_all_pool_stats
+from app.core.instrumentation import SQLInstrumentationMiddleware, enable_slow_query_log, route_query_stats
+from app.core.metrics import REGISTRY
+from app.core.monitoring import CONTENT_TYPE_LATEST, PrometheusMiddleware
+from app.core.pagination import NEXT_CURSOR_HEADER
+from app.core.security import PasswordHasherBusy
+from app.core.startup import startup, shutdown
+
+STATIC_DIR = "app/static"
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Run schema checks, pool warm-up and cache preloading once per worker"""
+    await startup()
+    yield
+    await shutdown()
+
+
+def create_app() -> FastAPI:
+    """Build the FastAPI application"""
+    from app.api import deps
+    from app.api.endpoints import auth, users, admin, products, cart, checkout, banks, orders, contact, upload
+
+    app = FastAPI(
+        title="Urban Grille API",
+        description="Backend API for Urban Grille Restaurant e-commerce platform",
+        version="1.0.0",
+        docs_url="/docs",
+        redoc_url="/redoc",
+        lifespan=lifespan
+    )
+
+    # Per-request statement counts, DB time and N+1 detection
+    if settings.SQL_INSTRUMENTATION_ENABLED:
+        app.add_middleware(SQLInstrumentationMiddleware, expose_headers=settings.SQL_DEBUG_HEADERS)
+
+    # Sampled, rate-limited log of slow statements with their plans
+    if settings.SLOW_QUERY_LOG_ENABLED:
+        enable_slow_query_log()
+
+    # Request count, latency and in-flight gauges per route template
+    if settings.METRICS_ENABLED:
+        app.add_middleware(PrometheusMiddleware, routes=app.router.routes)
+
+    # Configure CORS
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=[settings.FRONTEND_URL, "http://localhost:3000", "http://localhost:3001"],
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+        expose_headers=[NEXT_CURSOR_HEADER],
+    )
+
+    # A login burst has filled the bcrypt queue; shed load instead of stalling
+    @app.exception_handler(PasswordHasherBusy)
+    async def password_hasher_busy(request: Request, exc: PasswordHasherBusy):
+        return JSONResponse(
+            status_code=503,
+            content={"detail": "Too many sign-in attempts in progress, please retry shortly"},
+            headers={"Retry-After": "1"},
+        )
+
+    # Include routers
+    app.include_router(auth.router, prefix="/api/auth", tags=["Authentication"])
+    app.include_router(users.router, prefix="/api/user", tags=["Users"])
+    app.include_router(admin.router, prefix="/api/admin", tags=["Admin"])
+    app.include_router(products.router, prefix="/api/products", tags=["Products"])
+    app.include_router(cart.router, prefix="/api/cart", tags=["Cart"])
+    app.include_router(checkout.router, prefix="/api/checkout", tags=["Checkout"])
+    app.include_router(orders.router, prefix="/api/orders", tags=["Orders"])
+    app.include_router(banks.router, prefix="/api/banks", tags=["Banks"])
+    app.include_router(contact.router, prefix="/api/contact", tags=["Contact"])
+    app.include_router(upload.router, prefix="/api/upload", tags=["Upload"])
+
+    # Mount static files (StaticFiles needs the directory to exist)
+    os.makedirs(upload.UPLOAD_DIR, exist_ok=True)
+    app.mount("/static", StaticFiles(directory=STATIC_DIR), name="static")
+
+    @app.get("/")
+    async def root():
+        """Root endpoint"""
+        return {
+            "message": "Welcome to Fresh Fork Restaurant API",
+            "docs": "/docs",
+            "redoc": "/redoc"
+        }
+
+    @app.get("/health")
+    async def health_check():
+        """Health check endpoint"""
+        return {"status": "healthy"}
+
+    # Operational endpoints expose query shapes and pool internals: metrics token or admin only
+    operator_only = [Depends(deps.require_operator)]
+
+    @app.get("/health/pool", dependencies=operator_only)
+    async def pool_stats():
+        """Database connection pool statistics"""
+        return get_all_pool_stats()
+
+    if settings.SQL_INSTRUMENTATION_ENABLED:
+        @app.get("/metrics/sql", dependencies=operator_only)
+        async def sql_stats():
+            """Statement counts and DB time per route"""
+            return route_query_stats.snapshot()
 
+    if settings.METRICS_ENABLED:
+        @app.get("/metrics", include_in_schema=False, dependencies=operator_only)
+        async def metrics():
+            """Prometheus scrape endpoint"""
+            return PlainTextResponse(REGISTRY.render(), media_type=CONTENT_TYPE_LATEST)
 
-@app.get("/")
-async def root():
-    """Root endpoint"""
-    return {
-        "message": "Welcome to Fresh Fork Restaurant API",
-        "docs": "/docs",
-        "redoc": "/redoc"
-    }
+    return app
 
 
-@app.get("/health")
-async def health_check():
-    """Health check endpoint"""
-    return {"status": "healthy"}
+app = create_app()
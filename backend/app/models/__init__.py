@@ -2,6 +2,12 @@
 from app.models.user import User, UserRole
 from app.models.order import Order, OrderItem, OrderStatus, PaymentMethod, PaymentStatus
 from app.models.product import Product, ProductCategory
+from app.models.tag import Tag, product_tags
 from app.models.cart import Cart, CartItem
+from app.models.bank import BankAccount
+from app.models.contact import ContactMessage
+from app.models.throttle import ThrottleWindow
+from app.models.token import RevokedToken
+from app.models.otp import OTPCode
 
-__all__ = ["User", "UserRole", "Order", "OrderItem", "OrderStatus", "PaymentMethod", "PaymentStatus", "Product", "ProductCategory", "Cart", "CartItem"]
+__all__ = ["User", "UserRole", "Order", "OrderItem", "OrderStatus", "PaymentMethod", "PaymentStatus", "Product", "ProductCategory", "Tag", "product_tags", "Cart", "CartItem", "BankAccount", "ContactMessage", "ThrottleWindow", "RevokedToken", "OTPCode"]
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Boolean
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, Index
 from datetime import datetime
 from app.core.database import Base
 
@@ -11,3 +11,6 @@ class ContactMessage(Base):
     message = Column(String, nullable=False)
     is_read = Column(Boolean, default=False)
     created_at = Column(DateTime, default=datetime.utcnow)
+
+    # Admin inbox: newest first, paged by (created_at, id)
+    __table_args__ = (Index("ix_contact_messages_created_at_id", "created_at", "id"),)
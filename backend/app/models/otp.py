@@ -0,0 +1,12 @@
+from sqlalchemy import Column, DateTime, Integer, String
+from app.core.database import Base
+
+
+class OTPCode(Base):
+    """The pending verification code for an email address (table-backed OTP store)"""
+    __tablename__ = "otp_codes"
+
+    email = Column(String, primary_key=True)
+    code = Column(String, nullable=False)
+    expires_at = Column(DateTime, nullable=False, index=True)
+    attempts = Column(Integer, nullable=False, default=0)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, Boolean, Text, Enum as SQLEnum, DateTime
+from sqlalchemy import Column, Integer, String, Float, Boolean, Text, Enum as SQLEnum, DateTime, DDL, Index, event
 from sqlalchemy.sql import func
 from app.core.database import Base
 import enum
@@ -57,5 +57,62 @@ class Product(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
+    # Catalog listing by category, paged by id
+    __table_args__ = (Index("ix_products_category_id", "category", "id"),)
+
     def __repr__(self):
         return f"<Product {self.name}>"
+
+
+# Full-text search index, maintained by the database on every write (see app.core.search).
+# Created here for create_all and by the migration for existing databases.
+POSTGRES_SEARCH_DDL = [
+    """
+    ALTER TABLE products ADD COLUMN search_vector tsvector GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', coalesce(name, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(tags, '')), 'B') ||
+        setweight(to_tsvector('english', coalesce(description, '')), 'C')
+    ) STORED
+    """,
+    "CREATE INDEX ix_products_search_vector ON products USING gin (search_vector)",
+]
+
+# External-content FTS5 table kept in step by triggers. Rebuilding `products`
+# (e.g. an Alembic batch migration on SQLite) drops the triggers, so recreate them.
+SQLITE_SEARCH_DDL = [
+    """
+    CREATE VIRTUAL TABLE products_fts USING fts5(
+        name, tags, description, content='products', content_rowid='id', tokenize='porter unicode61'
+    )
+    """,
+    """
+    CREATE TRIGGER products_fts_insert AFTER INSERT ON products BEGIN
+        INSERT INTO products_fts (rowid, name, tags, description) VALUES (new.id, new.name, new.tags, new.description);
+    END
+    """,
+    """
+    CREATE TRIGGER products_fts_delete AFTER DELETE ON products BEGIN
+        INSERT INTO products_fts (products_fts, rowid, name, tags, description)
+        VALUES ('delete', old.id, old.name, old.tags, old.description);
+    END
+    """,
+    """
+    CREATE TRIGGER products_fts_update AFTER UPDATE OF name, tags, description ON products BEGIN
+        INSERT INTO products_fts (products_fts, rowid, name, tags, description)
+        VALUES ('delete', old.id, old.name, old.tags, old.description);
+        INSERT INTO products_fts (rowid, name, tags, description) VALUES (new.id, new.name, new.tags, new.description);
+    END
+    """,
+]
+
+
+def sqlite_has_fts5(ddl, target, bind, **kw) -> bool:
+    return bind.dialect.name == "sqlite" and bool(
+        bind.exec_driver_sql("SELECT sqlite_compileoption_used('ENABLE_FTS5')").scalar()
+    )
+
+
+for statement in POSTGRES_SEARCH_DDL:
+    event.listen(Product.__table__, "after_create", DDL(statement).execute_if(dialect="postgresql"))
+for statement in SQLITE_SEARCH_DDL:
+    event.listen(Product.__table__, "after_create", DDL(statement).execute_if(callable_=sqlite_has_fts5))
@@ -0,0 +1,89 @@
+from typing import Iterable, List, Optional, Tuple
+from sqlalchemy import Column, ForeignKey, Integer, String, Table, delete, event, insert, inspect, select
+from sqlalchemy.dialects import postgresql, sqlite
+from app.core.database import Base
+from app.models.product import Product
+
+TAG_NAME_LENGTH = 50
+
+
+class Tag(Base):
+    """One normalized product tag (lowercase, trimmed)"""
+    __tablename__ = "tags"
+
+    id = Column(Integer, primary_key=True, index=True)
+    name = Column(String(TAG_NAME_LENGTH), unique=True, nullable=False, index=True)
+
+
+# Derived from products.tags, which stays the editable source; the primary key
+# serves "tags of a product" and ix_product_tags_tag_id "products with a tag"
+product_tags = Table(
+    "product_tags",
+    Base.metadata,
+    Column("product_id", Integer, ForeignKey("products.id", ondelete="CASCADE"), primary_key=True),
+    Column("tag_id", Integer, ForeignKey("tags.id", ondelete="CASCADE"), primary_key=True, index=True),
+)
+
+
+def normalize_tag(name: str) -> str:
+    return name.strip().lower()[:TAG_NAME_LENGTH]
+
+
+def normalize_tags(tags: Optional[str]) -> List[str]:
+    """Distinct tag names in a comma-separated tags string, in order"""
+    names = (normalize_tag(name) for name in (tags or "").split(","))
+    return list(dict.fromkeys(name for name in names if name))
+
+
+def tagged_product_ids(tag: str):
+    """Subquery of the ids of products carrying a tag (an index lookup on product_tags.tag_id)"""
+    return (
+        select(product_tags.c.product_id)
+        .join(Tag, Tag.id == product_tags.c.tag_id)
+        .where(Tag.name == normalize_tag(tag))
+    )
+
+
+def replace_product_tags(connection, products: Iterable[Tuple[int, Optional[str]]]) -> None:
+    """Rewrite the product_tags rows of (product_id, tags string) pairs, creating missing tags"""
+    products = [(product_id, normalize_tags(tags)) for product_id, tags in products]
+    if not products:
+        return
+    connection.execute(
+        delete(product_tags).where(product_tags.c.product_id.in_([product_id for product_id, _ in products]))
+    )
+    names = sorted({name for _, product_names in products for name in product_names})
+    if not names:
+        return
+    dialect_insert = postgresql.insert if connection.dialect.name == "postgresql" else sqlite.insert
+    connection.execute(
+        dialect_insert(Tag.__table__).on_conflict_do_nothing(index_elements=["name"]),
+        [{"name": name} for name in names],
+    )
+    tag_ids = dict(connection.execute(select(Tag.name, Tag.id).where(Tag.name.in_(names))).all())
+    connection.execute(
+        insert(product_tags),
+        [
+            {"product_id": product_id, "tag_id": tag_ids[name]}
+            for product_id, product_names in products for name in product_names
+        ],
+    )
+
+
+# Every ORM write of a product keeps its rows in step, in the same transaction.
+# Core bulk inserts (app.scripts.generate_data) call replace_product_tags themselves.
+@event.listens_for(Product, "after_insert")
+def _insert_product_tags(mapper, connection, product):
+    replace_product_tags(connection, [(product.id, product.tags)])
+
+
+@event.listens_for(Product, "after_update")
+def _update_product_tags(mapper, connection, product):
+    if inspect(product).attrs.tags.history.has_changes():
+        replace_product_tags(connection, [(product.id, product.tags)])
+
+
+@event.listens_for(Product, "before_delete")
+def _delete_product_tags(mapper, connection, product):
+    # SQLite only enforces ON DELETE CASCADE with PRAGMA foreign_keys on
+    connection.execute(delete(product_tags).where(product_tags.c.product_id == product.id))
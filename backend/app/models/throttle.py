@@ -0,0 +1,11 @@
+from sqlalchemy import Column, Integer, String
+from app.core.database import Base
+
+
+class ThrottleWindow(Base):
+    """Attempts counted for one throttle key in one fixed window (shared throttle backend)"""
+    __tablename__ = "throttle_windows"
+
+    key = Column(String, primary_key=True)
+    window_start = Column(Integer, primary_key=True, index=True)  # Unix seconds
+    hits = Column(Integer, nullable=False, default=0)
@@ -0,0 +1,12 @@
+from sqlalchemy import Column, Float, Integer, String
+from app.core.database import Base
+
+
+class RevokedToken(Base):
+    """A used refresh token (kind "token", by jti) or a logged-out token family (kind "family")"""
+    __tablename__ = "revoked_tokens"
+
+    token_id = Column(String, primary_key=True)
+    kind = Column(String, nullable=False)
+    expires_at = Column(Integer, nullable=False, index=True)  # Unix seconds; the row is useless after this
+    revoked_at = Column(Float, nullable=False, index=True)  # Unix seconds; workers sync on this
@@ -1,4 +1,5 @@
-from sqlalchemy import Boolean, Column, Integer, String, DateTime, Enum as SQLEnum, ForeignKey
+from sqlalchemy import Boolean, Column, Integer, String, DateTime, Enum as SQLEnum, ForeignKey, event
+from sqlalchemy.orm.base import NO_VALUE, NEVER_SET
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from app.core.database import Base
@@ -23,8 +24,8 @@ class User(Base):
     avatar = Column(String, nullable=True)
     is_active = Column(Boolean, default=True, nullable=False)
     is_email_verified = Column(Boolean, default=False, nullable=False)
-    otp_code = Column(String, nullable=True)
-    otp_expires_at = Column(DateTime, nullable=True)
+    # Embedded in tokens; bumping it revokes every token issued before
+    token_generation = Column(Integer, default=0, server_default="0", nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
     
@@ -33,6 +34,18 @@ class User(Base):
     orders = relationship("Order", back_populates="user", cascade="all, delete-orphan")
 
 
+@event.listens_for(User.role, "set", active_history=True)
+@event.listens_for(User.is_active, "set", active_history=True)
+def _revoke_tokens(user, value, oldvalue, initiator):
+    """Role changes and deactivation invalidate tokens carrying the old claims"""
+    if oldvalue in (NO_VALUE, NEVER_SET) or value == oldvalue:
+        return
+    if initiator.key == "is_active" and value:
+        return
+    # Increment in SQL so the current value never has to be loaded
+    user.token_generation = User.token_generation + 1
+
+
 class Address(Base):
     __tablename__ = "addresses"
     
@@ -92,3 +92,4 @@ class OrderListResponse(BaseModel):
     total: int
     skip: int
     limit: int
+    next_cursor: Optional[str] = None
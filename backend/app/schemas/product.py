@@ -1,5 +1,5 @@
-from pydantic import BaseModel, Field
-from typing import Optional
+from pydantic import BaseModel, Field, root_validator
+from typing import Dict, List, Optional
 from datetime import datetime
 from app.models.product import ProductCategory
 
@@ -46,6 +46,40 @@ class ProductUpdate(BaseModel):
     tags: Optional[str] = None
 
 
+class ProductBulkFields(BaseModel):
+    """Fields a bulk patch may set to one value on every matched product"""
+    price: Optional[float] = Field(None, gt=0)
+    discount_percentage: Optional[float] = Field(None, ge=0, le=100)
+    stock_quantity: Optional[int] = Field(None, ge=0)
+    is_popular: Optional[bool] = None
+    is_special: Optional[bool] = None
+    is_offer: Optional[bool] = None
+    is_active: Optional[bool] = None
+
+
+class ProductBulkPatch(BaseModel):
+    # Which products: the listed ids, the category, or the listed ids within the category
+    ids: Optional[List[int]] = Field(None, min_length=1, max_length=1000)
+    category: Optional[ProductCategory] = None
+    # What changes
+    set: ProductBulkFields = Field(default_factory=ProductBulkFields)
+    stock_delta: Optional[int] = None  # Added to stock_quantity, which stops at 0
+    price_change_percent: Optional[float] = Field(None, gt=-100)  # e.g. -10 for 10% off, rounded to 2 places
+
+    @root_validator(skip_on_failure=True)
+    def check_patch(cls, values):
+        if values.get('ids') is None and values.get('category') is None:
+            raise ValueError('Give ids, a category or both')
+        changes = values['set'].dict(exclude_none=True)
+        if not changes and values.get('stock_delta') is None and values.get('price_change_percent') is None:
+            raise ValueError('Nothing to change')
+        if 'stock_quantity' in changes and values.get('stock_delta') is not None:
+            raise ValueError('Set stock_quantity or give stock_delta, not both')
+        if 'price' in changes and values.get('price_change_percent') is not None:
+            raise ValueError('Set price or give price_change_percent, not both')
+        return values
+
+
 class ProductResponse(ProductBase):
     id: int
     created_at: datetime
@@ -53,3 +87,44 @@ class ProductResponse(ProductBase):
     
     class Config:
         from_attributes = True
+
+
+class HomeResponse(BaseModel):
+    version: str  # Changes whenever any section or count changes
+    popular: List[ProductResponse]
+    special: List[ProductResponse]
+    offers: List[ProductResponse]
+    products: List[ProductResponse]
+    category_counts: Dict[ProductCategory, int]
+
+
+class PriceBucketCount(BaseModel):
+    min: float
+    max: Optional[float] = None  # None for the top bucket
+    count: int
+
+
+class ProductSuggestion(BaseModel):
+    id: int
+    name: str
+    category: ProductCategory
+
+
+class FacetsResponse(BaseModel):
+    total: int
+    categories: Dict[ProductCategory, int]
+    tags: Dict[str, int]  # Most common first
+    price_buckets: List[PriceBucketCount]
+
+
+class ProductImportError(BaseModel):
+    line: int  # Line in the file where the row starts
+    sku: Optional[str] = None
+    error: str
+
+
+class ProductImportResponse(BaseModel):
+    created: int = 0
+    updated: int = 0
+    failed: int = 0
+    errors: List[ProductImportError] = []  # The first 100 failures
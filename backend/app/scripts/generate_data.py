@@ -0,0 +1,517 @@
+"""
+Generate a large synthetic dataset for load tests, query plans and pagination
+Run with: python -m app.scripts.generate_data --products 5000 --users 100000 --orders 2000000 --years 3
+
+Rows are appended to whatever is already in the database (ids continue from the
+current maximum). Loading uses COPY on Postgres and multi-row INSERTs elsewhere.
+Every generated account shares one password (bcrypt is too slow to hash per row).
+"""
+import argparse
+import bisect
+import csv
+import enum
+import io
+import itertools
+import json
+import math
+import os
+import random
+import sqlite3
+import sys
+import time
+from datetime import datetime, timedelta
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, func, insert, select, text
+from app.core.config import settings
+from app.core.database import Base
+from app.core.security import get_password_hash
+from app.models.cart import Cart, CartItem
+from app.models.order import Order, OrderItem, OrderStatus, PaymentMethod, PaymentStatus
+from app.models.product import Product, ProductCategory
+from app.models.tag import replace_product_tags
+from app.models.user import Address, User, UserRole
+
+# Relative share of the menu per category
+CATEGORY_WEIGHTS = {
+    ProductCategory.MAIN: 30,
+    ProductCategory.APPETIZERS: 15,
+    ProductCategory.PASTA: 12,
+    ProductCategory.SEAFOOD: 10,
+    ProductCategory.DESSERTS: 13,
+    ProductCategory.BEVERAGES: 20,
+}
+
+# Median price (NGN) per category; prices are log-normal around it
+CATEGORY_PRICES = {
+    ProductCategory.MAIN: 6500,
+    ProductCategory.APPETIZERS: 3000,
+    ProductCategory.PASTA: 5500,
+    ProductCategory.SEAFOOD: 9000,
+    ProductCategory.DESSERTS: 2500,
+    ProductCategory.BEVERAGES: 1200,
+}
+
+CATEGORY_WORDS = {
+    ProductCategory.MAIN: ["Jollof Rice", "Fried Rice", "Grilled Chicken", "Beef Suya", "Ofada Stew", "Pepper Soup", "Burger", "Steak"],
+    ProductCategory.APPETIZERS: ["Spring Rolls", "Samosa", "Puff Puff", "Chicken Wings", "Bruschetta", "Plantain Chips"],
+    ProductCategory.PASTA: ["Spaghetti", "Penne", "Lasagna", "Fettuccine", "Macaroni", "Ravioli"],
+    ProductCategory.SEAFOOD: ["Grilled Fish", "Prawns", "Calamari", "Lobster", "Catfish", "Crab Cakes"],
+    ProductCategory.DESSERTS: ["Cheesecake", "Brownie", "Ice Cream", "Tiramisu", "Chin Chin", "Pancakes"],
+    ProductCategory.BEVERAGES: ["Zobo", "Chapman", "Smoothie", "Lemonade", "Iced Tea", "Coffee", "Palm Wine"],
+}
+
+ADJECTIVES = ["Classic", "Spicy", "Smoky", "Crispy", "Creamy", "Peppered", "Honey", "Garlic", "Chef's", "Mini", "Jumbo", "Local"]
+
+TAGS = {
+    ProductCategory.MAIN: ["rice", "grill", "spicy", "chicken", "beef", "local"],
+    ProductCategory.APPETIZERS: ["snack", "fried", "sharing", "spicy"],
+    ProductCategory.PASTA: ["pasta", "cheese", "tomato", "creamy"],
+    ProductCategory.SEAFOOD: ["fish", "seafood", "grill", "spicy"],
+    ProductCategory.DESSERTS: ["sweet", "chocolate", "cold", "baked"],
+    ProductCategory.BEVERAGES: ["drink", "cold", "fresh", "juice", "hot"],
+}
+
+# (state, city, share of customers)
+LOCATIONS = [
+    ("Lagos", "Ikeja", 25), ("Lagos", "Lekki", 15), ("Lagos", "Yaba", 8),
+    ("FCT", "Abuja", 18), ("Rivers", "Port Harcourt", 10), ("Oyo", "Ibadan", 8),
+    ("Kano", "Kano", 6), ("Enugu", "Enugu", 5), ("Edo", "Benin City", 5),
+]
+
+STREETS = ["Allen Avenue", "Admiralty Way", "Herbert Macaulay Way", "Aminu Kano Crescent", "Ring Road", "Bode Thomas Street", "Awolowo Road"]
+FIRST_NAMES = ["Ada", "Chidi", "Tunde", "Ngozi", "Emeka", "Funke", "Bola", "Ifeanyi", "Zainab", "Musa", "Kemi", "Segun", "Amaka", "Yusuf", "Tolu", "Grace"]
+LAST_NAMES = ["Okafor", "Adeyemi", "Bello", "Eze", "Ogunleye", "Ibrahim", "Nwosu", "Abubakar", "Adebayo", "Okonkwo", "Balogun", "Danjuma"]
+
+# Share of orders placed in each hour of the day (lunch and dinner peaks)
+HOUR_WEIGHTS = [1, 0.5, 0.2, 0.1, 0.1, 0.3, 1, 3, 5, 5, 6, 9, 14, 15, 10, 7, 7, 10, 15, 16, 13, 9, 5, 2]
+# Monday..Sunday demand multipliers
+WEEKDAY_WEIGHTS = [0.85, 0.85, 0.9, 0.95, 1.2, 1.35, 1.15]
+
+PAYMENT_METHODS = [(PaymentMethod.CARD, 55), (PaymentMethod.CASH, 25), (PaymentMethod.BANK_TRANSFER, 20)]
+
+FREE_DELIVERY_THRESHOLD = 50000
+
+# SQLite caps the number of bound parameters per statement
+SQLITE_MAX_VARIABLES = 32766 if sqlite3.sqlite_version_info >= (3, 32, 0) else 999
+
+
+class WeightedSampler:
+    """O(log n) weighted choice over a fixed population"""
+
+    def __init__(self, population: List, weights: Iterable[float]):
+        self.population = population
+        self.cum_weights = list(itertools.accumulate(weights))
+
+    def sample(self, rng: random.Random, limit: Optional[int] = None):
+        """Pick one item, optionally restricted to the first `limit` items"""
+        upper = self.cum_weights[(limit or len(self.population)) - 1]
+        index = bisect.bisect_right(self.cum_weights, rng.random() * upper)
+        return self.population[min(index, len(self.population) - 1)]
+
+
+def weighted(rng: random.Random, pairs):
+    values, weights = zip(*pairs)
+    return rng.choices(values, weights=weights)[0]
+
+
+def _copy_value(value):
+    if value is None:
+        return None
+    if isinstance(value, enum.Enum):
+        # SQLAlchemy Enum columns store member names
+        return value.name
+    if isinstance(value, bool):
+        return "t" if value else "f"
+    if isinstance(value, dict):
+        return json.dumps(value)
+    if isinstance(value, datetime):
+        return value.isoformat(sep=" ")
+    return value
+
+
+class BulkLoader:
+    """Append rows using COPY (Postgres) or multi-row INSERT ... VALUES"""
+
+    def __init__(self, conn, batch_size: int):
+        self.conn = conn
+        self.batch_size = batch_size
+        self.dialect = conn.dialect.name
+        self.counts: Dict[str, int] = {}
+
+    def load(self, model, rows: List[dict]) -> None:
+        if not rows:
+            return
+        table = model.__table__
+        self.counts[table.name] = self.counts.get(table.name, 0) + len(rows)
+
+        # COPY goes through the raw DBAPI connection, so open the transaction explicitly
+        if not self.conn.in_transaction():
+            self.conn.begin()
+
+        if self.dialect == "postgresql":
+            self._copy(table.name, list(rows[0]), rows)
+            return
+
+        columns = list(rows[0])
+        if self.conn.dialect.paramstyle != "qmark":
+            # Drivers with insertmanyvalues support batch executemany into multi-row VALUES
+            self.conn.execute(insert(table), rows)
+            return
+
+        # Compiling insert().values(rows) costs more than the insert itself at this
+        # size, so build the multi-row statement once and bind through the column types
+        processors = [
+            table.c[column].type.dialect_impl(self.conn.dialect).bind_processor(self.conn.dialect)
+            for column in columns
+        ]
+        batch_size = max(1, min(self.batch_size, SQLITE_MAX_VARIABLES // len(columns)))
+        for start in range(0, len(rows), batch_size):
+            batch = rows[start:start + batch_size]
+            params = []
+            for row in batch:
+                for processor, value in zip(processors, row.values()):
+                    params.append(processor(value) if processor and value is not None else value)
+            self.conn.exec_driver_sql(_multirow_insert_sql(table.name, tuple(columns), len(batch)), tuple(params))
+
+    def _copy(self, table_name: str, columns: List[str], rows: List[dict]) -> None:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for row in rows:
+            # Unquoted empty fields are NULL in COPY's CSV format
+            writer.writerow(["" if value is None else value for value in map(_copy_value, row.values())])
+        buffer.seek(0)
+
+        cursor = self.conn.connection.dbapi_connection.cursor()
+        try:
+            cursor.copy_expert(
+                f"COPY {table_name} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)", buffer
+            )
+        finally:
+            cursor.close()
+
+
+@lru_cache(maxsize=64)
+def _multirow_insert_sql(table_name: str, columns: tuple, row_count: int) -> str:
+    row = "(" + ", ".join("?" * len(columns)) + ")"
+    return f"INSERT INTO {table_name} ({', '.join(columns)}) VALUES " + ", ".join([row] * row_count)
+
+
+def next_id(conn, model) -> int:
+    return (conn.execute(select(func.max(model.id))).scalar() or 0) + 1
+
+
+def reset_sequences(conn, models) -> None:
+    """Move Postgres id sequences past explicitly inserted ids"""
+    if conn.dialect.name != "postgresql":
+        return
+    for model in models:
+        table = model.__table__.name
+        conn.execute(text(
+            f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), COALESCE((SELECT MAX(id) FROM {table}), 1))"
+        ))
+
+
+def generate_products(rng: random.Random, count: int, first_id: int, start: datetime, now: datetime) -> List[dict]:
+    categories = WeightedSampler(list(CATEGORY_WEIGHTS), CATEGORY_WEIGHTS.values())
+    span = (now - start).total_seconds()
+    rows = []
+    for offset in range(count):
+        product_id = first_id + offset
+        category = categories.sample(rng)
+        created_at = start + timedelta(seconds=rng.random() * span)
+        is_offer = rng.random() < 0.08
+        rows.append({
+            "id": product_id,
+            "sku": f"GEN-{product_id:08d}",
+            "name": f"{rng.choice(ADJECTIVES)} {rng.choice(CATEGORY_WORDS[category])} #{product_id}",
+            "description": f"Generated {category.value} item",
+            "price": round(CATEGORY_PRICES[category] * rng.lognormvariate(0, 0.35), -1),
+            "image_url": f"/static/uploads/generated/{category.value}.png",
+            "category": category,
+            "is_popular": False,  # Set below from the popularity ranking
+            "is_special": rng.random() < 0.03,
+            "is_offer": is_offer,
+            "discount_percentage": float(rng.choice([5, 10, 15, 20, 25])) if is_offer else 0.0,
+            "stock_quantity": 0 if rng.random() < 0.07 else rng.randint(5, 500),
+            "is_active": rng.random() > 0.03,
+            "rating": round(min(5.0, max(1.0, rng.gauss(4.2, 0.5))), 1),
+            "review_count": 0,
+            "weight": round(rng.uniform(0.2, 2.5), 2),
+            "tags": ",".join(rng.sample(TAGS[category], k=min(len(TAGS[category]), rng.randint(1, 3)))),
+            "created_at": created_at,
+            "updated_at": created_at,
+        })
+    return rows
+
+
+def generate(
+    engine,
+    products: int,
+    users: int,
+    orders: int,
+    years: float = 2.0,
+    cart_ratio: float = 0.2,
+    password: str = "Password123",
+    email_domain: str = "example.com",
+    seed: int = 42,
+    batch_size: int = 5000,
+    chunk_size: int = 20000,
+    log=print,
+) -> dict:
+    """Append a synthetic dataset and return row counts per table"""
+    rng = random.Random(seed)
+    now = datetime.utcnow().replace(microsecond=0)
+    start = (now - timedelta(days=365 * years)).replace(hour=0, minute=0, second=0)
+    span_days = max(1, (now - start).days)
+    hashed_password = get_password_hash(password)
+    started = time.perf_counter()
+
+    Base.metadata.create_all(engine)
+
+    with engine.connect() as conn:
+        loader = BulkLoader(conn, batch_size)
+
+        # Products: popularity follows a Zipf-like curve over a shuffled ranking
+        first_product_id = next_id(conn, Product)
+        product_rows = generate_products(rng, products, first_product_id, start, now)
+        ranking = list(range(products))
+        rng.shuffle(ranking)
+        popularity = [0.0] * products
+        for rank, index in enumerate(ranking):
+            popularity[index] = 1 / (rank + 1) ** 0.8
+        for index in ranking[:max(1, products // 20)]:
+            product_rows[index]["is_popular"] = True
+        for row, weight in zip(product_rows, popularity):
+            row["review_count"] = int(weight * 5000 * rng.random())
+        loader.load(Product, product_rows)
+        for start_index in range(0, products, batch_size):
+            batch = product_rows[start_index:start_index + batch_size]
+            replace_product_tags(conn, [(row["id"], row["tags"]) for row in batch])
+        conn.commit()
+        log(f"products: {products}")
+
+        # Users sign up at an accelerating rate, so ids are in signup order
+        first_user_id = next_id(conn, User)
+        signups = sorted(start + timedelta(days=span_days * math.sqrt(rng.random())) for _ in range(users))
+        signup_days = [(signup - start).days for signup in signups]
+        locations = WeightedSampler(LOCATIONS, [share for _, _, share in LOCATIONS])
+        user_rows, address_rows, user_addresses = [], [], []
+        for offset, created_at in enumerate(signups):
+            user_id = first_user_id + offset
+            first_name, last_name = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+            user_rows.append({
+                "id": user_id,
+                "email": f"user{user_id}@{email_domain}",
+                "hashed_password": hashed_password,
+                "first_name": first_name,
+                "last_name": last_name,
+                "phone": f"+23480{rng.randint(10000000, 99999999)}",
+                "role": UserRole.USER,
+                "is_active": rng.random() > 0.02,
+                "is_email_verified": rng.random() > 0.1,
+                "created_at": created_at,
+                "updated_at": created_at,
+            })
+
+            address_count = weighted(rng, [(0, 20), (1, 55), (2, 20), (3, 5)])
+            addresses = []
+            for position in range(address_count):
+                state, city, _ = locations.sample(rng)
+                address = {
+                    "street": f"{rng.randint(1, 250)} {rng.choice(STREETS)}",
+                    "city": city,
+                    "state": state,
+                    "zip_code": f"{rng.randint(100000, 999999)}",
+                }
+                addresses.append(address)
+                address_rows.append({
+                    "user_id": user_id,
+                    **address,
+                    "is_default": position == 0,
+                    "created_at": created_at,
+                })
+            user_addresses.append(addresses)
+
+            if len(user_rows) >= chunk_size:
+                loader.load(User, user_rows)
+                loader.load(Address, address_rows)
+                user_rows, address_rows = [], []
+        loader.load(User, user_rows)
+        loader.load(Address, address_rows)
+        conn.commit()
+        log(f"users: {users}, addresses: {loader.counts.get('addresses', 0)}")
+
+        product_ids = [row["id"] for row in product_rows]
+        product_sampler = WeightedSampler(list(range(products)), popularity)
+
+        # Open carts for a share of the most recent users
+        cart_rows, cart_item_rows = [], []
+        cart_id = next_id(conn, Cart)
+        cart_users = rng.sample(range(users), k=int(users * cart_ratio)) if products else []
+        for user_index in cart_users:
+            cart_rows.append({"id": cart_id, "user_id": first_user_id + user_index})
+            chosen = {product_sampler.sample(rng) for _ in range(rng.randint(1, 5))}
+            for product_index in chosen:
+                cart_item_rows.append({
+                    "cart_id": cart_id,
+                    "product_id": product_ids[product_index],
+                    "quantity": weighted(rng, [(1, 70), (2, 20), (3, 10)]),
+                    "price_at_addition": product_rows[product_index]["price"],
+                })
+            cart_id += 1
+        loader.load(Cart, cart_rows)
+        loader.load(CartItem, cart_item_rows)
+        conn.commit()
+        log(f"carts: {len(cart_rows)}, cart items: {len(cart_item_rows)}")
+
+        # Orders are generated day by day so ids follow created_at. Demand grows
+        # over the period, peaks on weekends and clusters around meal times.
+        # Days before the first signup get no orders, so they get no share of the total
+        day_weights = [
+            (0.3 + 0.7 * day / span_days) * WEEKDAY_WEIGHTS[(start + timedelta(days=day)).weekday()]
+            if bisect.bisect_right(signup_days, day) else 0.0
+            for day in range(span_days + 1)
+        ]
+        scale = orders / sum(day_weights) if users and products and any(day_weights) else 0
+        # Heavy-tailed customer activity: regulars order far more often than most
+        user_sampler = WeightedSampler(list(range(users)), (min(rng.paretovariate(1.5), 100) for _ in range(users)))
+        hours = WeightedSampler(list(range(24)), HOUR_WEIGHTS)
+
+        order_id = next_id(conn, Order)
+        order_rows, item_rows = [], []
+        for day, weight in enumerate(day_weights):
+            expected = weight * scale
+            count = int(expected) + (rng.random() < expected - int(expected))
+            eligible = bisect.bisect_right(signup_days, day)
+            if not count or not eligible:
+                continue
+
+            day_start = start + timedelta(days=day)
+            times = sorted(
+                day_start + timedelta(hours=hours.sample(rng), seconds=rng.randrange(3600)) for _ in range(count)
+            )
+            for created_at in times:
+                if created_at > now:
+                    break
+                user_index = user_sampler.sample(rng, limit=eligible)
+                addresses = user_addresses[user_index]
+                if addresses:
+                    address = rng.choice(addresses)
+                else:
+                    state, city, _ = locations.sample(rng)
+                    address = {"street": f"{rng.randint(1, 250)} {rng.choice(STREETS)}", "city": city, "state": state, "zip_code": "100001"}
+
+                subtotal = 0.0
+                for _ in range(min(8, 1 + int(math.log(1 - rng.random()) / math.log(0.55)))):
+                    product_index = product_sampler.sample(rng)
+                    quantity = weighted(rng, [(1, 70), (2, 20), (3, 10)])
+                    # Prices drift upwards over time
+                    price = round(product_rows[product_index]["price"] * (0.8 + 0.2 * day / span_days), 2)
+                    subtotal += price * quantity
+                    item_rows.append({
+                        "order_id": order_id,
+                        "product_id": str(product_ids[product_index]),
+                        "product_name": product_rows[product_index]["name"],
+                        "product_image": product_rows[product_index]["image_url"],
+                        "price": price,
+                        "quantity": quantity,
+                    })
+
+                delivery_fee = 0.0 if subtotal >= FREE_DELIVERY_THRESHOLD else (1500.0 if address["state"] == "Lagos" else 3500.0)
+                method = weighted(rng, PAYMENT_METHODS)
+                age = now - created_at
+                if age > timedelta(days=2):
+                    order_status = weighted(rng, [(OrderStatus.DELIVERED, 90), (OrderStatus.CANCELLED, 7), (OrderStatus.CONFIRMED, 3)])
+                else:
+                    order_status = weighted(rng, [
+                        (OrderStatus.PENDING, 30), (OrderStatus.CONFIRMED, 20), (OrderStatus.PREPARING, 20),
+                        (OrderStatus.DELIVERING, 15), (OrderStatus.DELIVERED, 15),
+                    ])
+                if order_status == OrderStatus.CANCELLED:
+                    payment_status = PaymentStatus.FAILED if method == PaymentMethod.CARD else PaymentStatus.PENDING
+                elif method == PaymentMethod.CARD or order_status == OrderStatus.DELIVERED:
+                    payment_status = PaymentStatus.PAID
+                elif method == PaymentMethod.BANK_TRANSFER:
+                    payment_status = PaymentStatus.AWAITING_VERIFICATION
+                else:
+                    payment_status = PaymentStatus.PENDING
+
+                order_rows.append({
+                    "id": order_id,
+                    "user_id": first_user_id + user_index,
+                    "total_amount": round(subtotal + delivery_fee, 2),
+                    "delivery_fee": delivery_fee,
+                    "status": order_status,
+                    "payment_method": method,
+                    "payment_status": payment_status,
+                    "delivery_address": {**address, "country": "Nigeria"},
+                    "notes": None,
+                    "created_at": created_at,
+                    "updated_at": created_at + timedelta(minutes=rng.randint(0, 120)),
+                    "cancellation_reason": "Customer request" if order_status == OrderStatus.CANCELLED else None,
+                    "is_user_deleted": rng.random() < 0.01,
+                })
+                order_id += 1
+
+            if len(order_rows) >= chunk_size:
+                loader.load(Order, order_rows)
+                loader.load(OrderItem, item_rows)
+                conn.commit()
+                log(f"orders: {loader.counts['orders']} (through {day_start:%Y-%m-%d})")
+                order_rows, item_rows = [], []
+
+        loader.load(Order, order_rows)
+        loader.load(OrderItem, item_rows)
+        reset_sequences(conn, [Product, User, Address, Cart, CartItem, Order, OrderItem])
+        conn.commit()
+
+    summary = {table: loader.counts.get(table, 0) for table in (
+        "products", "users", "addresses", "carts", "cart_items", "orders", "order_items"
+    )}
+    summary["seconds"] = round(time.perf_counter() - started, 2)
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default=None, help="defaults to DATABASE_URL from settings")
+    parser.add_argument("--products", type=int, default=1000)
+    parser.add_argument("--users", type=int, default=10000)
+    parser.add_argument("--orders", type=int, default=100000, help="approximate total across the period")
+    parser.add_argument("--years", type=float, default=2.0, help="order history length")
+    parser.add_argument("--cart-ratio", type=float, default=0.2, help="share of users with an open cart")
+    parser.add_argument("--password", default="Password123", help="password for every generated account")
+    parser.add_argument("--email-domain", default="example.com")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--batch-size", type=int, default=5000, help="rows per INSERT statement")
+    args = parser.parse_args()
+
+    engine = create_engine(args.database_url or settings.DATABASE_URL)
+    try:
+        summary = generate(
+            engine,
+            products=args.products,
+            users=args.users,
+            orders=args.orders,
+            years=args.years,
+            cart_ratio=args.cart_ratio,
+            password=args.password,
+            email_domain=args.email_domain,
+            seed=args.seed,
+            batch_size=args.batch_size,
+        )
+    finally:
+        engine.dispose()
+
+    total = sum(value for key, value in summary.items() if key != "seconds")
+    print(f"✅ Generated {total} rows in {summary['seconds']}s")
+    print(json.dumps(summary, indent=2))
+
+
+if __name__ == "__main__":
+    main()
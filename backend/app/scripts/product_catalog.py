@@ -0,0 +1,76 @@
+"""
+Import or export the product catalog as CSV or NDJSON, matched on sku
+Run with: python -m app.scripts.product_catalog import menu.csv
+          python -m app.scripts.product_catalog export --format ndjson --output menu.ndjson
+
+Import creates missing products and updates existing ones in batches, without
+deleting anything; bad rows are reported and skipped. Running servers see the
+changes once their catalog caches expire (CATALOG_CACHE_TTL_SECONDS).
+"""
+import argparse
+import os
+import sys
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.product_io import EXPORT_BATCH_SIZE, FORMATS, IMPORT_BATCH_SIZE, export_products, guess_format, import_products
+
+
+def run_import(engine, args) -> int:
+    format = args.format or guess_format(args.file)
+    if format not in FORMATS:
+        print("Cannot tell the format from the file name; pass --format csv or --format ndjson", file=sys.stderr)
+        return 2
+    with open(args.file, encoding="utf-8-sig", newline="") as file, Session(engine) as db:
+        report = import_products(db, file, format, batch_size=args.batch_size)
+    print(f"✅ Created {report.created}, updated {report.updated}, failed {report.failed}")
+    for error in report.errors:
+        print(f"  line {error.line} ({error.sku or 'no sku'}): {error.error}")
+    if report.failed > len(report.errors):
+        print(f"  ... and {report.failed - len(report.errors)} more")
+    return 1 if report.failed else 0
+
+
+def run_export(engine, args) -> int:
+    format = args.format or guess_format(args.output) or "csv"
+    output = open(args.output, "w", encoding="utf-8", newline="") if args.output else sys.stdout
+    try:
+        with Session(engine) as db:
+            for chunk in export_products(db, format, batch_size=args.batch_size):
+                output.write(chunk)
+    finally:
+        if output is not sys.stdout:
+            output.close()
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default=None, help="defaults to DATABASE_URL from settings")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    importer = commands.add_parser("import", help="create or update products from a file")
+    importer.add_argument("file")
+    importer.add_argument("--format", choices=FORMATS, help="defaults to the file extension")
+    importer.add_argument("--batch-size", type=int, default=IMPORT_BATCH_SIZE, help="rows per upsert statement")
+
+    exporter = commands.add_parser("export", help="write every product to a file or stdout")
+    exporter.add_argument("--format", choices=FORMATS, help="defaults to the output extension, else csv")
+    exporter.add_argument("--output", help="defaults to stdout")
+    exporter.add_argument("--batch-size", type=int, default=EXPORT_BATCH_SIZE, help="rows fetched per round trip")
+    args = parser.parse_args()
+
+    engine = create_engine(args.database_url or settings.DATABASE_URL)
+    try:
+        status = run_import(engine, args) if args.command == "import" else run_export(engine, args)
+    finally:
+        engine.dispose()
+    sys.exit(status)
+
+
+if __name__ == "__main__":
+    main()
@@ -19,12 +19,14 @@ def seed_products():
         # Clear existing data in correct order to avoid FK violations
         from app.models.cart import Cart, CartItem
         from app.models.order import Order, OrderItem
+        from app.models.tag import product_tags
         
         print("Clearing existing data...")
         db.query(OrderItem).delete()
         db.query(Order).delete()
         db.query(CartItem).delete()
         db.query(Cart).delete()
+        db.execute(product_tags.delete())
         db.query(Product).delete()
         db.commit()
         print("Cleared existing products and related data.")
@@ -3,8 +3,10 @@ from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from datetime import datetime
 import os
+import time
 from typing import List, Optional
 from app.core.config import settings
+from app.core.metrics import EMAIL_SEND_SECONDS
 import logging
 
 # Configure logging
@@ -19,7 +21,15 @@ class EmailService:
         logger.info("Email service initialized - CONSOLE MODE (development)")
 
     def _send_email(self, to_email: str, subject: str, html_content: str):
-        """Internal method to send email via SMTP"""
+        """Internal method to send email, recording how long it took"""
+        start = time.perf_counter()
+        sent = self._deliver_email(to_email, subject, html_content)
+        outcome = "simulated" if not self.enabled else ("sent" if sent else "failed")
+        EMAIL_SEND_SECONDS.labels(outcome).observe(time.perf_counter() - start)
+        return sent
+
+    def _deliver_email(self, to_email: str, subject: str, html_content: str):
+        """Send email via SMTP (or print it in console mode)"""
         if not self.enabled:
             # Simulation mode for development
             print("="*50)
@@ -0,0 +1,95 @@
+"""
+Per-request cost of token authentication, with and without the verified-token cache.
+Times decode_token alone and the two auth dependencies (claims-only reads and the
+principal-checked path, with a warm principal cache so no DB is involved) over a
+pool of tokens that are each reused, as a client session would.
+Run with: python -m benchmarks.auth --tokens 500 --calls 20000 [--output auth.json]
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+from app.api import deps
+from app.core.config import settings
+from app.core.principals import Principal, cache_principal
+from app.core.security import create_access_token, decode_token, token_cache, token_claims
+from app.models.user import UserRole
+
+
+def make_tokens(count: int) -> list:
+    tokens = []
+    for index in range(count):
+        principal = Principal(id=index + 1, email=f"user{index + 1}@bench.example.com", role=UserRole.USER, is_active=True)
+        cache_principal(principal)
+        tokens.append(create_access_token(token_claims(principal)))
+    return tokens
+
+
+async def time_calls(target, tokens: list, calls: int) -> float:
+    """Seconds per call, averaged over `calls` calls cycling through `tokens`"""
+    sequence = [tokens[i % len(tokens)] for i in range(calls)]
+    start = time.perf_counter()
+    for token in sequence:
+        await target(token)
+    return (time.perf_counter() - start) / calls
+
+
+async def run(token_count: int, calls: int, rounds: int) -> dict:
+    tokens = make_tokens(token_count)
+
+    async def decode(token):
+        decode_token(token)
+
+    async def read_principal(token):
+        await deps.get_read_principal(token, None)
+
+    async def checked_principal(token):
+        await deps.get_current_principal(token, None)
+
+    targets = {"decode_token": decode, "get_read_principal": read_principal, "get_current_principal": checked_principal}
+    configured_size = settings.TOKEN_CACHE_SIZE
+
+    samples = {(name, mode): [] for name in targets for mode in ("uncached", "cached")}
+    for _ in range(rounds):
+        # Interleave modes so drift (CPU frequency, GC) hits them equally
+        for name, target in targets.items():
+            for mode in ("uncached", "cached"):
+                settings.TOKEN_CACHE_SIZE = configured_size if mode == "cached" else 0
+                token_cache.clear()
+                await time_calls(target, tokens, len(tokens))  # Fill the cache outside the timing
+                samples[(name, mode)].append(await time_calls(target, tokens, calls))
+    settings.TOKEN_CACHE_SIZE = configured_size
+
+    report = {"tokens": token_count, "calls_per_round": calls, "rounds": rounds, "targets": {}}
+    for name in targets:
+        uncached = statistics.median(samples[(name, "uncached")])
+        cached = statistics.median(samples[(name, "cached")])
+        report["targets"][name] = {
+            "uncached_us": round(uncached * 1e6, 2),
+            "cached_us": round(cached * 1e6, 2),
+            "saved_us": round((uncached - cached) * 1e6, 2),
+            "speedup": round(uncached / cached, 1),
+        }
+    report["cache"] = token_cache.stats()
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tokens", type=int, default=500, help="distinct tokens (client sessions)")
+    parser.add_argument("--calls", type=int, default=20000, help="calls per round")
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--output", help="also write the JSON report to this file")
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args.tokens, args.calls, args.rounds))
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+Reproducible benchmark dataset: the same --seed always produces the same rows.
+Builds on app.scripts.generate_data and requires the app settings to be
+configured (benchmarks.endpoints does this).
+"""
+from datetime import datetime
+from sqlalchemy import create_engine, func, insert, select, update
+from app.core.database import Base
+from app.core.security import get_password_hash
+from app.models.product import Product
+from app.models.user import User, UserRole
+from app.scripts.generate_data import generate
+
+# Every benchmark account shares this password (hashed once, bcrypt is slow)
+BENCH_PASSWORD = "Bench12345"
+EMAIL_DOMAIN = "bench.example.com"
+ADMIN_EMAIL = f"bench-admin@{EMAIL_DOMAIN}"
+
+
+def user_email(index: int) -> str:
+    """Email of the index-th generated user (ids start at 1 in an empty database)"""
+    return f"user{index}@{EMAIL_DOMAIN}"
+
+
+def seed(database_url: str, products: int, users: int, orders: int, seed: int = 42) -> dict:
+    """Create the schema and bulk-load a deterministic dataset"""
+    engine = create_engine(database_url)
+    try:
+        Base.metadata.create_all(engine)
+        with engine.connect() as conn:
+            # Benchmark clients address users and products by id
+            if conn.execute(select(func.count()).select_from(Product)).scalar():
+                raise RuntimeError("The benchmark database must be empty")
+
+        summary = generate(
+            engine,
+            products=products,
+            users=users,
+            orders=orders,
+            years=1,
+            password=BENCH_PASSWORD,
+            email_domain=EMAIL_DOMAIN,
+            seed=seed,
+            log=lambda message: None,
+        )
+
+        now = datetime.utcnow()
+        with engine.begin() as conn:
+            # Keep every product purchasable and every account usable for the whole run
+            conn.execute(update(Product).values(stock_quantity=1_000_000, is_active=True))
+            conn.execute(update(User).values(is_active=True))
+            conn.execute(insert(User).values(
+                email=ADMIN_EMAIL,
+                hashed_password=get_password_hash(BENCH_PASSWORD),
+                first_name="Bench",
+                last_name="Admin",
+                role=UserRole.ADMIN,
+                is_active=True,
+                is_email_verified=True,
+                created_at=now,
+                updated_at=now,
+            ))
+    finally:
+        engine.dispose()
+
+    summary["seed"] = seed
+    return summary
@@ -0,0 +1,296 @@
+"""
+Endpoint throughput/latency benchmark against a freshly seeded database.
+
+Boots the app under uvicorn with a stub Paystack server and console email,
+then drives each scenario with concurrent clients and prints a JSON report.
+Run with: python -m benchmarks.endpoints --products 2000 --users 200 --orders 20000 \\
+              --concurrency 16 --duration 10 [--output endpoints.json]
+
+By default a throwaway SQLite file is used. Pass --database-url to run against
+an empty Postgres database instead.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from collections import Counter
+from typing import Awaitable, Callable, Dict, List
+
+import httpx
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCENARIOS = ("products", "cart_items", "place_order", "admin_stats")
+
+# Settings the app needs that have nothing to do with the benchmark
+BASE_ENV = {
+    "SECRET_KEY": "benchmark-secret",
+    "FRONTEND_URL": "http://localhost:3000",
+    "SEED_ADMIN_EMAIL": "unused@bench.example.com",
+    "SEED_ADMIN_PASSWORD": "unused",
+    "SEED_USER_EMAIL": "unused@bench.example.com",
+    "SEED_USER_PASSWORD": "unused",
+    "PAYSTACK_SECRET_KEY": "sk_bench",
+    "SQL_DEBUG_HEADERS": "false",
+    # Long enough that tokens never expire mid-run
+    "ACCESS_TOKEN_EXPIRE_MINUTES": "600",
+    # Every client signs in from 127.0.0.1
+    "LOGIN_THROTTLE_ENABLED": "false",
+    "METRICS_TOKEN": "benchmark-metrics",
+}
+
+DELIVERY_ADDRESS = {"street": "1 Bench Way", "city": "Lagos", "state": "Lagos", "zip_code": "100001"}
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def summarize(latencies: List[float], statuses: Counter, errors: int, elapsed: float) -> dict:
+    ordered = sorted(latencies)
+    to_ms = lambda seconds: round(seconds * 1000, 2)
+    return {
+        "requests": len(ordered),
+        "errors": errors,
+        "throughput_rps": round(len(ordered) / elapsed, 1) if elapsed else 0.0,
+        "latency_ms": {
+            "p50": to_ms(percentile(ordered, 50)),
+            "p95": to_ms(percentile(ordered, 95)),
+            "p99": to_ms(percentile(ordered, 99)),
+            "mean": to_ms(sum(ordered) / len(ordered)) if ordered else 0.0,
+            "max": to_ms(ordered[-1]) if ordered else 0.0,
+        },
+        "statuses": {str(code): count for code, count in sorted(statuses.items())},
+    }
+
+
+class Server:
+    """uvicorn subprocess serving app.main:app"""
+
+    def __init__(self, env: dict, port: int, workers: int):
+        self.port = port
+        self.base_url = f"http://127.0.0.1:{port}"
+        self.process = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port),
+             "--workers", str(workers), "--log-level", "warning", "--no-access-log"],
+            cwd=BACKEND_DIR,
+            env=env,
+            # Console email prints every message; keep it out of the report
+            stdout=subprocess.DEVNULL,
+        )
+
+    def wait_ready(self, timeout: float = 60.0) -> None:
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if self.process.poll() is not None:
+                raise RuntimeError("Server exited during startup")
+            try:
+                if httpx.get(f"{self.base_url}/health", timeout=1).status_code == 200:
+                    return
+            except httpx.HTTPError:
+                pass
+            time.sleep(0.2)
+        raise RuntimeError("Server did not become ready in time")
+
+    def stop(self) -> None:
+        self.process.terminate()
+        try:
+            self.process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+
+
+async def sign_in(client: httpx.AsyncClient, email: str, password: str) -> str:
+    response = await client.post("/api/auth/signin", data={"username": email, "password": password})
+    response.raise_for_status()
+    return response.json()["access_token"]
+
+
+async def drive(
+    concurrency: int,
+    duration: float,
+    request: Callable[[int, httpx.AsyncClient], Awaitable[httpx.Response]],
+    client: httpx.AsyncClient,
+) -> dict:
+    """Run `request` in a closed loop from `concurrency` workers for `duration` seconds"""
+    latencies: List[float] = []
+    statuses: Counter = Counter()
+    errors = 0
+    deadline = time.perf_counter() + duration
+
+    async def worker(index: int):
+        nonlocal errors
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            try:
+                response = await request(index, client)
+            except httpx.HTTPError:
+                errors += 1
+                continue
+            # Scenarios with untimed setup calls report their own latency
+            latencies.append(response.extensions.get("bench_elapsed", time.perf_counter() - start))
+            statuses[response.status_code] += 1
+            if response.status_code >= 400:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(index) for index in range(concurrency)))
+    return summarize(latencies, statuses, errors, time.perf_counter() - started)
+
+
+async def run_scenarios(base_url: str, args, dataset_module) -> Dict[str, dict]:
+    rng = random.Random(args.seed)
+    limits = httpx.Limits(max_connections=args.concurrency * 2, max_keepalive_connections=args.concurrency * 2)
+
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+        # One account per worker so carts and checkouts do not contend on a single row
+        user_tokens = await asyncio.gather(*(
+            sign_in(client, dataset_module.user_email(index + 1), dataset_module.BENCH_PASSWORD)
+            for index in range(args.concurrency)
+        ))
+        admin_token = await sign_in(client, dataset_module.ADMIN_EMAIL, dataset_module.BENCH_PASSWORD)
+        user_headers = [{"Authorization": f"Bearer {token}"} for token in user_tokens]
+        admin_headers = {"Authorization": f"Bearer {admin_token}"}
+
+        def random_product() -> int:
+            return rng.randint(1, args.products)
+
+        async def products(index, client):
+            skip = rng.randrange(0, max(args.products - 20, 1))
+            return await client.get("/api/products/", params={"skip": skip, "limit": 20})
+
+        async def cart_items(index, client):
+            return await client.post(
+                "/api/cart/items",
+                json={"product_id": random_product(), "quantity": 1},
+                headers=user_headers[index],
+            )
+
+        async def place_order(index, client):
+            # Refill the cart first; only the checkout call itself is timed
+            await client.post(
+                "/api/cart/items",
+                json={"product_id": random_product(), "quantity": 1},
+                headers=user_headers[index],
+            )
+            start = time.perf_counter()
+            response = await client.post(
+                "/api/checkout/place-order",
+                json={
+                    "payment_method": "card",
+                    "payment_reference": uuid.uuid4().hex,
+                    "delivery_address": DELIVERY_ADDRESS,
+                },
+                headers=user_headers[index],
+            )
+            response.extensions["bench_elapsed"] = time.perf_counter() - start
+            return response
+
+        async def admin_stats(index, client):
+            return await client.get("/api/admin/stats", headers=admin_headers)
+
+        requests = {
+            "products": products,
+            "cart_items": cart_items,
+            "place_order": place_order,
+            "admin_stats": admin_stats,
+        }
+
+        results = {}
+        for name in args.scenarios:
+            # Short unmeasured warm-up fills pools and caches
+            await drive(args.concurrency, args.warmup, requests[name], client)
+            results[name] = await drive(args.concurrency, args.duration, requests[name], client)
+        return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", help="empty database to seed (default: temporary SQLite file)")
+    parser.add_argument("--products", type=int, default=2000)
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--orders", type=int, default=20000)
+    parser.add_argument("--seed", type=int, default=42, help="random seed for the dataset and request mix")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=10.0, help="measured seconds per scenario")
+    parser.add_argument("--warmup", type=float, default=2.0, help="unmeasured seconds per scenario")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn worker processes")
+    parser.add_argument("--paystack-latency-ms", type=float, default=0.0)
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=list(SCENARIOS))
+    parser.add_argument("--output", help="also write the JSON report to this file")
+    args = parser.parse_args()
+
+    if args.users < args.concurrency:
+        parser.error("--users must be at least --concurrency (one account per client)")
+
+    workdir = tempfile.mkdtemp(prefix="bench-")
+    database_url = args.database_url or f"sqlite:///{os.path.join(workdir, 'bench.db')}"
+
+    # Configure settings before anything under app/ is imported
+    env = {**os.environ, **BASE_ENV, "DATABASE_URL": database_url}
+    os.environ.update(env)
+    sys.path.insert(0, BACKEND_DIR)
+    from benchmarks import dataset
+    from benchmarks.paystack_stub import PaystackStub
+
+    seed_start = time.perf_counter()
+    scale = dataset.seed(database_url, args.products, args.users, args.orders, args.seed)
+    seed_seconds = time.perf_counter() - seed_start
+
+    with PaystackStub(latency_ms=args.paystack_latency_ms) as stub:
+        env["PAYSTACK_BASE_URL"] = stub.base_url
+        server = Server(env, free_port(), args.workers)
+        try:
+            server.wait_ready()
+            results = asyncio.run(run_scenarios(server.base_url, args, dataset))
+        finally:
+            server.stop()
+
+    report = {
+        "meta": {
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "database": database_url.split(":", 1)[0],
+            "dataset": scale,
+            "seed_seconds": round(seed_seconds, 2),
+            "concurrency": args.concurrency,
+            "duration_seconds": args.duration,
+            "workers": args.workers,
+            "paystack_latency_ms": args.paystack_latency_ms,
+        },
+        "scenarios": results,
+    }
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+
+
+if __name__ == "__main__":
+    main()
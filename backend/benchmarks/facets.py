@@ -0,0 +1,129 @@
+"""
+Facet counts and tag filtering: the product_tags index against ILIKE on products.tags.
+
+Seeds --products generated products into a throwaway SQLite database (or an
+empty Postgres one via --database-url), then times
+  * crud.get_facets (category, tag and price-bucket counts in one query) for a
+    few filters, against counting each tag with its own ILIKE '%tag%' scan,
+    which is what per-tag counts cost before tags were normalized;
+  * the first page of products with a tag, through product_tags and by ILIKE,
+    for a common tag and for one no product has.
+Note ILIKE '%grill%' also matches tags that merely contain the word.
+Run with: python -m benchmarks.facets --products 100000
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+
+from benchmarks.endpoints import BACKEND_DIR, BASE_ENV, git_commit
+
+FILTERS = {
+    "everything": {},
+    "category": {"category": "main"},
+    "tag": {"tag": "spicy"},
+    "search": {"search": "grill"},
+}
+# A common tag (LIKE stops at the first page of hits) and one no product has (LIKE reads every row)
+TAG_PAGES = {"common tag": "cold", "missing tag": "vegan"}
+
+
+def _summary(timings: list) -> dict:
+    return {"p50_ms": round(statistics.median(timings) * 1000, 2), "max_ms": round(max(timings) * 1000, 2)}
+
+
+async def timed(call, repeat: int) -> list:
+    await call()
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        await call()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+async def run(args) -> dict:
+    from sqlalchemy import func, select
+    from app.core.database import AsyncSessionLocal, async_engine
+    from app.core.search import product_search
+    from app.crud.aio import product as crud_product
+    from app.models.product import Product
+    from app.models.tag import Tag
+    from app.scripts.generate_data import TAGS
+
+    async with async_engine.connect() as conn:
+        product_search.backend = await conn.run_sync(product_search.detect)
+    bounds = (2000.0, 5000.0, 10000.0)
+    tag_names = sorted({name for names in TAGS.values() for name in names})
+
+    results = {"facets": {}, "tag_page": {}}
+    async with AsyncSessionLocal() as db:
+        for label, filters in FILTERS.items():
+            facets = lambda: crud_product.get_facets(db, price_bounds=bounds, **filters)
+            _, tags, _ = await facets()
+            results["facets"][label] = {**_summary(await timed(facets, args.repeat)), "tags": len(tags)}
+
+        async def ilike_tag_counts():
+            for name in tag_names:
+                await db.execute(select(func.count(Product.id)).where(
+                    Product.is_active == True, Product.tags.ilike(f"%{name}%")
+                ))
+        results["facets"]["everything"]["ilike_tag_counts"] = _summary(await timed(ilike_tag_counts, args.repeat))
+        results["tag_count"] = len((await db.execute(select(Tag.id))).all())
+
+        for label, tag in TAG_PAGES.items():
+            indexed = lambda: crud_product.get_products(db, limit=args.limit, tag=tag)
+            ilike = lambda: db.execute(
+                select(Product).where(Product.is_active == True, Product.tags.ilike(f"%{tag}%"))
+                .order_by(Product.id).limit(args.limit)
+            )
+            results["tag_page"][label] = {
+                "tag": tag,
+                "product_tags": _summary(await timed(indexed, args.repeat)),
+                "ilike": _summary(await timed(ilike, args.repeat)),
+            }
+    await async_engine.dispose()
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--products", type=int, default=100_000)
+    parser.add_argument("--limit", type=int, default=20, help="page size")
+    parser.add_argument("--repeat", type=int, default=20, help="timed runs per measurement")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--database-url", help="empty database to use instead of a temporary SQLite file")
+    parser.add_argument("--output", help="also write the JSON report to this file")
+    args = parser.parse_args()
+
+    database_url = args.database_url or f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='bench-'), 'bench.db')}"
+    os.environ.update({**BASE_ENV, "DATABASE_URL": database_url, "SQL_INSTRUMENTATION_ENABLED": "false"})
+    sys.path.insert(0, BACKEND_DIR)
+    from benchmarks import dataset
+
+    scale = dataset.seed(database_url, args.products, users=1, orders=0, seed=args.seed)
+    report = {
+        "meta": {
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "cpus": os.cpu_count(),
+            "dataset": scale,
+            "limit": args.limit,
+            "repeat": args.repeat,
+        },
+        "results": asyncio.run(run(args)),
+    }
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""
+Latency of ordinary traffic while a login storm is hitting the same worker.
+
+Seeds a small dataset, boots one uvicorn worker, then measures GET /api/products/
+twice: alone, and while --storm clients call /api/auth/signin in a closed loop.
+Sign-in latency, throughput and status codes (503 = shed by the bcrypt queue)
+are reported for the storm phase.
+Run with: python -m benchmarks.login_storm --concurrency 8 --storm 32 --duration 10
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+
+import httpx
+
+from benchmarks.endpoints import BACKEND_DIR, BASE_ENV, Server, drive, free_port, git_commit
+
+
+async def run_phases(base_url: str, args, dataset_module) -> dict:
+    rng = random.Random(args.seed)
+    limits = httpx.Limits(max_connections=(args.concurrency + args.storm) * 2)
+
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=120) as client:
+        async def products(index, client):
+            skip = rng.randrange(0, max(args.products - 20, 1))
+            return await client.get("/api/products/", params={"skip": skip, "limit": 20})
+
+        async def signin(index, client):
+            email = dataset_module.user_email(rng.randint(1, args.users))
+            return await client.post(
+                "/api/auth/signin", data={"username": email, "password": dataset_module.BENCH_PASSWORD}
+            )
+
+        await drive(args.concurrency, args.warmup, products, client)
+        baseline = await drive(args.concurrency, args.duration, products, client)
+
+        # Both loops run for the same wall-clock window
+        during_storm, storm = await asyncio.gather(
+            drive(args.concurrency, args.duration, products, client),
+            drive(args.storm, args.duration, signin, client),
+        )
+        metrics = (await client.get(
+            "/metrics", headers={"Authorization": f"Bearer {BASE_ENV['METRICS_TOKEN']}"}
+        )).text
+
+    hasher = {
+        line.split(" ")[0]: float(line.split(" ")[1])
+        for line in metrics.splitlines()
+        if line.startswith(("password_hash_rejected_total", "password_hash_wait_seconds_sum",
+                            "password_hash_wait_seconds_count"))
+    }
+    return {"products_baseline": baseline, "products_during_storm": during_storm, "signin_storm": storm, "hasher": hasher}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--products", type=int, default=2000)
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--concurrency", type=int, default=8, help="clients fetching products")
+    parser.add_argument("--storm", type=int, default=32, help="clients signing in")
+    parser.add_argument("--duration", type=float, default=10.0, help="measured seconds per phase")
+    parser.add_argument("--warmup", type=float, default=2.0)
+    parser.add_argument("--hash-workers", type=int, help="override PASSWORD_HASH_WORKERS")
+    parser.add_argument("--hash-queue", type=int, help="override PASSWORD_HASH_MAX_QUEUE")
+    parser.add_argument("--throttle", action="store_true",
+                        help="keep login throttling on (all storm clients share one IP, so most get 429)")
+    parser.add_argument("--output", help="also write the JSON report to this file")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="bench-")
+    database_url = f"sqlite:///{os.path.join(workdir, 'bench.db')}"
+    env = {**os.environ, **BASE_ENV, "DATABASE_URL": database_url}
+    env["LOGIN_THROTTLE_ENABLED"] = "true" if args.throttle else "false"
+    if args.hash_workers is not None:
+        env["PASSWORD_HASH_WORKERS"] = str(args.hash_workers)
+    if args.hash_queue is not None:
+        env["PASSWORD_HASH_MAX_QUEUE"] = str(args.hash_queue)
+    os.environ.update(env)
+    sys.path.insert(0, BACKEND_DIR)
+    from benchmarks import dataset
+
+    scale = dataset.seed(database_url, args.products, args.users, orders=0, seed=args.seed)
+
+    server = Server(env, free_port(), workers=1)
+    try:
+        server.wait_ready()
+        results = asyncio.run(run_phases(server.base_url, args, dataset))
+    finally:
+        server.stop()
+
+    report = {
+        "meta": {
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "cpus": os.cpu_count(),
+            "dataset": scale,
+            "concurrency": args.concurrency,
+            "storm": args.storm,
+            "duration_seconds": args.duration,
+            "hash_workers": env.get("PASSWORD_HASH_WORKERS", "default"),
+            "hash_queue": env.get("PASSWORD_HASH_MAX_QUEUE", "default"),
+            "login_throttle": args.throttle,
+        },
+        "results": results,
+    }
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""
+Per-request overhead of the metrics middlewares, measured in-process.
+Requests are driven straight through the ASGI app (no sockets) against a tiny
+FastAPI app so the middleware cost is not hidden by network or DB time.
+Run with: python -m benchmarks.middleware --requests 20000 [--output middleware.json]
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+from fastapi import FastAPI
+from app.core.instrumentation import SQLInstrumentationMiddleware
+from app.core.monitoring import PrometheusMiddleware
+
+PATHS = ["/items", "/items/1", "/items/2", "/items/3/reviews", "/missing"]
+
+
+def build_app(prometheus: bool, sql: bool) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/items")
+    async def list_items():
+        return []
+
+    @app.get("/items/{item_id}")
+    async def get_item(item_id: int):
+        return {"id": item_id}
+
+    @app.get("/items/{item_id}/reviews")
+    async def get_reviews(item_id: int):
+        return []
+
+    if sql:
+        app.add_middleware(SQLInstrumentationMiddleware)
+    if prometheus:
+        app.add_middleware(PrometheusMiddleware, routes=app.router.routes)
+    return app
+
+
+def make_scope(path: str) -> dict:
+    return {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "root_path": "",
+        "query_string": b"",
+        "headers": [(b"host", b"bench")],
+        "client": ("127.0.0.1", 1),
+        "server": ("bench", 80),
+    }
+
+
+async def receive():
+    return {"type": "http.request", "body": b"", "more_body": False}
+
+
+async def send(message):
+    pass
+
+
+async def time_requests(app, count: int) -> float:
+    """Seconds per request, averaged over `count` requests"""
+    scopes = [make_scope(PATHS[i % len(PATHS)]) for i in range(count)]
+    start = time.perf_counter()
+    for scope in scopes:
+        await app(scope, receive, send)
+    return (time.perf_counter() - start) / count
+
+
+async def run(count: int, rounds: int) -> dict:
+    variants = {
+        "baseline": build_app(prometheus=False, sql=False),
+        "prometheus": build_app(prometheus=True, sql=False),
+        "sql_instrumentation": build_app(prometheus=False, sql=True),
+        "both": build_app(prometheus=True, sql=True),
+    }
+
+    # Middleware stacks are built on the first request, so warm each app up
+    for app in variants.values():
+        await time_requests(app, 200)
+
+    samples = {name: [] for name in variants}
+    for _ in range(rounds):
+        # Interleave variants so drift (CPU frequency, GC) hits them equally
+        for name, app in variants.items():
+            samples[name].append(await time_requests(app, count))
+
+    baseline = statistics.median(samples["baseline"])
+    baseline_min = min(samples["baseline"])
+    report = {"requests_per_round": count, "rounds": rounds, "variants": {}}
+    for name, values in samples.items():
+        median = statistics.median(values)
+        report["variants"][name] = {
+            "median_us": round(median * 1e6, 2),
+            "min_us": round(min(values) * 1e6, 2),
+            "overhead_us": round((median - baseline) * 1e6, 2),
+            "overhead_pct": round((median - baseline) / baseline * 100, 1),
+            # Best-of-rounds is less sensitive to noisy neighbours than the median
+            "min_overhead_us": round((min(values) - baseline_min) * 1e6, 2),
+        }
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=20000, help="requests per round")
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--output", help="also write the JSON report to this file")
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args.requests, args.rounds))
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""
+Deep-page latency: OFFSET against keyset cursors.
+
+Seeds a throwaway SQLite database (or an empty Postgres one via --database-url)
+with enough products and orders for --deep-page pages, then times the product
+listing and the admin order grid at page 1 and at the deep page, in offset mode
+(skip) and cursor mode. The cursor for the deep page is built outside the timing
+from the row just before it, exactly as a client walking the pages would hold it.
+Run with: python -m benchmarks.pagination --page-size 20 --deep-page 10000
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+
+from benchmarks.endpoints import BACKEND_DIR, BASE_ENV, git_commit
+
+
+def _summary(timings: list) -> dict:
+    return {"p50_ms": round(statistics.median(timings) * 1000, 2), "max_ms": round(max(timings) * 1000, 2)}
+
+
+def cursor_at(db_query, keyset, position: int):
+    """Cursor that resumes after the row at `position` (None for the first page)"""
+    if position < 0:
+        return None
+    row = keyset.order(db_query).offset(position).limit(1).all()
+    return keyset.next_cursor(row, 1)
+
+
+async def time_async(call, repeat: int) -> list:
+    await call()
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        await call()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def time_sync(call, repeat: int) -> list:
+    call()
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        call()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+async def run(args) -> dict:
+    from app.core.database import AsyncSessionLocal, SessionLocal, async_engine
+    from app.crud import admin as crud_admin
+    from app.crud.aio import product as crud_product
+    from app.models.order import Order
+    from app.models.product import Product
+
+    size = args.page_size
+    pages = {"page_1": 1, f"page_{args.deep_page}": args.deep_page}
+    results = {"products": {}, "admin_orders": {}}
+
+    with SessionLocal() as db:
+        product_query = db.query(Product).filter(Product.is_active == True)
+        order_query = db.query(Order)
+        cursors = {
+            label: (
+                cursor_at(product_query, crud_product.product_keyset, (page - 1) * size - 1),
+                cursor_at(order_query, crud_admin.order_keyset, (page - 1) * size - 1),
+            )
+            for label, page in pages.items()
+        }
+
+        for label, page in pages.items():
+            skip = (page - 1) * size
+            product_cursor, order_cursor = cursors[label]
+            async with AsyncSessionLocal() as adb:
+                offset = await time_async(lambda: crud_product.get_products(adb, skip=skip, limit=size), args.repeat)
+                keyset = await time_async(
+                    lambda: crud_product.get_products(adb, limit=size, cursor=product_cursor), args.repeat
+                )
+                same = [p.id for p in await crud_product.get_products(adb, skip=skip, limit=size)] == [
+                    p.id for p in await crud_product.get_products(adb, limit=size, cursor=product_cursor)
+                ]
+            results["products"][label] = {"offset": _summary(offset), "cursor": _summary(keyset), "same_rows": same}
+
+            offset = time_sync(lambda: crud_admin.get_all_orders(db, skip=skip, limit=size), args.repeat)
+            keyset = time_sync(lambda: crud_admin.get_all_orders(db, limit=size, cursor=order_cursor), args.repeat)
+            same = [o.id for o in crud_admin.get_all_orders(db, skip=skip, limit=size)] == [
+                o.id for o in crud_admin.get_all_orders(db, limit=size, cursor=order_cursor)
+            ]
+            results["admin_orders"][label] = {"offset": _summary(offset), "cursor": _summary(keyset), "same_rows": same}
+    await async_engine.dispose()
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--page-size", type=int, default=20)
+    parser.add_argument("--deep-page", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=20, help="timed runs per page and mode")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--database-url", help="empty database to use instead of a temporary SQLite file")
+    parser.add_argument("--output", help="also write the JSON report to this file")
+    args = parser.parse_args()
+
+    database_url = args.database_url or f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='bench-'), 'bench.db')}"
+    os.environ.update({**BASE_ENV, "DATABASE_URL": database_url, "SQL_INSTRUMENTATION_ENABLED": "false"})
+    sys.path.insert(0, BACKEND_DIR)
+    from benchmarks import dataset
+
+    rows = args.page_size * args.deep_page
+    # The generator lands close to, not exactly on, the requested order count
+    scale = dataset.seed(database_url, rows, users=200, orders=int(rows * 1.01), seed=args.seed)
+    report = {
+        "meta": {
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "cpus": os.cpu_count(),
+            "dataset": scale,
+            "page_size": args.page_size,
+            "repeat": args.repeat,
+        },
+        "results": asyncio.run(run(args)),
+    }
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+
+
+if __name__ == "__main__":
+    main()
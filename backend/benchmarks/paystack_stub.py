@@ -0,0 +1,82 @@
+"""
+Minimal stand-in for the Paystack API so checkout can be benchmarked offline.
+Every transaction verifies as successful after an optional fixed delay.
+Run standalone with: python -m benchmarks.paystack_stub --port 8765 --latency-ms 50
+"""
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def make_handler(latency_seconds: float):
+    class PaystackHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            if not self.path.startswith("/transaction/verify/"):
+                self._reply(404, {"status": False, "message": "Not found"})
+                return
+
+            if latency_seconds:
+                time.sleep(latency_seconds)
+            reference = self.path.rsplit("/", 1)[-1]
+            self._reply(200, {
+                "status": True,
+                "message": "Verification successful",
+                "data": {"status": "success", "reference": reference},
+            })
+
+        def _reply(self, status_code: int, payload: dict):
+            body = json.dumps(payload).encode()
+            self.send_response(status_code)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return PaystackHandler
+
+
+class PaystackStub:
+    """Threaded stub server; use as a context manager"""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, latency_ms: float = 0.0):
+        self.server = ThreadingHTTPServer((host, port), make_handler(latency_ms / 1000))
+        self.server.daemon_threads = True
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    args = parser.parse_args()
+
+    with PaystackStub(port=args.port, latency_ms=args.latency_ms) as stub:
+        print(f"Paystack stub listening on {stub.base_url}")
+        try:
+            threading.Event().wait()
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == "__main__":
+    main()
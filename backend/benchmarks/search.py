@@ -0,0 +1,98 @@
+"""
+Product search latency: the full-text index against the old ILIKE '%term%' scan.
+
+Seeds --products generated products into a throwaway SQLite database (or an
+empty Postgres one via --database-url), then times crud.get_products with each
+query below on both backends, same session and page size. Common words are
+where LIKE looks best (it stops at the first page of hits, unranked); rare and
+missing words make it scan the whole table.
+Run with: python -m benchmarks.search --products 100000 --repeat 20
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+
+from benchmarks.endpoints import BACKEND_DIR, BASE_ENV, git_commit
+
+QUERIES = {
+    "common word": "spicy",
+    "dish name": "lasagna",
+    "prefix": "tira",
+    "two words": "smoky suya",
+    "rare pair": "jumbo tiramisu",
+    "no match": "shawarma",
+}
+
+
+async def run(args) -> dict:
+    from app.core.database import AsyncSessionLocal, async_engine
+    from app.core.search import product_search
+    from app.crud.aio import product as crud_product
+
+    async with async_engine.connect() as conn:
+        indexed_backend = await conn.run_sync(product_search.detect)
+
+    results = {}
+    async with AsyncSessionLocal() as db:
+        for label, query in QUERIES.items():
+            results[label] = {"query": query}
+            for backend in (indexed_backend, "like"):
+                product_search.backend = backend
+                products = await crud_product.get_products(db, limit=args.limit, search=query)
+                timings = []
+                for _ in range(args.repeat):
+                    start = time.perf_counter()
+                    await crud_product.get_products(db, limit=args.limit, search=query)
+                    timings.append(time.perf_counter() - start)
+                results[label]["fulltext" if backend != "like" else "like"] = {
+                    "p50_ms": round(statistics.median(timings) * 1000, 2),
+                    "max_ms": round(max(timings) * 1000, 2),
+                    "results": len(products),
+                    "first": products[0].name if products else None,
+                }
+    await async_engine.dispose()
+    return {"backend": indexed_backend, "queries": results}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--products", type=int, default=100_000)
+    parser.add_argument("--limit", type=int, default=20, help="page size")
+    parser.add_argument("--repeat", type=int, default=20, help="timed runs per query and backend")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--database-url", help="empty database to use instead of a temporary SQLite file")
+    parser.add_argument("--output", help="also write the JSON report to this file")
+    args = parser.parse_args()
+
+    database_url = args.database_url or f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='bench-'), 'bench.db')}"
+    os.environ.update({**BASE_ENV, "DATABASE_URL": database_url, "SQL_INSTRUMENTATION_ENABLED": "false"})
+    sys.path.insert(0, BACKEND_DIR)
+    from benchmarks import dataset
+
+    scale = dataset.seed(database_url, args.products, users=1, orders=0, seed=args.seed)
+    report = {
+        "meta": {
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "cpus": os.cpu_count(),
+            "dataset": scale,
+            "limit": args.limit,
+            "repeat": args.repeat,
+        },
+        "results": asyncio.run(run(args)),
+    }
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Startup-time benchmark: import time, lifespan time and time to first request.
+Each run uses a fresh interpreter so nothing is cached between runs.
+Run with: python -m benchmarks.startup --runs 5 [--output startup.json]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PROBE = """
+import json, time
+from fastapi.testclient import TestClient
+t0 = time.perf_counter()
+from app.main import app
+t1 = time.perf_counter()
+with TestClient(app) as client:
+    t2 = time.perf_counter()
+    response = client.get("/health")
+    t3 = time.perf_counter()
+print(json.dumps({
+    "import_seconds": t1 - t0,
+    "lifespan_seconds": t2 - t1,
+    "first_request_seconds": t3 - t2,
+    "status": response.status_code,
+}))
+"""
+
+METRICS = ("process_seconds", "import_seconds", "lifespan_seconds", "first_request_seconds")
+
+
+def run_once() -> dict:
+    start = time.perf_counter()
+    completed = subprocess.run(
+        [sys.executable, "-c", PROBE],
+        cwd=BACKEND_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    elapsed = time.perf_counter() - start
+
+    # The probe prints its JSON last; app logging may precede it
+    result = json.loads(completed.stdout.strip().splitlines()[-1])
+    if result["status"] != 200:
+        raise RuntimeError(f"/health returned {result['status']}")
+    result["process_seconds"] = elapsed
+    return result
+
+
+def summarize(runs: list) -> dict:
+    summary = {}
+    for metric in METRICS:
+        values = [run[metric] for run in runs]
+        summary[metric] = {
+            "median": statistics.median(values),
+            "min": min(values),
+            "max": max(values),
+        }
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--output", help="Also write the JSON report to this file")
+    args = parser.parse_args()
+
+    runs = [run_once() for _ in range(args.runs)]
+    report = {"benchmark": "startup", "runs": args.runs, "summary": summarize(runs), "samples": runs}
+
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text)
+
+
+if __name__ == "__main__":
+    main()
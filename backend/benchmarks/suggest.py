@@ -0,0 +1,119 @@
+"""
+Typeahead latency: the in-memory prefix index against the search query per keystroke.
+
+Seeds --products generated products into a throwaway SQLite database (or an
+empty Postgres one via --database-url), builds the suggestion index, then
+times SuggestIndex.lookup for each query below (the work behind
+/api/products/suggest) next to crud.get_products(search=...) with the same
+limit. Also times a full rebuild and incremental reloads of 1 and 1000
+products, as after a product update and a bulk patch.
+Run with: python -m benchmarks.suggest --products 100000
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+
+from benchmarks.endpoints import BACKEND_DIR, BASE_ENV, git_commit
+
+QUERIES = {
+    "one letter": "s",
+    "two letters": "ch",
+    "word prefix": "lasag",
+    "two words": "spicy ch",
+    "category filter": "gr",
+    "no match": "shawarma",
+}
+
+
+def _summary(timings: list) -> dict:
+    return {"p50_ms": round(statistics.median(timings) * 1000, 4), "max_ms": round(max(timings) * 1000, 4)}
+
+
+async def run(args) -> dict:
+    from app.core.database import AsyncSessionLocal, async_engine
+    from app.core.search import product_search
+    from app.core.suggest import SuggestIndex
+    from app.crud.aio import product as crud_product
+    from app.models.product import ProductCategory
+
+    async with async_engine.connect() as conn:
+        product_search.backend = await conn.run_sync(product_search.detect)
+
+    index = SuggestIndex(max_age=3600)
+    start = time.perf_counter()
+    await index.rebuild()
+    results = {"rebuild_ms": round((time.perf_counter() - start) * 1000, 1), "index": index.stats(), "queries": {}}
+
+    async with AsyncSessionLocal() as db:
+        for label, query in QUERIES.items():
+            category = ProductCategory.MAIN if label == "category filter" else None
+            suggestions = index.lookup(query, args.limit, category)
+            timings = []
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                index.lookup(query, args.limit, category)
+                timings.append(time.perf_counter() - start)
+            search_timings = []
+            for _ in range(min(args.repeat, 50)):
+                start = time.perf_counter()
+                await crud_product.get_products(db, limit=args.limit, search=query, category=category)
+                search_timings.append(time.perf_counter() - start)
+            results["queries"][label] = {
+                "query": query,
+                "index": _summary(timings),
+                "search_endpoint_query": _summary(search_timings),
+                "results": len(suggestions),
+                "first": suggestions[0].name if suggestions else None,
+            }
+
+    ids = sorted(index.products)
+    for label, count in (("reload_1", 1), ("reload_1000", 1000)):
+        start = time.perf_counter()
+        await index.reload(set(ids[:count]))
+        results[f"{label}_ms"] = round((time.perf_counter() - start) * 1000, 2)
+    await async_engine.dispose()
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--products", type=int, default=100_000)
+    parser.add_argument("--limit", type=int, default=8, help="suggestions per query")
+    parser.add_argument("--repeat", type=int, default=1000, help="timed lookups per query")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--database-url", help="empty database to use instead of a temporary SQLite file")
+    parser.add_argument("--output", help="also write the JSON report to this file")
+    args = parser.parse_args()
+
+    database_url = args.database_url or f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='bench-'), 'bench.db')}"
+    os.environ.update({**BASE_ENV, "DATABASE_URL": database_url, "SQL_INSTRUMENTATION_ENABLED": "false"})
+    sys.path.insert(0, BACKEND_DIR)
+    from benchmarks import dataset
+
+    scale = dataset.seed(database_url, args.products, users=1, orders=0, seed=args.seed)
+    report = {
+        "meta": {
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "cpus": os.cpu_count(),
+            "dataset": scale,
+            "limit": args.limit,
+            "repeat": args.repeat,
+        },
+        "results": asyncio.run(run(args)),
+    }
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+
+
+if __name__ == "__main__":
+    main()
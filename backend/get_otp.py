@@ -1,14 +1,17 @@
-from app.core.database import SessionLocal
-from app.models.user import User
+import asyncio
 import sys
+from app.core.config import settings
+from app.core.otp import otp_service
 
 email = sys.argv[1]
-db = SessionLocal()
-user = db.query(User).filter(User.email == email).first()
 
-if user:
-    print(f"OTP for {email}: {user.otp_code}")
-else:
-    print(f"User {email} not found")
+if settings.OTP_STORE_BACKEND == "memory":
+    print("OTP codes are held in the server process (OTP_STORE_BACKEND=memory); check the email log instead")
+    sys.exit(1)
+
+otp_code = asyncio.run(otp_service.peek(email))
 
-db.close()
+if otp_code:
+    print(f"OTP for {email}: {otp_code}")
+else:
+    print(f"No pending OTP for {email}")
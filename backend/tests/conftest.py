@@ -0,0 +1,131 @@
+import os
+import sys
+import tempfile
+
+# Settings are read at import time, so configure them before anything imports app
+DB_PATH = os.path.join(tempfile.mkdtemp(prefix="restaurant-tests-"), "test.db")
+os.environ.update({
+    "DATABASE_URL": f"sqlite:///{DB_PATH}",
+    "SECRET_KEY": "test-secret",
+    "FRONTEND_URL": "http://localhost:3000",
+    "SEED_ADMIN_EMAIL": "admin@example.com",
+    "SEED_ADMIN_PASSWORD": "Admin12345",
+    "SEED_USER_EMAIL": "user@example.com",
+    "SEED_USER_PASSWORD": "User12345",
+    "PAYSTACK_SECRET_KEY": "sk_test",
+    # Every test client signs in from the same address; tests/test_throttle.py covers the limits
+    "LOGIN_THROTTLE_ENABLED": "false",
+})
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import itertools
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+from app.core.catalog import catalog_cache
+from app.core.database import Base, engine
+from app.core.instrumentation import capture_queries
+from app.core.principals import principal_cache
+from app.core.security import create_access_token, get_password_hash, token_cache, token_claims
+from app.main import app
+from app.models.product import Product, ProductCategory
+from app.models.user import User, UserRole
+from app import models  # noqa: F401  (registers every table on Base.metadata)
+
+PASSWORD = "Secret123"
+_PASSWORD_HASH = get_password_hash(PASSWORD)
+_sequence = itertools.count(1)
+
+
+@pytest.fixture(scope="session")
+def schema():
+    """One database file for the whole run; tests empty it after themselves"""
+    Base.metadata.create_all(engine)
+    yield
+    engine.dispose()
+    os.remove(DB_PATH)
+
+
+@pytest.fixture
+def db(schema):
+    """A session on an empty database; every table and per-worker cache is cleared afterwards"""
+    session = Session(engine)
+    try:
+        yield session
+    finally:
+        session.close()
+        with engine.begin() as connection:
+            for table in reversed(Base.metadata.sorted_tables):
+                connection.execute(table.delete())
+        catalog_cache.clear()
+        principal_cache.clear()
+        token_cache.clear()
+
+
+@pytest.fixture(scope="session")
+def app_client(schema):
+    # One client (and event loop) for the run, so background tasks outlive single tests
+    with TestClient(app) as client:
+        yield client
+
+
+@pytest.fixture
+def client(app_client, db):
+    return app_client
+
+
+@pytest.fixture
+def make_user(db):
+    """Create a user; emails are unique across the run so per-worker caches never mix tests up"""
+    def make(role: UserRole = UserRole.USER, **fields) -> User:
+        user = User(**{
+            "email": f"user{next(_sequence)}@example.com",
+            "hashed_password": _PASSWORD_HASH,
+            "first_name": "Test",
+            "last_name": "User",
+            "role": role,
+            "is_active": True,
+            "is_email_verified": True,
+            **fields,
+        })
+        db.add(user)
+        db.commit()
+        db.refresh(user)
+        return user
+    return make
+
+
+@pytest.fixture
+def make_product(db):
+    def make(**fields) -> Product:
+        n = next(_sequence)
+        product = Product(**{
+            "sku": f"SKU-{n}",
+            "name": f"Product {n}",
+            "price": 1000.0,
+            "category": ProductCategory.MAIN,
+            "stock_quantity": 10,
+            **fields,
+        })
+        db.add(product)
+        db.commit()
+        db.refresh(product)
+        return product
+    return make
+
+
+def auth_headers(user: User) -> dict:
+    """Bearer header with the claims a sign-in would issue"""
+    return {"Authorization": f"Bearer {create_access_token(token_claims(user))}"}
+
+
+def measured(client: TestClient, method: str, path: str, **kwargs):
+    """(response, QueryStats) for one request served on the app's own event loop"""
+    async def call():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://testserver") as in_process:
+            with capture_queries() as stats:
+                response = await in_process.request(method, path, **kwargs)
+        return response, stats
+    return client.portal.call(call)
@@ -0,0 +1,64 @@
+import pytest
+from app.models.product import Product, ProductCategory
+from app.models.user import UserRole
+from tests.conftest import auth_headers
+
+
+@pytest.fixture
+def admin(make_user):
+    return auth_headers(make_user(role=UserRole.ADMIN))
+
+
+def patch(client, headers, **body):
+    return client.patch("/api/products/", json=body, headers=headers)
+
+
+def test_set_fields_on_listed_ids(client, db, admin, make_product):
+    first, second, untouched = make_product(), make_product(), make_product()
+    response = patch(client, admin, ids=[first.id, second.id], set={"is_offer": True, "discount_percentage": 15})
+    assert response.status_code == 200
+    assert sorted(product["id"] for product in response.json()) == [first.id, second.id]
+
+    db.expire_all()
+    assert [(product.is_offer, product.discount_percentage) for product in (first, second)] == [(True, 15.0)] * 2
+    assert not db.get(Product, untouched.id).is_offer
+
+
+def test_stock_delta_stops_at_zero_within_a_category(client, db, admin, make_product):
+    low = make_product(category=ProductCategory.MAIN, stock_quantity=2)
+    high = make_product(category=ProductCategory.MAIN, stock_quantity=10)
+    drink = make_product(category=ProductCategory.BEVERAGES, stock_quantity=10)
+
+    assert patch(client, admin, category="main", stock_delta=-5).status_code == 200
+    db.expire_all()
+    assert (low.stock_quantity, high.stock_quantity, drink.stock_quantity) == (0, 5, 10)
+
+
+def test_price_change_percent_rounds_to_two_places(client, admin, make_product):
+    product = make_product(price=999.99)
+    response = patch(client, admin, ids=[product.id], price_change_percent=-10)
+    assert response.json()[0]["price"] == 899.99
+
+
+def test_patched_products_leave_cached_listings(client, admin, make_product):
+    product = make_product()
+    assert len(client.get("/api/products/").json()) == 1
+
+    patch(client, admin, ids=[product.id], set={"is_active": False})
+    assert client.get("/api/products/").json() == []
+
+
+@pytest.mark.parametrize("body", [
+    {"set": {"is_offer": True}},
+    {"ids": [1]},
+    {"ids": [1], "set": {"stock_quantity": 1}, "stock_delta": 1},
+    {"ids": [1], "set": {"price": 10}, "price_change_percent": 5},
+])
+def test_invalid_patches_are_rejected(client, admin, body):
+    assert patch(client, admin, **body).status_code == 422
+
+
+def test_bulk_patch_is_admin_only(client, make_user, make_product):
+    product = make_product()
+    response = patch(client, auth_headers(make_user()), ids=[product.id], set={"is_offer": True})
+    assert response.status_code == 403
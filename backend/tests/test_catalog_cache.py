@@ -0,0 +1,66 @@
+import asyncio
+from app.core.catalog import CatalogCache, CatalogView
+from app.models.user import UserRole
+from tests.conftest import auth_headers, measured
+
+
+def names(response) -> list:
+    return [product["name"] for product in response.json()]
+
+
+def test_repeat_listing_is_served_without_queries(client, make_product):
+    make_product(name="Jollof Rice")
+    first, cold = measured(client, "GET", "/api/products/")
+    second, warm = measured(client, "GET", "/api/products/")
+
+    assert cold.count > 0 and warm.count == 0
+    assert second.content == first.content
+
+
+def test_update_invalidates_detail_and_listings(client, make_user, make_product):
+    admin = make_user(role=UserRole.ADMIN)
+    product = make_product(name="Jollof Rice")
+    assert names(client.get("/api/products/")) == ["Jollof Rice"]
+    assert client.get(f"/api/products/{product.id}").json()["name"] == "Jollof Rice"
+
+    response = client.put(f"/api/products/{product.id}", json={"name": "Party Jollof"}, headers=auth_headers(admin))
+    assert response.status_code == 200
+
+    assert names(client.get("/api/products/")) == ["Party Jollof"]
+    assert client.get(f"/api/products/{product.id}").json()["name"] == "Party Jollof"
+
+
+def test_product_joining_a_section_invalidates_it(client, make_user, make_product):
+    admin = make_user(role=UserRole.ADMIN)
+    product = make_product(name="Suya")
+    assert client.get("/api/products/popular").json() == []
+
+    client.put(f"/api/products/{product.id}", json={"is_popular": True}, headers=auth_headers(admin))
+    assert names(client.get("/api/products/popular")) == ["Suya"]
+
+    client.delete(f"/api/products/{product.id}", headers=auth_headers(admin))
+    assert client.get("/api/products/popular").json() == []
+
+
+def test_stock_change_keeps_unrelated_listings(db, make_product):
+    cache = CatalogCache(maxsize=100, ttl=60)
+    stocked, other = make_product(), make_product()
+    loads = []
+
+    async def load(product):
+        loads.append(product.id)
+        return [product]
+
+    async def read(view, product):
+        return await cache.listing(view, lambda: load(product))
+
+    first, second = CatalogView("all", 1, skip=0), CatalogView("all", 1, skip=1)
+    asyncio.run(read(first, stocked))
+    asyncio.run(read(second, other))
+
+    cache.stock_changed([stocked.id])
+    asyncio.run(read(first, stocked))
+    asyncio.run(read(second, other))
+
+    # Only the listing containing the product was reloaded
+    assert loads == [stocked.id, other.id, stocked.id]
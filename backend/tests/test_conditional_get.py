@@ -0,0 +1,48 @@
+import pytest
+from app.core.catalog import etag_matches
+from app.models.user import UserRole
+from tests.conftest import auth_headers, measured
+
+LISTINGS = ["/api/products/", "/api/products/popular", "/api/products/special", "/api/products/offers"]
+
+
+@pytest.mark.parametrize("path", LISTINGS)
+def test_matching_etag_gets_304_without_queries(client, make_product, path):
+    make_product(is_popular=True, is_special=True, is_offer=True)
+    response = client.get(path)
+    etag = response.headers["ETag"]
+    assert "must-revalidate" in response.headers["Cache-Control"]
+
+    revalidated, stats = measured(client, "GET", path, headers={"If-None-Match": etag})
+    assert revalidated.status_code == 304
+    assert revalidated.content == b""
+    assert revalidated.headers["ETag"] == etag
+    assert stats.count == 0
+
+
+def test_product_change_gives_a_new_etag(client, make_user, make_product):
+    admin = make_user(role=UserRole.ADMIN)
+    product = make_product()
+    etag = client.get(f"/api/products/{product.id}").headers["ETag"]
+
+    client.put(f"/api/products/{product.id}", json={"price": 1500.0}, headers=auth_headers(admin))
+
+    response = client.get(f"/api/products/{product.id}", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+    assert response.json()["price"] == 1500.0
+
+
+def test_stale_etag_gets_the_full_body(client, make_product):
+    make_product()
+    response = client.get("/api/products/", headers={"If-None-Match": '"stale"'})
+    assert response.status_code == 200
+    assert len(response.json()) == 1
+
+
+def test_if_none_match_uses_weak_comparison():
+    assert etag_matches('W/"abc"', '"abc"')
+    assert etag_matches('"x", "abc"', '"abc"')
+    assert etag_matches("*", '"abc"')
+    assert not etag_matches('"abcd"', '"abc"')
+    assert not etag_matches(None, '"abc"')
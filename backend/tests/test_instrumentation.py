@@ -0,0 +1,69 @@
+import logging
+from types import SimpleNamespace
+import pytest
+from sqlalchemy import select
+from app.core import instrumentation
+from app.models.product import Product
+
+
+class FakePostgresCursor:
+    """Mimics a Postgres transaction: after an error only ROLLBACK TO SAVEPOINT is accepted"""
+
+    def __init__(self, log: list, state: dict):
+        self.log = log
+        self.state = state
+
+    def execute(self, statement, parameters=None):
+        self.log.append(statement)
+        if self.state["aborted"] and not statement.startswith("ROLLBACK"):
+            raise RuntimeError("current transaction is aborted, commands ignored until end of transaction block")
+        if statement.startswith("ROLLBACK TO SAVEPOINT"):
+            self.state["aborted"] = False
+        elif statement.startswith("EXPLAIN"):
+            self.state["aborted"] = True
+            raise RuntimeError("could not determine data type of parameter $1")
+
+    def fetchall(self):
+        return []
+
+    def close(self):
+        pass
+
+
+def test_failed_explain_on_postgres_leaves_the_transaction_usable():
+    log, state = [], {"aborted": False}
+    dbapi_connection = SimpleNamespace(cursor=lambda: FakePostgresCursor(log, state))
+    conn = SimpleNamespace(
+        dialect=SimpleNamespace(name="postgresql"),
+        connection=SimpleNamespace(dbapi_connection=dbapi_connection),
+    )
+
+    with pytest.raises(RuntimeError):
+        instrumentation.explain(conn, "SELECT * FROM products WHERE id = %(id)s", {"id": 1})
+
+    assert log == [
+        "SAVEPOINT slow_query_explain",
+        "EXPLAIN (ANALYZE off) SELECT * FROM products WHERE id = %(id)s",
+        "ROLLBACK TO SAVEPOINT slow_query_explain",
+        "RELEASE SAVEPOINT slow_query_explain",
+    ]
+    # The request's next statement still runs
+    dbapi_connection.cursor().execute("SELECT 1")
+    assert not state["aborted"]
+
+
+def test_request_completes_when_explain_fails(db, monkeypatch, caplog):
+    slow_log = instrumentation.SlowQueryLog()
+    slow_log.threshold, slow_log.sample_rate, slow_log.max_per_minute, slow_log.explain = 0, 1.0, 1000, True
+    monkeypatch.setattr(instrumentation, "_slow_query_log", slow_log)
+    instrumentation.install_sql_hooks()
+    real_explain = instrumentation.explain
+    # Bind the wrong number of parameters, as a parameter style mismatch would
+    monkeypatch.setattr(instrumentation, "explain", lambda conn, statement, parameters: real_explain(conn, statement, ()))
+
+    with caplog.at_level(logging.WARNING, logger=instrumentation.__name__):
+        db.add(Product(sku="P-1", name="Jollof Rice", price=2500, category="main"))
+        db.commit()
+        assert db.execute(select(Product.name).where(Product.sku == "P-1")).scalar_one() == "Jollof Rice"
+
+    assert any("EXPLAIN failed" in record.getMessage() for record in caplog.records)
@@ -0,0 +1,49 @@
+from types import SimpleNamespace
+import pytest
+from fastapi.testclient import TestClient
+from app.core.config import settings
+from app.core.security import create_access_token, token_claims
+from app.main import create_app
+from app.models.user import UserRole
+
+OPERATIONAL = ["/metrics", "/metrics/sql", "/health/pool"]
+
+
+def _token(role: UserRole) -> str:
+    user = SimpleNamespace(id=1, email=f"{role.value}@example.com", role=role, token_generation=0)
+    return create_access_token(token_claims(user))
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(settings, "METRICS_TOKEN", "scrape-secret")
+    monkeypatch.setattr(settings, "TRUST_TOKEN_CLAIMS", True)
+    # No lifespan: these endpoints need no schema or warm caches
+    return TestClient(create_app())
+
+
+@pytest.mark.parametrize("path", OPERATIONAL)
+def test_operational_endpoints_need_credentials(client, path):
+    assert client.get(path).status_code == 401
+    assert client.get(path, headers={"Authorization": "Bearer wrong"}).status_code == 401
+    assert client.get(path, headers={"Authorization": f"Bearer {_token(UserRole.USER)}"}).status_code == 403
+
+
+@pytest.mark.parametrize("path", OPERATIONAL)
+def test_operational_endpoints_accept_the_metrics_token_or_an_admin(client, path):
+    assert client.get(path, headers={"Authorization": "Bearer scrape-secret"}).status_code == 200
+    assert client.get(path, headers={"Authorization": f"Bearer {_token(UserRole.ADMIN)}"}).status_code == 200
+
+
+def test_sql_stats_are_not_served_without_instrumentation(monkeypatch):
+    monkeypatch.setattr(settings, "METRICS_TOKEN", "scrape-secret")
+    monkeypatch.setattr(settings, "SQL_INSTRUMENTATION_ENABLED", False)
+    client = TestClient(create_app())
+    assert client.get("/metrics/sql", headers={"Authorization": "Bearer scrape-secret"}).status_code == 404
+    assert client.get("/health").status_code == 200
+
+
+def test_outbound_call_latencies_are_exposed(client):
+    body = client.get("/metrics", headers={"Authorization": "Bearer scrape-secret"}).text
+    assert "# TYPE email_send_duration_seconds histogram" in body
+    assert "# TYPE paystack_request_duration_seconds histogram" in body
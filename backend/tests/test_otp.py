@@ -0,0 +1,66 @@
+import asyncio
+from datetime import timedelta
+import pytest
+from app.core.config import settings
+from app.core.otp import DatabaseOTPStore, OTPResult
+from app.models.otp import OTPCode
+
+EMAIL = "otp@example.com"
+TTL = timedelta(minutes=5)
+
+
+@pytest.fixture
+def store(client):
+    # The app's own event loop, which the async engine's connections belong to
+    store = DatabaseOTPStore(batch_size=2)
+    return store, client.portal.call
+
+
+def test_expired_code_is_rejected_and_discarded(store, db):
+    store, run = store
+    run(store.issue, EMAIL, "123456", timedelta(seconds=-1))
+
+    assert run(store.verify, EMAIL, "123456") == OTPResult.EXPIRED
+    assert run(store.verify, EMAIL, "123456") == OTPResult.MISSING
+    assert db.get(OTPCode, EMAIL) is None
+
+
+def test_reissue_replaces_the_code_and_resets_attempts(store):
+    store, run = store
+    run(store.issue, EMAIL, "111111", TTL)
+    for _ in range(settings.OTP_MAX_ATTEMPTS - 1):
+        assert run(store.verify, EMAIL, "000000") == OTPResult.INVALID
+
+    run(store.issue, EMAIL, "222222", TTL)
+    assert run(store.verify, EMAIL, "111111") == OTPResult.INVALID
+    assert run(store.verify, EMAIL, "222222") == OTPResult.VALID
+
+
+def test_concurrent_issues_for_one_address_leave_one_code(store, db):
+    store, run = store
+
+    async def issue_many():
+        await asyncio.gather(*(store.issue(EMAIL, f"{n:06d}", TTL) for n in range(5)))
+
+    run(issue_many)
+    assert db.query(OTPCode).filter(OTPCode.email == EMAIL).count() == 1
+
+
+def test_too_many_wrong_codes_lock_the_code(store):
+    store, run = store
+    run(store.issue, EMAIL, "123456", TTL)
+    for _ in range(settings.OTP_MAX_ATTEMPTS - 1):
+        assert run(store.verify, EMAIL, "000000") == OTPResult.INVALID
+
+    assert run(store.verify, EMAIL, "000000") == OTPResult.LOCKED
+    assert run(store.verify, EMAIL, "123456") == OTPResult.MISSING
+
+
+def test_sweep_removes_only_expired_codes(store, db):
+    store, run = store
+    for n in range(3):
+        run(store.issue, f"expired{n}@example.com", "123456", timedelta(seconds=-1))
+    run(store.issue, EMAIL, "123456", TTL)
+
+    assert run(store.sweep) == 3
+    assert [entry.email for entry in db.query(OTPCode)] == [EMAIL]
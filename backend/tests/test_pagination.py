@@ -0,0 +1,66 @@
+from datetime import datetime, timedelta
+from app.core.pagination import NEXT_CURSOR_HEADER, encode_cursor
+from app.models.order import Order, PaymentMethod
+from app.models.user import UserRole
+from tests.conftest import auth_headers
+
+ADDRESS = {"street": "1 Test Way", "city": "Lagos", "state": "Lagos", "zip_code": "100001"}
+
+
+def walk_products(client, limit: int, between_pages=None) -> list:
+    ids, params = [], {"limit": limit}
+    while True:
+        response = client.get("/api/products/", params=params)
+        assert response.status_code == 200
+        ids.extend(product["id"] for product in response.json())
+        cursor = response.headers.get(NEXT_CURSOR_HEADER)
+        if cursor is None:
+            return ids
+        if between_pages:
+            between_pages()
+            between_pages = None
+        params = {"limit": limit, "cursor": cursor}
+
+
+def test_product_cursor_walks_every_product_once(client, make_product):
+    products = [make_product() for _ in range(5)]
+    assert walk_products(client, limit=2) == [product.id for product in products]
+
+
+def test_product_inserted_mid_walk_is_neither_skipped_nor_repeated(client, make_product):
+    products = [make_product() for _ in range(4)]
+    added = []
+    ids = walk_products(client, limit=2, between_pages=lambda: added.append(make_product()))
+    assert ids == [product.id for product in products + added]
+
+
+def test_admin_order_cursor_pages_newest_first(client, db, make_user):
+    admin, customer = make_user(role=UserRole.ADMIN), make_user()
+    start = datetime(2026, 1, 1)
+    # Two orders share a timestamp so the id tie-breaker is exercised
+    for offset in (0, 1, 1, 2, 3):
+        db.add(Order(
+            user_id=customer.id,
+            total_amount=1000.0,
+            payment_method=PaymentMethod.BANK_TRANSFER,
+            delivery_address=ADDRESS,
+            created_at=start + timedelta(minutes=offset),
+        ))
+    db.commit()
+    expected = [order.id for order in db.query(Order).order_by(Order.created_at.desc(), Order.id.desc())]
+
+    ids, params = [], {"limit": 2}
+    while True:
+        page = client.get("/api/admin/orders", params=params, headers=auth_headers(admin)).json()
+        ids.extend(order["id"] for order in page["orders"])
+        if page["next_cursor"] is None:
+            break
+        params = {"limit": 2, "cursor": page["next_cursor"]}
+    assert ids == expected
+
+
+def test_malformed_or_foreign_cursors_are_rejected(client, make_product):
+    make_product()
+    foreign = encode_cursor({"l": "admin_orders", "k": ["2026-01-01T00:00:00", 1]})
+    for cursor in ("not-a-cursor", foreign, encode_cursor({"l": "products", "k": "x"})):
+        assert client.get("/api/products/", params={"cursor": cursor}).status_code == 400
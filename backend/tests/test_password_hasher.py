@@ -0,0 +1,49 @@
+import asyncio
+import threading
+import pytest
+from app.core.security import PasswordHasher, PasswordHasherBusy
+
+
+def test_cancelled_queued_call_releases_its_slot():
+    hasher = PasswordHasher(workers=1, max_queue=1)
+    release = threading.Event()
+
+    async def scenario():
+        busy = asyncio.ensure_future(hasher.run(release.wait, 5))
+        queued = asyncio.ensure_future(hasher.run(lambda: "hashed"))
+        await asyncio.sleep(0.05)
+        assert hasher.stats()["queued"] == 1
+        with pytest.raises(PasswordHasherBusy):
+            await hasher.run(lambda: "hashed")
+
+        # The client disconnects while its call waits for the only worker
+        queued.cancel()
+        await asyncio.sleep(0)
+        release.set()
+        await busy
+        assert hasher.stats()["queued"] == 0
+        assert hasher.stats()["running"] == 0
+        # The slot is usable again
+        assert await hasher.run(lambda: "hashed") == "hashed"
+
+    asyncio.run(scenario())
+
+
+def test_cancelling_a_running_call_does_not_double_release():
+    hasher = PasswordHasher(workers=1, max_queue=1)
+    started, release = threading.Event(), threading.Event()
+
+    def slow():
+        started.set()
+        release.wait(5)
+
+    async def scenario():
+        running = asyncio.ensure_future(hasher.run(slow))
+        await asyncio.to_thread(started.wait, 5)
+        running.cancel()
+        release.set()
+        await asyncio.sleep(0.05)
+        assert hasher.stats()["queued"] == 0
+        assert hasher.stats()["running"] == 0
+
+    asyncio.run(scenario())
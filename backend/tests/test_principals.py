@@ -0,0 +1,47 @@
+from app.models.cart import Cart
+from app.models.user import UserRole
+from tests.conftest import auth_headers
+
+
+def test_claims_token_reads_profile(client, make_user):
+    user = make_user()
+    response = client.get("/api/user/me", headers=auth_headers(user))
+    assert response.status_code == 200
+    assert response.json()["email"] == user.email
+
+
+def test_role_change_revokes_tokens_on_reads_and_cart(client, make_user):
+    admin, user = make_user(role=UserRole.ADMIN), make_user()
+    old = auth_headers(user)
+    assert client.get("/api/cart/", headers=old).status_code == 200
+
+    response = client.put(f"/api/admin/users/{user.id}", json={"role": "admin"}, headers=auth_headers(admin))
+    assert response.status_code == 200
+
+    # The cached principal now carries the bumped generation
+    assert client.get("/api/user/me", headers=old).status_code == 401
+    assert client.get("/api/cart/", headers=old).status_code == 401
+
+
+def test_deleted_user_tokens_are_rejected_on_this_worker(client, db, make_user):
+    admin, user = make_user(role=UserRole.ADMIN), make_user()
+    old = auth_headers(user)
+    # Warm the principal cache the way a live session would
+    assert client.get("/api/user/me", headers=old).status_code == 200
+
+    assert client.delete(f"/api/admin/users/{user.id}", headers=auth_headers(admin)).status_code == 200
+
+    assert client.get("/api/user/me", headers=old).status_code == 401
+    assert client.get("/api/cart/", headers=old).status_code == 401
+    assert db.query(Cart).filter(Cart.user_id == user.id).count() == 0
+
+
+def test_new_account_reusing_a_deleted_email_is_not_blocked(client, db, make_user):
+    admin, user = make_user(role=UserRole.ADMIN), make_user()
+    email = user.email
+    client.get("/api/user/me", headers=auth_headers(user))
+    assert client.delete(f"/api/admin/users/{user.id}", headers=auth_headers(admin)).status_code == 200
+
+    replacement = make_user(email=email)
+    assert client.get("/api/cart/", headers=auth_headers(replacement)).status_code == 200
+    assert client.get("/api/user/me", headers=auth_headers(replacement)).status_code == 200
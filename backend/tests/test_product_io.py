@@ -0,0 +1,50 @@
+import io
+from app.core.product_io import import_products
+from app.models.product import Product
+
+FULL = """sku,name,price,category,stock_quantity,is_active,is_popular,rating,tags
+P-1,Jollof Rice,2500,main,40,true,true,4.5,spicy
+P-2,Zobo,800,beverages,12,false,false,3.0,cold
+"""
+
+
+def _product(db, sku: str) -> Product:
+    db.expire_all()
+    return db.query(Product).filter(Product.sku == sku).one()
+
+
+def test_partial_reimport_keeps_columns_the_file_leaves_out(db):
+    report = import_products(db, io.StringIO(FULL), "csv")
+    assert (report.created, report.failed) == (2, 0)
+
+    partial = "sku,name,price,category\nP-1,Jollof Rice,2700,main\nP-2,Zobo,900,beverages\n"
+    report = import_products(db, io.StringIO(partial), "csv")
+    assert (report.created, report.updated, report.failed) == (0, 2, 0)
+
+    jollof = _product(db, "P-1")
+    assert jollof.price == 2700
+    assert (jollof.stock_quantity, jollof.is_active, jollof.is_popular, jollof.rating) == (40, True, True, 4.5)
+    assert jollof.tags == "spicy"
+    zobo = _product(db, "P-2")
+    assert zobo.price == 900
+    assert (zobo.stock_quantity, zobo.is_active) == (12, False)
+
+
+def test_blank_cells_keep_existing_values(db):
+    import_products(db, io.StringIO(FULL), "csv")
+
+    blanks = "sku,name,price,category,stock_quantity,is_active\nP-1,Jollof Rice,2600,main,,\nP-2,Zobo,800,beverages,5,\n"
+    report = import_products(db, io.StringIO(blanks), "csv")
+    assert (report.updated, report.failed) == (2, 0)
+
+    jollof = _product(db, "P-1")
+    assert (jollof.price, jollof.stock_quantity, jollof.is_active) == (2600, 40, True)
+    zobo = _product(db, "P-2")
+    assert (zobo.stock_quantity, zobo.is_active) == (5, False)
+
+
+def test_new_products_get_defaults_for_missing_columns(db):
+    report = import_products(db, io.StringIO("sku,name,price,category\nP-3,Puff Puff,500,bakery\n"), "csv")
+    assert report.created == 1
+    puff = _product(db, "P-3")
+    assert (puff.stock_quantity, puff.is_active, puff.rating) == (0, True, 0.0)
@@ -0,0 +1,65 @@
+import pytest
+from app.api.endpoints import admin, cart, orders
+from app.core.instrumentation import assert_query_budget
+from app.core.principals import principal_cache
+from app.models.order import Order, OrderItem, PaymentMethod
+from app.models.user import UserRole
+from tests.conftest import auth_headers, measured
+
+ADDRESS = {"street": "1 Test Way", "city": "Lagos", "state": "Lagos", "zip_code": "100001"}
+
+
+@pytest.fixture
+def make_orders(db):
+    def make(user, count: int = 3, items: int = 2):
+        for n in range(count):
+            order = Order(
+                user_id=user.id,
+                total_amount=1000.0 * items,
+                payment_method=PaymentMethod.BANK_TRANSFER,
+                delivery_address=ADDRESS,
+            )
+            order.items = [
+                OrderItem(product_id=str(i), product_name=f"Dish {i}", price=1000.0, quantity=1) for i in range(items)
+            ]
+            db.add(order)
+        db.commit()
+    return make
+
+
+def test_my_orders_within_budget(client, make_user, make_orders):
+    user = make_user()
+    make_orders(user, count=5)
+    response, stats = measured(client, "GET", "/api/orders/", headers=auth_headers(user))
+    assert response.status_code == 200 and len(response.json()) == 5
+    assert_query_budget(stats, orders.get_my_orders.__query_budget__)
+
+
+def test_admin_orders_within_budget(client, make_user, make_orders):
+    admin_user = make_user(role=UserRole.ADMIN)
+    for _ in range(3):
+        make_orders(make_user(), count=4)
+    response, stats = measured(client, "GET", "/api/admin/orders", headers=auth_headers(admin_user))
+    assert response.status_code == 200 and response.json()["total"] == 12
+    assert_query_budget(stats, admin.get_all_orders.__query_budget__)
+
+
+def test_first_cart_within_budget(client, make_user):
+    user = make_user()
+    response, stats = measured(client, "GET", "/api/cart/", headers=auth_headers(user))
+    assert response.status_code == 200 and response.json()["items"] == []
+    assert_query_budget(stats, cart.get_cart.__query_budget__)
+
+
+def test_existing_cart_within_budget(client, make_user, make_product):
+    user = make_user()
+    products = [make_product() for _ in range(3)]
+    for product in products:
+        assert client.post(
+            "/api/cart/items", json={"product_id": product.id, "quantity": 1}, headers=auth_headers(user)
+        ).status_code == 200
+    # As for a returning user on a worker that has not seen them yet
+    principal_cache.clear()
+    response, stats = measured(client, "GET", "/api/cart/", headers=auth_headers(user))
+    assert response.status_code == 200 and len(response.json()["items"]) == 3
+    assert_query_budget(stats, cart.get_cart.__query_budget__)
@@ -0,0 +1,147 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
+import pytest
+from app.core import suggest
+from app.core.suggest import SuggestIndex
+from app.models.product import ProductCategory
+
+
+@pytest.fixture
+def run(client):
+    # The app's own event loop, which the async engine's connections belong to
+    return client.portal.call
+
+
+@pytest.fixture
+def database_down(monkeypatch):
+    """Make the index's reads fail; returns the times they were attempted"""
+    attempts = []
+
+    @asynccontextmanager
+    async def unavailable():
+        attempts.append(time.monotonic())
+        raise ConnectionError("database is down")
+        yield
+
+    monkeypatch.setattr(suggest, "async_read_session", unavailable)
+    return attempts
+
+
+def names(suggestions) -> list:
+    return [product.name for product in suggestions]
+
+
+async def wait_for(condition, timeout: float = 2.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        await asyncio.sleep(0.005)
+
+
+def test_ranks_first_word_then_popular_then_shorter_names(run, make_product):
+    make_product(name="Smoky Jollof Rice")
+    make_product(name="Jollof Rice and Chicken")
+    make_product(name="Jollof Rice")
+    make_product(name="Jollof Spaghetti", is_popular=True)
+    make_product(name="Fried Rice", tags="jollof-style")
+    make_product(name="Jollof Pasta", is_active=False)
+    index = SuggestIndex(max_age=3600)
+    run(index.rebuild)
+
+    assert names(index.lookup("jol", 10)) == [
+        "Jollof Spaghetti", "Jollof Rice", "Jollof Rice and Chicken", "Smoky Jollof Rice", "Fried Rice",
+    ]
+    assert names(index.lookup("jollof ch", 8)) == ["Jollof Rice and Chicken"]
+    assert index.stats()["products"] == 5
+
+
+def test_category_filter(run, make_product):
+    make_product(name="Chapman", category=ProductCategory.BEVERAGES)
+    make_product(name="Chicken Suya", category=ProductCategory.MAIN)
+    index = SuggestIndex(max_age=3600)
+
+    assert names(run(index.suggest, "ch", 8, ProductCategory.BEVERAGES)) == ["Chapman"]
+
+
+def test_reload_patches_changed_products(run, db, make_product):
+    renamed, hidden, kept = make_product(name="Jollof Rice"), make_product(name="Jollof Pasta"), make_product(name="Suya")
+    index = SuggestIndex(max_age=3600)
+    run(index.rebuild)
+
+    renamed.name, hidden.is_active = "Fried Rice", False
+    db.commit()
+    run(index.reload, {renamed.id, hidden.id})
+
+    assert index.lookup("jol", 8) == []
+    assert names(index.lookup("fri", 8)) == ["Fried Rice"]
+    assert set(index.products) == {renamed.id, kept.id}
+
+
+def test_catalog_changes_refresh_only_those_products(run, db, make_product):
+    product = make_product(name="Jollof Rice")
+    index = SuggestIndex(max_age=3600)
+
+    async def scenario():
+        await index.rebuild()
+        product.name = "Fried Rice"
+        db.commit()
+        index.changed({product.id})
+        await wait_for(lambda: index.refreshes.value == 1)
+
+    run(scenario)
+    assert names(index.lookup("fri", 8)) == ["Fried Rice"]
+
+
+def test_failed_refresh_keeps_the_index_and_retries(run, db, monkeypatch, make_product):
+    monkeypatch.setattr(suggest, "REFRESH_RETRY_SECONDS", 0.01)
+    product = make_product(name="Jollof Rice")
+    index = SuggestIndex(max_age=3600)
+    run(index.rebuild)
+    product.name = "Fried Rice"
+    db.commit()
+    working = suggest.async_read_session
+    attempts = []
+
+    @asynccontextmanager
+    async def fails_once():
+        if not attempts:
+            attempts.append(time.monotonic())
+            raise ConnectionError("database is down")
+        async with working() as session:
+            yield session
+
+    monkeypatch.setattr(suggest, "async_read_session", fails_once)
+
+    async def scenario():
+        index.changed({product.id})
+        await wait_for(lambda: index.failures.value == 1)
+        # Still served, with the old name, until the retry succeeds
+        assert names(index.lookup("jol", 8)) == ["Jollof Rice"]
+        await wait_for(lambda: index.refreshes.value == 1)
+
+    run(scenario)
+    assert index.lookup("jol", 8) == []
+    assert names(index.lookup("fri", 8)) == ["Fried Rice"]
+
+
+def test_retries_back_off_up_to_the_cap(run, monkeypatch, database_down):
+    monkeypatch.setattr(suggest, "REFRESH_RETRY_SECONDS", 0.05)
+    monkeypatch.setattr(suggest, "MAX_REFRESH_RETRY_SECONDS", 0.1)
+    index = SuggestIndex(max_age=3600)
+
+    async def scenario():
+        index.changed(None)
+        await wait_for(lambda: len(database_down) == 4)
+
+    run(scenario)
+    gaps = [later - earlier for earlier, later in zip(database_down, database_down[1:])]
+    for gap, delay in zip(gaps, [0.05, 0.1, 0.1]):
+        assert delay * 0.9 <= gap < delay + 0.08
+    assert index.built_at is None and index.failures.value >= 3
+
+
+def test_suggest_fails_when_the_first_build_does(run, database_down):
+    index = SuggestIndex(max_age=3600)
+    with pytest.raises(RuntimeError):
+        run(index.suggest, "jol", 8)
@@ -0,0 +1,61 @@
+from sqlalchemy import select
+from app.models.product import ProductCategory
+from app.models.tag import Tag, normalize_tags, product_tags
+from app.models.user import UserRole
+from tests.conftest import auth_headers
+
+
+def tag_names(db, product_id: int) -> set:
+    rows = db.execute(
+        select(Tag.name).join(product_tags, product_tags.c.tag_id == Tag.id).where(product_tags.c.product_id == product_id)
+    )
+    return set(rows.scalars())
+
+
+def test_tags_are_trimmed_lowercased_and_deduplicated():
+    assert normalize_tags(" Spicy , spicy,Vegan,, ") == ["spicy", "vegan"]
+    assert normalize_tags(None) == []
+
+
+def test_product_writes_keep_tag_rows_in_step(client, db, make_user, make_product):
+    admin = make_user(role=UserRole.ADMIN)
+    product = make_product(tags="Spicy, Grilled")
+    assert tag_names(db, product.id) == {"spicy", "grilled"}
+
+    response = client.put(f"/api/products/{product.id}", json={"tags": "grilled, VEGAN"}, headers=auth_headers(admin))
+    assert response.status_code == 200
+    assert tag_names(db, product.id) == {"grilled", "vegan"}
+
+
+def test_tag_filter_ignores_case_and_whitespace(client, make_product):
+    spicy = make_product(tags="Spicy")
+    make_product(tags="Mild")
+    response = client.get("/api/products/", params={"tag": "  SPICY "})
+    assert [product["id"] for product in response.json()] == [spicy.id]
+
+
+def test_facets_count_active_products_under_the_filters(client, make_product):
+    make_product(category=ProductCategory.MAIN, price=1500.0, tags="spicy, grilled")
+    make_product(category=ProductCategory.MAIN, price=4000.0, tags="spicy")
+    make_product(category=ProductCategory.BEVERAGES, price=12000.0, tags="cold")
+    make_product(category=ProductCategory.BEVERAGES, price=800.0, tags="spicy", is_active=False)
+
+    facets = client.get("/api/products/facets").json()
+    assert facets["total"] == 3
+    assert facets["categories"] == {"main": 2, "beverages": 1}
+    # Most common first, then by name
+    assert list(facets["tags"].items()) == [("spicy", 2), ("cold", 1), ("grilled", 1)]
+    assert [bucket["count"] for bucket in facets["price_buckets"]] == [1, 1, 0, 1]
+
+    spicy = client.get("/api/products/facets", params={"tag": "Spicy"}).json()
+    assert spicy["total"] == 2
+    assert spicy["categories"] == {"main": 2}
+
+
+def test_facets_follow_product_changes(client, make_user, make_product):
+    admin = make_user(role=UserRole.ADMIN)
+    product = make_product(tags="spicy")
+    assert client.get("/api/products/facets").json()["tags"] == {"spicy": 1}
+
+    client.put(f"/api/products/{product.id}", json={"tags": "mild"}, headers=auth_headers(admin))
+    assert client.get("/api/products/facets").json()["tags"] == {"mild": 1}
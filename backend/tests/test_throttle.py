@@ -0,0 +1,47 @@
+import asyncio
+import pytest
+from fastapi import HTTPException
+from starlette.requests import Request
+from app.core.throttle import LoginThrottle, MemoryThrottleStore, client_ip, parse_proxies
+
+PROXY = "10.0.0.5"
+
+
+def _request(peer: str, forwarded_for: str = None) -> Request:
+    headers = [(b"x-forwarded-for", forwarded_for.encode())] if forwarded_for else []
+    return Request({"type": "http", "method": "POST", "path": "/", "headers": headers, "client": (peer, 443)})
+
+
+def _throttle(ip_limit: int = 2) -> LoginThrottle:
+    return LoginThrottle(
+        MemoryThrottleStore(), window=60, ip_limit=ip_limit, account_limit=100, proxies=parse_proxies("10.0.0.0/24")
+    )
+
+
+def test_forwarded_clients_behind_a_trusted_proxy_get_separate_buckets():
+    throttle = _throttle()
+
+    async def attempts():
+        for n in range(2):
+            await throttle.check(_request(PROXY, "203.0.113.7"), f"user{n}@example.com")
+        with pytest.raises(HTTPException) as blocked:
+            await throttle.check(_request(PROXY, "203.0.113.7"), "user9@example.com")
+        assert blocked.value.status_code == 429
+        # Another client through the same proxy is unaffected
+        await throttle.check(_request(PROXY, "198.51.100.20"), "other@example.com")
+
+    asyncio.run(attempts())
+
+
+def test_forwarded_for_is_ignored_from_untrusted_peers():
+    proxies = parse_proxies("10.0.0.0/24")
+    assert client_ip(_request("203.0.113.7", "1.2.3.4"), proxies) == "203.0.113.7"
+
+
+def test_forwarded_for_is_read_from_the_right_past_trusted_proxies():
+    proxies = parse_proxies("10.0.0.0/24")
+    # The client may prepend anything; only what our proxies appended counts
+    request = _request(PROXY, "1.2.3.4, 203.0.113.7, 10.0.0.9")
+    assert client_ip(request, proxies) == "203.0.113.7"
+    assert client_ip(_request(PROXY), proxies) == PROXY
+    assert client_ip(_request(PROXY, "1.2.3.4, 203.0.113.7"), parse_proxies("*")) == "1.2.3.4"
@@ -0,0 +1,83 @@
+from app.core.revocation import TokenRevocations, token_revocations
+from app.core.security import create_refresh_token, decode_token, new_token_family, token_claims
+from app.models.token import RevokedToken
+from tests.conftest import PASSWORD
+
+
+def sign_in(client, user) -> dict:
+    response = client.post("/api/auth/signin", data={"username": user.email, "password": PASSWORD})
+    assert response.status_code == 200
+    return response.json()
+
+
+def refresh(client, refresh_token: str):
+    return client.post("/api/auth/refresh-token", params={"refresh_token": refresh_token})
+
+
+def bearer(tokens: dict) -> dict:
+    return {"Authorization": f"Bearer {tokens['access_token']}"}
+
+
+def test_refresh_rotates_within_the_family(client, make_user):
+    user = make_user()
+    tokens = sign_in(client, user)
+
+    response = refresh(client, tokens["refresh_token"])
+    assert response.status_code == 200
+    rotated = response.json()
+    assert decode_token(rotated["refresh_token"])["fam"] == decode_token(tokens["refresh_token"])["fam"]
+    assert client.get("/api/user/me", headers=bearer(rotated)).status_code == 200
+    assert refresh(client, rotated["refresh_token"]).status_code == 200
+
+
+def test_reused_refresh_token_revokes_the_family(client, make_user):
+    user = make_user()
+    tokens = sign_in(client, user)
+    rotated = refresh(client, tokens["refresh_token"]).json()
+
+    assert refresh(client, tokens["refresh_token"]).status_code == 401
+    # Both the thief's and the owner's newer tokens stop working
+    assert refresh(client, rotated["refresh_token"]).status_code == 401
+    assert client.get("/api/user/me", headers=bearer(rotated)).status_code == 401
+    assert token_revocations.stats()["reuse_detected"] >= 1
+
+
+def test_reuse_on_another_worker_is_caught_when_persisted(client, db, make_user):
+    user = make_user()
+    payload = decode_token(create_refresh_token({**token_claims(user), "fam": new_token_family()}))
+    other_worker = TokenRevocations(sync_interval=60)
+
+    async def exchange_on_both():
+        assert await token_revocations.rotate(payload)
+        await token_revocations.persist()
+        # The second worker has not seen the jti, so it only finds out when its write conflicts
+        assert await other_worker.rotate(payload)
+        await other_worker.persist()
+
+    client.portal.call(exchange_on_both)
+
+    assert other_worker.stats()["reuse_detected"] == 1
+    assert db.get(RevokedToken, payload["jti"]).kind == "token"
+    assert db.get(RevokedToken, payload["fam"]).kind == "family"
+
+
+def test_logout_revokes_access_and_refresh_tokens(client, make_user):
+    user = make_user()
+    tokens = sign_in(client, user)
+    assert client.get("/api/user/me", headers=bearer(tokens)).status_code == 200
+
+    response = client.post("/api/auth/logout", params={"refresh_token": tokens["refresh_token"]})
+    assert response.status_code == 200
+
+    assert client.get("/api/user/me", headers=bearer(tokens)).status_code == 401
+    assert refresh(client, tokens["refresh_token"]).status_code == 401
+
+
+def test_refresh_rejects_tokens_from_before_a_role_change(client, db, make_user):
+    user = make_user()
+    tokens = sign_in(client, user)
+    user.token_generation += 1
+    db.commit()
+
+    # Nothing has cached the principal yet, so the refresh reads the bumped generation
+    assert refresh(client, tokens["refresh_token"]).status_code == 401